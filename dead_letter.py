@@ -0,0 +1,24 @@
+import os
+from datetime import datetime
+
+# Added to each failed row; the guest list's own columns come first, unchanged
+DEAD_LETTER_ERROR_COLUMN = "Send Error"
+DEAD_LETTER_ATTEMPTS_COLUMN = "Send Attempts"
+
+
+def write_dead_letter(invitees, failures, folder):
+    """
+    Write the guest list rows that could not be sent to a CSV file and return its path.
+
+    failures is a list of (position, error, attempts). The file keeps the
+    original columns, so opening it in the sender as the guest list gives a
+    retry-only run with the same email and name columns (and ledger keys).
+    """
+    positions = [position for position, _, _ in failures]
+    rows = invitees.iloc[positions].copy()
+    rows[DEAD_LETTER_ERROR_COLUMN] = [str(error) for _, error, _ in failures]
+    rows[DEAD_LETTER_ATTEMPTS_COLUMN] = [attempts for _, _, attempts in failures]
+    path = os.path.join(folder, f"failed_invitations_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv")
+    # utf-8-sig so Excel opens non-ASCII names correctly
+    rows.to_csv(path, index=False, encoding="utf-8-sig")
+    return path
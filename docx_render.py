@@ -0,0 +1,344 @@
+
+# Standard library imports
+import io
+import re
+import copy
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from xml.sax.saxutils import escape
+
+# Third-party imports
+from docxtpl import DocxTemplate
+from docx.opc.oxml import parse_xml, serialize_part_xml
+from jinja2 import Template
+
+# docxtpl renders these core properties through Jinja as well
+CORE_PROPERTIES = ["author", "comments", "identifier", "language", "subject", "title"]
+
+FOOTNOTES_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.wordprocessingml.footnotes+xml"
+
+# Simple {{ var }} placeholder, the only tag the Jinja-free engine understands
+PLACEHOLDER_PATTERN = re.compile(r'{{\s*(\w+)\s*}}')
+
+# Characters that docxtpl turns into tabs, breaks and page breaks (see DocxTemplate.resolve_listing)
+LISTING_CHARS = ('\t', '\a', '\n', '\f')
+
+
+def _has_jinja_markup(text):
+	"""Check whether a piece of template text contains any Jinja tags"""
+	return "{{" in text or "{%" in text or "{#" in text
+
+
+def _is_plain_markup(text):
+	"""Check that every Jinja tag in the text is a simple {{ var }} placeholder"""
+	if "{%" in text or "{#" in text:
+		return False
+	return "{{" not in PLACEHOLDER_PATTERN.sub("", text) and "}}" not in PLACEHOLDER_PATTERN.sub("", text)
+
+
+def _unescape_markers(xml):
+	"""Undo docxtpl's escaped tag markers ({_{ ... }_})"""
+	return (
+		xml.replace("{_{", "{{")
+		.replace("}_}", "}}")
+		.replace("{_%", "{%")
+		.replace("%_}", "%}")
+	)
+
+
+class UnsupportedTemplateError(ValueError):
+	"""Raised when a template uses Jinja features the plain engine cannot render"""
+
+
+class CompiledTemplate:
+	"""
+	A DOCX template that is opened, parsed and compiled once per generation run.
+
+	DocxTemplate re-reads the .docx archive, re-parses every XML part and
+	re-compiles the Jinja source for every document it renders. This class does
+	that work in the constructor and then renders each context by filling the
+	precompiled parts and copying every other archive entry unchanged.
+	"""
+
+	def __init__(self, template_file):
+		# Accept either a path or the raw .docx bytes (as shipped to worker processes)
+		if isinstance(template_file, bytes):
+			self.template_bytes = template_file
+			self.template_path = None
+		else:
+			with open(template_file, 'rb') as f:
+				self.template_bytes = f.read()
+			self.template_path = template_file
+
+		# Reuse docxtpl's own XML cleanup so the output matches DocxTemplate.render
+		self._tpl = DocxTemplate(io.BytesIO(self.template_bytes))
+		self._tpl.init_docx()
+		docx = self._tpl.docx
+
+		# Document body: keep the <w:document> root without its body
+		self._document_name = docx.part.partname.lstrip('/')
+		self._body_source = self._tpl.patch_xml(self._tpl.get_xml())
+		root = docx.element
+		self._body_index = root.index(root.body)
+		self._root_skeleton = copy.deepcopy(root)
+		self._root_skeleton.remove(self._root_skeleton.body)
+
+		# Headers and footers: only the parts that actually contain placeholders
+		self._header_footer_sources = []
+		for uri in (DocxTemplate.HEADER_URI, DocxTemplate.FOOTER_URI):
+			for rel_key, part in self._tpl.get_headers_footers(uri):
+				xml = self._tpl.get_part_xml(part)
+				if not _has_jinja_markup(xml):
+					continue
+				encoding = self._tpl.get_headers_footers_encoding(xml)
+				self._header_footer_sources.append((part.partname.lstrip('/'), self._tpl.patch_xml(xml), encoding))
+
+		# Footnotes
+		self._footnote_sources = []
+		for part in docx.part.package.parts:
+			if part.content_type == FOOTNOTES_CONTENT_TYPE:
+				blob = part.blob.decode('utf-8') if isinstance(part.blob, bytes) else part.blob
+				if _has_jinja_markup(blob):
+					self._footnote_sources.append((part.partname.lstrip('/'), self._tpl.patch_xml(blob)))
+
+		# Core properties (title, subject, ...)
+		self._property_sources = {}
+		core_properties = docx.core_properties
+		for prop in CORE_PROPERTIES:
+			value = getattr(core_properties, prop)
+			if value and _has_jinja_markup(value):
+				self._property_sources[prop] = value
+		self._core_part = docx.part.package._core_properties_part if self._property_sources else None
+
+		self._prepare()
+
+		# Compress the untouched archive entries once; each render only appends the templated parts
+		templated_names = {self._document_name}
+		templated_names.update(name for name, _, _ in self._header_footer_sources)
+		templated_names.update(name for name, _ in self._footnote_sources)
+		if self._core_part is not None:
+			templated_names.add(self._core_part.partname.lstrip('/'))
+		self._templated_entries = {}
+		static_archive = io.BytesIO()
+		with zipfile.ZipFile(io.BytesIO(self.template_bytes)) as docx_zip, \
+				zipfile.ZipFile(static_archive, 'w', zipfile.ZIP_DEFLATED) as out_zip:
+			for info in docx_zip.infolist():
+				if info.filename in templated_names:
+					self._templated_entries[info.filename] = info
+				else:
+					out_zip.writestr(info, docx_zip.read(info.filename))
+		self._static_archive = static_archive.getvalue()
+
+	def _prepare(self):
+		"""Compile every templated part with Jinja"""
+		self._body_template = self._compile(self._body_source)
+		self._header_footer_templates = [
+			(name, self._compile(xml), encoding) for name, xml, encoding in self._header_footer_sources
+		]
+		self._footnote_templates = [(name, self._compile(xml)) for name, xml in self._footnote_sources]
+		self._property_templates = {prop: Template(value) for prop, value in self._property_sources.items()}
+
+	def _compile(self, src_xml):
+		"""
+		Compile a patched XML part the same way DocxTemplate.render_xml_part does.
+
+		Values are XML-escaped (docxtpl's autoescape=True), as in PlainTemplate,
+		so both engines accept text with & or < in it. RichText and other
+		Markup values are inserted unchanged.
+		"""
+		return Template(re.sub(r"<w:p([ >])", r"\n<w:p\1", src_xml), autoescape=True)
+
+	def _render_part(self, template, context):
+		"""Render a compiled XML part and undo docxtpl's rendering markers"""
+		dst_xml = template.render(context)
+		dst_xml = _unescape_markers(re.sub(r"\n<w:p([ >])", r"<w:p\1", dst_xml))
+		return self._tpl.resolve_listing(dst_xml)
+
+	def render_parts(self, context):
+		"""Render every templated part and return {archive name: bytes}"""
+		parts = {}
+
+		# Body
+		tree = self._tpl.fix_tables(self._render_part(self._body_template, context))
+		self._tpl.docx_ids_index = 1000
+		self._tpl.fix_docpr_ids(tree)
+		root = copy.deepcopy(self._root_skeleton)
+		root.insert(self._body_index, tree)
+		parts[self._document_name] = serialize_part_xml(root)
+
+		# Headers and footers
+		for name, template, encoding in self._header_footer_templates:
+			xml = self._render_part(template, context)
+			parts[name] = serialize_part_xml(parse_xml(xml.encode(encoding)))
+
+		# Footnotes
+		for name, template in self._footnote_templates:
+			parts[name] = self._render_part(template, context).encode('utf-8')
+
+		# Core properties
+		if self._property_templates:
+			core_properties = self._core_part.core_properties
+			for prop, template in self._property_templates.items():
+				setattr(core_properties, prop, template.render(context))
+			parts[self._core_part.partname.lstrip('/')] = serialize_part_xml(self._core_part.element)
+
+		return parts
+
+	def render(self, context):
+		"""Render a context and return the resulting .docx file as bytes"""
+		parts = self.render_parts(context)
+		buffer = io.BytesIO(self._static_archive)
+		with zipfile.ZipFile(buffer, 'a', zipfile.ZIP_DEFLATED) as out_zip:
+			for name, data in parts.items():
+				out_zip.writestr(self._templated_entries.get(name, name), data)
+		return buffer.getvalue()
+
+	def save(self, context, output_path):
+		"""Render a context straight to a .docx file"""
+		data = self.render(context)
+		with open(output_path, 'wb') as f:
+			f.write(data)
+
+
+class PlainTemplate(CompiledTemplate):
+	"""
+	Jinja-free engine for templates that only use simple {{ var }} placeholders.
+
+	Every templated part is serialized once and split into static XML segments
+	and placeholder slots, so rendering an attendee is a join of XML-escaped
+	strings. Raises UnsupportedTemplateError for loops, conditionals, filters or
+	any other Jinja syntax; use compile_template() to fall back automatically.
+	"""
+
+	def _prepare(self):
+		"""Split every templated part into static segments and placeholder slots"""
+		sources = [self._body_source] + [xml for _, xml, _ in self._header_footer_sources]
+		sources += [xml for _, xml in self._footnote_sources] + list(self._property_sources.values())
+		for source in sources:
+			if not _is_plain_markup(source):
+				raise UnsupportedTemplateError("Template uses Jinja features beyond {{ var }} placeholders")
+
+		# (archive name, segments, resolve listing characters) per templated part
+		self._split_parts = []
+
+		# Body: table and docPr fixes don't depend on the values, so apply them once
+		tree = self._tpl.fix_tables(self._body_source)
+		self._tpl.docx_ids_index = 1000
+		self._tpl.fix_docpr_ids(tree)
+		root = copy.deepcopy(self._root_skeleton)
+		root.insert(self._body_index, tree)
+		self._add_split_part(self._document_name, serialize_part_xml(root).decode('utf-8'), True)
+
+		# Headers and footers
+		for name, xml, encoding in self._header_footer_sources:
+			xml = serialize_part_xml(parse_xml(xml.encode(encoding))).decode('utf-8')
+			self._add_split_part(name, xml, True)
+
+		# Footnotes
+		for name, xml in self._footnote_sources:
+			self._add_split_part(name, xml, True)
+
+		# Core properties
+		if self._property_sources:
+			core_properties = self._core_part.core_properties
+			for prop, value in self._property_sources.items():
+				setattr(core_properties, prop, value)
+			xml = serialize_part_xml(self._core_part.element).decode('utf-8')
+			self._add_split_part(self._core_part.partname.lstrip('/'), xml, False)
+
+	def _add_split_part(self, name, xml, resolve_listing):
+		segments = PLACEHOLDER_PATTERN.split(xml)
+		# Even indexes are static XML, odd indexes are placeholder names
+		for i in range(0, len(segments), 2):
+			segments[i] = _unescape_markers(segments[i])
+		self._split_parts.append((name, segments, resolve_listing))
+
+	def render_parts(self, context):
+		"""Fill every split part and return {archive name: bytes}"""
+		values = {}
+		for key, value in context.items():
+			values[key] = escape(str(value)) if value is not None else ""
+		has_listing = any(char in value for value in values.values() for char in LISTING_CHARS)
+
+		parts = {}
+		for name, segments, resolve_listing in self._split_parts:
+			filled = list(segments)
+			for i in range(1, len(filled), 2):
+				filled[i] = values.get(filled[i], "")
+			xml = "".join(filled)
+			if has_listing and resolve_listing:
+				xml = self._tpl.resolve_listing(xml)
+			parts[name] = xml.encode('utf-8')
+		return parts
+
+
+def compile_template(template_file):
+	"""Compile a template (path or bytes) with the fastest engine that can render it"""
+	try:
+		return PlainTemplate(template_file)
+	except UnsupportedTemplateError:
+		return CompiledTemplate(template_file)
+
+
+# Below this many documents, starting worker processes costs more than it saves
+MIN_PARALLEL_RENDER_JOBS = 50
+
+# Template compiled once per worker process by _init_render_worker
+_worker_template = None
+
+
+def _init_render_worker(template_bytes):
+	global _worker_template
+	_worker_template = compile_template(template_bytes)
+
+
+def _render_chunk(jobs):
+	"""Render a chunk of (key, context, output_path) jobs inside a worker process"""
+	results = []
+	for key, context, output_path in jobs:
+		try:
+			_worker_template.save(context, output_path)
+			results.append((key, output_path, None))
+		except Exception as e:
+			results.append((key, output_path, str(e)))
+	return results
+
+
+def render_parallel(template_bytes, jobs, workers, on_result, is_cancelled=None, chunk_size=None):
+	"""
+	Render (key, context, output_path) jobs across a pool of worker processes.
+
+	The template bytes are sent to each worker once and compiled there; jobs are
+	handed out in chunks. on_result(key, output_path, error) is called in the
+	calling thread for every finished file. Returns False if is_cancelled()
+	became true before all chunks were done; chunks already running are
+	waited for (and reported) first, so no worker writes after it returns.
+	"""
+	if not jobs:
+		return True
+	workers = max(1, min(workers, len(jobs)))
+	if chunk_size is None:
+		# Several chunks per worker keeps the pool balanced and progress flowing
+		chunk_size = max(1, min(64, len(jobs) // (workers * 4)))
+	chunks = [jobs[i:i + chunk_size] for i in range(0, len(jobs), chunk_size)]
+
+	executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_render_worker, initargs=(template_bytes,))
+	try:
+		futures = [executor.submit(_render_chunk, chunk) for chunk in chunks]
+		unreported = set(futures)
+		for future in as_completed(futures):
+			unreported.discard(future)
+			for key, output_path, error in future.result():
+				on_result(key, output_path, error)
+			if is_cancelled is not None and is_cancelled():
+				for pending in unreported:
+					pending.cancel()
+				# A running chunk cannot be stopped cleanly mid-file: let it finish and record its files
+				for running in unreported:
+					if not running.cancelled():
+						for key, output_path, error in running.result():
+							on_result(key, output_path, error)
+				return False
+		return True
+	finally:
+		executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,149 @@
+import os
+import time
+import threading
+
+# Invitation files are named "Invitation - <name>.<ext>"
+INVITATION_PREFIX = "Invitation - "
+
+# A directory modified this close to the scan may still change within the same
+# mtime tick, so the index is rescanned on the next lookup (like git's racy check)
+RACY_MTIME_WINDOW = 2.0
+
+
+def legacy_name_variations(name):
+    """Filename stems produced by older versions of the name cleaning, most likely first"""
+    name = str(name)
+    return [
+        # Legacy processing (old get_filename logic)
+        name.replace("\n", " ").replace(".", "").replace('"', "'").strip(),
+        # Raw name with just quote replacement
+        name.replace('"', "'"),
+        # Raw name with no processing
+        name,
+        # Name with just space normalization (but keeping leading/trailing)
+        name.replace("\n", " ").replace(".", "").replace('"', "'"),
+        # Legacy with slash replacement (in case files were created with slash handling)
+        name.replace("\n", " ").replace(".", "").replace('"', "'").replace("/", " ").replace("\\", " ").strip(),
+    ]
+
+
+class FolderIndex:
+    """
+    In-memory index of the invitation files in one folder.
+
+    One os.scandir pass maps every "Invitation - <stem>.<ext>" file to its stem,
+    and an inverted index maps each lower-cased stem token to the stems that
+    contain it, so exact, legacy-variant and fuzzy "all name parts present"
+    lookups no longer touch the filesystem. Each lookup only stats the folder;
+    when its mtime changes the listing is re-read and the index patched with
+    just the added and removed files.
+    """
+
+    def __init__(self, folder, prefix=INVITATION_PREFIX):
+        self.folder = folder
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self._mtime = None
+        self._racy = True
+        self._names = set()
+        self._stems = {}    # stem -> {ext: filename}
+        self._tokens = {}   # lower-cased token -> set of stems
+        self._substring_cache = {}
+
+    def refresh(self):
+        """Re-read the folder if it changed since the last scan"""
+        with self._lock:
+            try:
+                mtime = os.stat(self.folder).st_mtime_ns
+            except OSError:
+                self._apply(set())
+                self._mtime = None
+                return
+            if mtime == self._mtime and not self._racy:
+                return
+            scan_started = time.time()
+            try:
+                with os.scandir(self.folder) as entries:
+                    names = {entry.name for entry in entries if entry.name.startswith(self.prefix)}
+            except OSError:
+                return  # Handle permission errors gracefully
+            self._apply(names)
+            self._mtime = mtime
+            self._racy = scan_started - mtime / 1e9 < RACY_MTIME_WINDOW
+
+    def _apply(self, names):
+        """Patch the index with the difference between the old and new listing"""
+        for name in self._names - names:
+            stem, ext = self._split(name)
+            files = self._stems.get(stem)
+            if files is not None:
+                files.pop(ext, None)
+                if not files:
+                    del self._stems[stem]
+                    for token in stem.lower().split():
+                        postings = self._tokens.get(token)
+                        if postings is not None:
+                            postings.discard(stem)
+                            if not postings:
+                                del self._tokens[token]
+        for name in names - self._names:
+            stem, ext = self._split(name)
+            files = self._stems.setdefault(stem, {})
+            if not files:
+                for token in stem.lower().split():
+                    self._tokens.setdefault(token, set()).add(stem)
+            files[ext] = name
+        if names != self._names:
+            self._substring_cache = {}
+        self._names = names
+
+    def _split(self, filename):
+        stem, ext = os.path.splitext(filename[len(self.prefix):])
+        return stem, ext.lstrip(".").lower()
+
+    def stems(self, ext):
+        """Every stem that has an .ext file"""
+        self.refresh()
+        with self._lock:
+            return {stem for stem, files in self._stems.items() if ext in files}
+
+    def _stems_with_part(self, part):
+        """Stems containing part inside one of their tokens (the old substring test)"""
+        stems = self._substring_cache.get(part)
+        if stems is None:
+            # Only reached when exact tokens miss, and memoized per part until the folder changes
+            stems = set()
+            for token, token_stems in self._tokens.items():
+                if part in token:
+                    stems |= token_stems
+            self._substring_cache[part] = stems
+        return stems
+
+    def find_fuzzy(self, name_parts, ext):
+        """A stem with an .ext file whose name contains every part, or None"""
+        self.refresh()
+        parts = [part.lower() for part in name_parts if part]
+        if not parts:
+            return None
+        with self._lock:
+            # Exact tokens first (one set intersection per part), then substrings within tokens
+            for postings in (lambda part: self._tokens.get(part, set()), self._stems_with_part):
+                candidates = set(postings(parts[0]))
+                for part in parts[1:]:
+                    candidates &= postings(part)
+                for stem in sorted(candidates):
+                    if ext in self._stems[stem]:
+                        return stem
+        return None
+
+    def find(self, name, cleaned_name, ext):
+        """
+        Stem of the invitation file for a person: the cleaned name, then legacy
+        variants (also with an extra space after the dash), then the fuzzy match.
+        """
+        self.refresh()
+        with self._lock:
+            for stem in [cleaned_name] + [v for variation in legacy_name_variations(name) for v in (variation, " " + variation)]:
+                if ext in self._stems.get(stem, {}):
+                    return stem
+        return self.find_fuzzy(cleaned_name.split(), ext)
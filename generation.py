@@ -0,0 +1,926 @@
+
+# Standard library imports
+import sys
+import os
+import urllib.request
+import zipfile
+import queue
+import threading
+from datetime import datetime
+
+# Third-party imports
+import pandas as pd
+
+# Local imports
+from docx_render import MIN_PARALLEL_RENDER_JOBS, PlainTemplate, compile_template, render_parallel
+from pdf_convert import WordConverter, convert_many
+from rasterize import FALLBACK_PNG_DPI, PngOptions, rasterize_first_page, rasterize_many
+from render_cache import RenderCache, render_key
+from storage import BatchedStore, file_digest, legacy_paths
+from job_manifest import JOB_STAGES, JobManifest
+
+# Output formats in pipeline order; DOCX is always rendered, PNG is rasterized from the PDF
+OUTPUT_FORMATS = ("docx", "pdf", "png")
+
+# normal = one invitation at a time, fast = bulk stages, pipeline = concurrent streaming stages
+GENERATION_MODES = ("normal", "fast", "pipeline")
+
+# Maximum documents waiting between two pipeline stages; keeps memory and disk use flat
+PIPELINE_QUEUE_SIZE = 8
+
+# Marks the end of the stream on a pipeline queue
+_PIPELINE_DONE = object()
+
+# Generation marks are committed every TRACKER_BATCH_SIZE rows or TRACKER_COMMIT_INTERVAL seconds
+TRACKER_BATCH_SIZE = 200
+TRACKER_COMMIT_INTERVAL = 2.0
+
+# Names per "IN (...)" query; stays below SQLite's host parameter limit
+TRACKER_QUERY_CHUNK = 500
+
+# Attendee class for OOP
+class Attendee:
+	def __init__(self, data_dict):
+		self.data = data_dict
+
+	def get_context(self, mapping):
+		# mapping: {placeholder: excel_column}
+		context = {}
+		for ph, col in mapping.items():
+			value = self.data.get(col, "")
+			# Convert None, NaN, or empty string to empty string and strip whitespace
+			if value is None or pd.isna(value) or str(value).strip() == "" or str(value).strip().lower() == "nan":
+				context[ph] = ""
+			else:
+				context[ph] = str(value).strip()
+		return context
+
+	def get_filename(self):
+		# Use Name or fallback to first column
+		name = self.data.get("Name") or list(self.data.values())[0]
+		# Clean the name and remove invalid filename characters
+		cleaned_name = str(name).replace('\n', ' ')
+		# Replace invalid Windows filename characters
+		invalid_chars = ['/', '\\', ':', '*', '?', '"', '<', '>', '|']
+		for char in invalid_chars:
+			cleaned_name = cleaned_name.replace(char, ' ')
+		# Remove dots and normalize spaces
+		cleaned_name = ' '.join(part.replace('.', '') for part in cleaned_name.split())
+		return cleaned_name
+
+
+def invitee_metadata(invitees):
+	"""
+	Per-row values the invitee list needs, computed column-wise for the whole sheet:
+	filename (same result as Attendee.get_filename) and display_name.
+	Returned as a DataFrame aligned to invitees.
+	"""
+	frame = invitees.copy()
+	frame.columns = [str(c) for c in frame.columns]
+	if frame.empty or len(frame.columns) == 0:
+		return pd.DataFrame({"filename": [], "display_name": []}, index=frame.index, dtype=object)
+	
+	# Attendee.get_filename: data.get("Name") or the first column's value (falsy: None, "", 0)
+	first_value = frame.iloc[:, 0]
+	if "Name" in frame.columns:
+		name = frame["Name"]
+		falsy = name.map(lambda value: value is None) | name.isin(["", 0])
+		name = name.where(~falsy, first_value)
+	else:
+		name = first_value
+	cleaned = name.map(str).str.replace("\n", " ", regex=False)
+	cleaned = cleaned.str.replace(r'[/\\:*?"<>|]', " ", regex=True)
+	# ' '.join(part.replace('.', '') for part in name.split())
+	filename = cleaned.str.split().str.join(" ").str.replace(".", "", regex=False)
+	
+	# Display name: the first filled name-like column, else the first filled column, else "Row N"
+	display_name = pd.Series(None, index=frame.index, dtype=object)
+	for col in ['Name', 'name', 'Full Name', 'full_name']:
+		if col in frame.columns:
+			values = frame[col]
+			display_name = display_name.where(display_name.notna() | values.isna(), values.map(str).str.strip())
+	first_filled = pd.Series(None, index=frame.index, dtype=object)
+	for position in reversed(range(len(frame.columns))):
+		values = frame.iloc[:, position]
+		text = values.map(str).str.strip()
+		first_filled = first_filled.mask(values.notna() & (text != ""), text)
+	display_name = display_name.where(display_name.notna() & (display_name != ""), first_filled)
+	row_labels = pd.Series([f"Row {idx + 1}" for idx in frame.index], index=frame.index)
+	display_name = display_name.where(display_name.notna(), row_labels)
+	return pd.DataFrame({"filename": filename, "display_name": display_name})
+
+
+# Ensure Poppler is available for pdftoppm (Windows only)
+def ensure_poppler():
+	"""
+	Download and extract Poppler for Windows if not already present.
+	Returns the bin path containing pdftoppm.exe.
+	"""
+	if sys.platform != "win32":
+		print("Non-Windows system detected, assuming Poppler is system-installed")
+		return None
+		
+	print("Checking for Poppler installation...")
+	
+	# Explicitly check the expected path
+	poppler_bin = os.path.join(os.path.dirname(__file__), "poppler", "poppler-23.11.0", "Library", "bin")
+	pdftoppm_path = os.path.join(poppler_bin, "pdftoppm.exe")
+	
+	if os.path.exists(pdftoppm_path):
+		print(f"Poppler found at: {poppler_bin}")
+		return poppler_bin
+		
+	# Fallback: search all subfolders for pdftoppm.exe
+	poppler_dir = os.path.join(os.path.dirname(__file__), "poppler")
+	print(f"Searching for Poppler in: {poppler_dir}")
+	
+	for root, dirs, files in os.walk(poppler_dir):
+		if "pdftoppm.exe" in files:
+			print(f"Found existing Poppler at: {root}")
+			return root
+			
+	# Download and extract Poppler if not found
+	print("Poppler not found, attempting download...")
+	
+	try:
+		url = "https://github.com/oschwartz10612/poppler-windows/releases/download/v23.11.0-0/Release-23.11.0-0.zip"
+		zip_path = os.path.join(poppler_dir, "poppler.zip")
+		os.makedirs(poppler_dir, exist_ok=True)
+		
+		print("Downloading Poppler from GitHub...")
+		urllib.request.urlretrieve(url, zip_path)
+		
+		print("Extracting Poppler...")
+		with zipfile.ZipFile(zip_path, 'r') as zip_ref:
+			zip_ref.extractall(poppler_dir)
+		os.remove(zip_path)
+		
+		# Find the extracted folder
+		for root, dirs, files in os.walk(poppler_dir):
+			if "pdftoppm.exe" in files:
+				print(f"Poppler successfully installed at: {root}")
+				return root
+				
+		print("ERROR: Poppler download completed but pdftoppm.exe not found")
+		return None
+		
+	except Exception as e:
+		print(f"ERROR: Failed to download/extract Poppler: {e}")
+		print("Manual installation required:")
+		print("1. Download Poppler from: https://github.com/oschwartz10612/poppler-windows/releases")
+		print("2. Extract to a 'poppler' folder next to this script")
+		print("3. Ensure pdftoppm.exe is accessible")
+		return None
+
+
+class GenerationTracker(BatchedStore):
+	"""
+	Record of generated invitations, persisted to a SQLite database.
+
+	Marks are buffered and committed in batches (see BatchedStore), so a run
+	writes each row once instead of rewriting the whole record per
+	invitation. Names are the primary key, so single and bulk
+	"was this generated" lookups are indexed. An existing JSON record from
+	older versions is imported once on first open.
+	"""
+
+	batch_size = TRACKER_BATCH_SIZE
+	commit_interval = TRACKER_COMMIT_INTERVAL
+	pending_type = dict  # name -> (generated_date, output_folder); a later mark replaces an earlier one
+	description = "generation tracking"
+
+	def __init__(self, tracking_file="generated_invitations.db", log=print, legacy_json=None):
+		tracking_file, legacy_json = legacy_paths(tracking_file, legacy_json)
+		self.tracking_file = tracking_file
+		super().__init__(tracking_file, log=log)
+		self._import_legacy_json(
+			legacy_json,
+			lambda records: [
+				(name, info.get("generated_date", ""), info.get("output_folder"))
+				for name, info in records.items() if isinstance(info, dict)
+			],
+			"INSERT OR IGNORE INTO generated VALUES (?, ?, ?)"
+		)
+
+	def _create_tables(self):
+		self._conn.execute(
+			"CREATE TABLE IF NOT EXISTS generated ("
+			"name TEXT PRIMARY KEY, generated_date TEXT NOT NULL, output_folder TEXT)"
+		)
+
+	def was_generated(self, name):
+		"""Check if invitation was already generated for this person"""
+		with self._lock:
+			if name in self._pending:
+				return True
+			return self._conn.execute("SELECT 1 FROM generated WHERE name = ?", (name,)).fetchone() is not None
+
+	def generated_names(self, names):
+		"""Return the subset of names that were already generated, in as few queries as possible"""
+		names = list(dict.fromkeys(names))
+		found = set()
+		with self._lock:
+			found.update(name for name in names if name in self._pending)
+			for start in range(0, len(names), TRACKER_QUERY_CHUNK):
+				chunk = names[start:start + TRACKER_QUERY_CHUNK]
+				placeholders = ",".join("?" * len(chunk))
+				rows = self._conn.execute(f"SELECT name FROM generated WHERE name IN ({placeholders})", chunk)
+				found.update(row[0] for row in rows)
+		return found
+
+	def mark_generated(self, name, output_folder):
+		"""Mark invitation as generated for this person; committed with the next batch"""
+		with self._lock:
+			self._pending[name] = (datetime.now().strftime("%Y-%m-%d %H:%M:%S"), output_folder)
+			self._commit_due_locked()
+
+	def _write_rows(self, pending):
+		self._conn.executemany(
+			"INSERT OR REPLACE INTO generated VALUES (?, ?, ?)",
+			[(name, date, folder) for name, (date, folder) in pending.items()]
+		)
+
+
+class InvitationGenerator:
+	"""
+	Headless invitation generation engine shared by the GUI and the command line.
+
+	Log messages, progress (0..1) and every finished invitation are reported
+	through callbacks, and cancellation is polled through is_cancelled, so the
+	engine never touches a GUI toolkit.
+	"""
+
+	def __init__(self, template_path, output_folder, mapping, tracker, formats=OUTPUT_FORMATS, render_workers=1,
+			pdf_converter=None, png_workers=1, png_options=None, use_cache=True, workbook_path=None, log=print, progress=None,
+			is_cancelled=None, on_generated=None):
+		self.template_path = template_path
+		self.output_folder = output_folder
+		self.mapping = mapping
+		self.tracker = tracker
+		self.formats = set(formats) | {"docx"}
+		self.render_workers = max(1, render_workers)
+		# Stage 2 backend (see pdf_convert); the caller owns it and closes it
+		self.pdf_converter = pdf_converter or WordConverter()
+		# Concurrent pdftoppm processes for Stage 3
+		self.png_workers = max(1, png_workers)
+		self.png_options = png_options or PngOptions()
+		# Skip rows whose template, data and settings match their existing files
+		self.use_cache = use_cache
+		self.render_cache = None
+		self._render_keys = {}
+		# Saved in the fast-mode job manifest so templify-generate --resume can rerun the job
+		self.workbook_path = workbook_path
+		self.job_manifest = None
+		self.log = log
+		self.progress = progress or (lambda value: None)
+		self.is_cancelled = is_cancelled or (lambda: False)
+		self.on_generated = on_generated or (lambda idx, filename: None)
+
+	def needs_pdf(self):
+		"""PDFs are produced when requested or when PNGs have to be rasterized from them"""
+		return "pdf" in self.formats or "png" in self.formats
+
+	def load_compiled_template(self):
+		"""Compile the template once for a generation run, picking the fastest engine"""
+		try:
+			compiled_template = compile_template(self.template_path)
+		except Exception as e:
+			self.log(f"Error loading template: {e}")
+			return None
+		if isinstance(compiled_template, PlainTemplate):
+			self.log("Template uses only simple placeholders - using fast renderer")
+		else:
+			self.log("Template uses Jinja logic - using full docxtpl renderer")
+		return compiled_template
+
+	def generate(self, invitees, selected_indices, mode="normal"):
+		"""Generate invitations for the given row positions; returns the number generated or already up to date"""
+		self.render_cache = None
+		self.job_manifest = None
+		# Every selected row is read once; keys, the skip check and the generation modes share the jobs
+		render_jobs = self._build_render_jobs(invitees, selected_indices)
+		self._render_keys = self._compute_render_keys(render_jobs)
+		up_to_date = 0
+		if self._render_keys:
+			# Results are recorded even when nothing is skipped, so a forced run never leaves stale keys behind
+			self.render_cache = RenderCache(self.output_folder, log=self.log)
+			render_jobs, up_to_date = self._skip_unchanged(render_jobs)
+			if not render_jobs:
+				self.log(f"All {up_to_date} selected invitations are up to date - nothing to generate")
+				return up_to_date
+		try:
+			if mode == "fast":
+				generated = self._generate_fast_mode(render_jobs)
+			elif mode == "pipeline":
+				generated = self._generate_pipeline_mode(render_jobs)
+			else:
+				generated = self._generate_normal_mode(render_jobs)
+		finally:
+			self.tracker.flush()
+			if self.render_cache is not None:
+				self.render_cache.save()
+			if self.job_manifest is not None:
+				self.job_manifest.close()
+		return generated + up_to_date
+
+	def _output_settings(self):
+		"""Everything besides template and data that changes the produced files"""
+		return {
+			"formats": sorted(self.formats),
+			"pdf_converter": self.pdf_converter.name if self.needs_pdf() else None,
+			"png": vars(self.png_options) if "png" in self.formats else None,
+		}
+
+	def _artifact_paths(self, filename):
+		"""Files that make up one invitation's artifact set under the current settings"""
+		base = os.path.join(self.output_folder, f"Invitation - {filename}")
+		paths = [base + ".docx"]
+		if self.needs_pdf():
+			paths.append(base + ".pdf")
+		if "png" in self.formats:
+			paths.append(base + ".png")
+		return paths
+
+	def _compute_render_keys(self, render_jobs):
+		"""Render key per invitation name (see render_cache); empty if the template can't be read"""
+		try:
+			template_hash = file_digest(self.template_path)
+		except OSError:
+			# Let the generation mode report the unreadable template
+			return {}
+		settings = self._output_settings()
+		return {
+			filename: render_key(template_hash, context, settings)
+			for (_, filename), context, _ in render_jobs
+		}
+
+	def _skip_unchanged(self, render_jobs):
+		"""
+		Split off jobs whose render key matches their existing artifacts (only with use_cache);
+		returns (remaining jobs, skipped count). Remaining rows lose their cache entry until they are
+		produced again, so a row that is overwritten and then fails is never taken as up to date.
+		"""
+		remaining = []
+		skipped = 0
+		for job in render_jobs:
+			idx, filename = job[0]
+			if self.use_cache and self.render_cache.is_fresh(filename, self._render_keys[filename]):
+				skipped += 1
+				self.on_generated(idx, filename)
+			else:
+				self.render_cache.forget(filename)
+				remaining.append(job)
+		if skipped:
+			self.log(f"♻️ Skipping {skipped} unchanged invitations (template, data and settings match existing files)")
+		return remaining, skipped
+
+	def _job_spec(self):
+		"""What templify-generate --resume needs to rerun this job"""
+		return {
+			"template": os.path.abspath(self.template_path),
+			"workbook": os.path.abspath(self.workbook_path) if self.workbook_path else None,
+			"mapping": self.mapping,
+			"formats": sorted(self.formats),
+			"png": vars(self.png_options),
+		}
+
+	def _open_job_manifest(self, render_jobs):
+		"""Start the fast-mode checkpoint manifest for these ((idx, filename), context, out_docx) jobs"""
+		if not self._render_keys:
+			return None
+		try:
+			manifest = JobManifest(self.output_folder, log=self.log)
+			manifest.start(
+				self._job_spec(),
+				[(filename, int(idx), self._render_keys[filename]) for (idx, filename), _, _ in render_jobs]
+			)
+		except Exception as e:
+			self.log(f"Warning: Stage checkpoints unavailable: {e}")
+			return None
+		self.job_manifest = manifest
+		return manifest
+
+	def _mark_generated(self, filename):
+		"""Track a finished invitation and remember its artifact set in the render cache"""
+		self.tracker.mark_generated(filename, self.output_folder)
+		key = self._render_keys.get(filename)
+		if self.render_cache is not None and key is not None:
+			self.render_cache.record(filename, key, self._artifact_paths(filename))
+
+	def _build_render_jobs(self, invitees, selected_indices):
+		"""
+		((idx, filename), context, out_docx) for every selected row, built up front in one
+		pass so rendering can be handed out in chunks
+		"""
+		columns = [str(c) for c in invitees.columns]
+		rows = invitees.iloc[list(selected_indices)].itertuples(index=False, name=None)
+		render_jobs = []
+		for idx, values in zip(selected_indices, rows):
+			attendee = Attendee(dict(zip(columns, values)))
+			filename = attendee.get_filename()
+			out_docx = os.path.join(self.output_folder, f"Invitation - {filename}.docx")
+			render_jobs.append(((idx, filename), attendee.get_context(self.mapping), out_docx))
+		return render_jobs
+
+	def _render_docx_files(self, compiled_template, render_jobs, on_docx_rendered):
+		"""
+		Render ((idx, filename), context, out_docx) jobs, on worker processes when worthwhile.
+		Calls on_docx_rendered(key, out_docx, error) per file; returns False if cancelled.
+		"""
+		workers = self.render_workers
+		if workers > 1 and len(render_jobs) >= MIN_PARALLEL_RENDER_JOBS:
+			self.log(f"Rendering with {min(workers, len(render_jobs))} worker processes...")
+			return render_parallel(
+				compiled_template.template_bytes,
+				render_jobs,
+				workers,
+				on_docx_rendered,
+				is_cancelled=self.is_cancelled
+			)
+		for key, context, out_docx in render_jobs:
+			if self.is_cancelled():
+				return False
+			try:
+				compiled_template.save(context, out_docx)
+				on_docx_rendered(key, out_docx, None)
+			except Exception as e:
+				on_docx_rendered(key, out_docx, e)
+		return True
+
+	def _convert_pdf_to_png(self, pdf_path, poppler_path):
+		"""Rasterize the first page of a PDF next to it, with a lower-DPI fallback; returns True on success"""
+		png_path = pdf_path.replace('.pdf', '.png')
+		
+		# Additional validation before conversion
+		if not os.path.exists(pdf_path):
+			self.log(f"ERROR: PDF file not found: {pdf_path}")
+			return False
+			
+		file_size = os.path.getsize(pdf_path)
+		if file_size == 0:
+			self.log(f"ERROR: PDF file is empty: {pdf_path}")
+			return False
+		
+		self.log(f"Converting PDF to PNG: {os.path.basename(pdf_path)} ({file_size} bytes)")
+		
+		# Try conversion with detailed error handling
+		try:
+			rasterize_first_page(pdf_path, png_path, poppler_path=poppler_path, options=self.png_options)
+			self.log(f"✅ PNG created: {os.path.basename(png_path)}")
+			return True
+				
+		except Exception as conv_error:
+			error_msg = str(conv_error).lower()
+			if "syntax error" in error_msg or "couldn't" in error_msg or "unable to find pdftoppm" in error_msg:
+				self.log(f"PDF CONVERSION ERROR: Unable to read PDF structure - {os.path.basename(pdf_path)}")
+				self.log("This may be caused by:")
+				self.log("- Corrupted PDF file")
+				self.log("- Missing Poppler installation")
+				self.log("- Insufficient permissions")
+				self.log("- PDF created by incompatible software")
+				
+				# Try to provide specific solution
+				if poppler_path is None:
+					self.log("SOLUTION: Try installing Poppler manually or restart the application")
+				else:
+					self.log(f"SOLUTION: Verify Poppler installation at {poppler_path}")
+			else:
+				self.log(f"PDF CONVERSION ERROR: {conv_error}")
+			
+			# Try fallback conversion with different parameters
+			try:
+				self.log(f"Attempting fallback conversion for {os.path.basename(pdf_path)}...")
+				rasterize_first_page(pdf_path, png_path, dpi=FALLBACK_PNG_DPI, poppler_path=poppler_path, options=self.png_options)
+				self.log(f"✅ Fallback conversion successful: {os.path.basename(png_path)}")
+				return True
+			except Exception as fallback_error:
+				self.log(f"❌ Fallback conversion failed: {fallback_error}")
+			return False
+
+	def _generate_fast_mode(self, render_jobs):
+		"""Fast mode: Process in bulk stages - DOCX, then PDF, then PNG"""
+		self.log("🚀 Fast mode enabled - Processing in bulk stages...")
+		output_folder = self.output_folder
+		selected_count = len(render_jobs)
+		
+		# Prepare output folder
+		os.makedirs(output_folder, exist_ok=True)
+		
+		# Ensure Poppler is available for pdftoppm
+		poppler_path = None
+		if sys.platform == "win32" and "png" in self.formats:
+			poppler_path = ensure_poppler()
+		
+		generated_files = []
+		docx_files = []
+		pdf_files = []
+		
+		# Parse and compile the template once for the whole run
+		compiled_template = self.load_compiled_template()
+		if compiled_template is None:
+			return 0
+		
+		# STAGE 1: Generate all DOCX files
+		self.log("📄 Stage 1/3: Generating DOCX files...")
+		
+		# Per-stage checkpoints: each row redoes only the stages an earlier, interrupted run did not finish
+		# (unless a full regeneration was asked for)
+		manifest = self._open_job_manifest(render_jobs)
+		resume = manifest is not None and self.use_cache
+		finished = {stage: manifest.completed(stage) if resume else set() for stage in JOB_STAGES}
+		row_names = {}  # output path without extension -> invitation name
+		
+		def checkpoint(path, stage):
+			if manifest is not None:
+				manifest.mark(row_names[os.path.splitext(path)[0]], stage)
+		
+		def already_done(path, stage):
+			return row_names[os.path.splitext(path)[0]] in finished[stage] and os.path.exists(path)
+		
+		pending_render_jobs = []
+		for job in render_jobs:
+			(idx, filename), _, out_docx = job
+			row_names[os.path.splitext(out_docx)[0]] = filename
+			if already_done(out_docx, "docx"):
+				docx_files.append(out_docx)
+				generated_files.append((idx, filename))
+			else:
+				pending_render_jobs.append(job)
+		if len(pending_render_jobs) < len(render_jobs):
+			self.log(f"Resuming: {len(render_jobs) - len(pending_render_jobs)} DOCX files were already created")
+		
+		def on_docx_rendered(key, out_docx, error):
+			idx, filename = key
+			if error:
+				self.log(f"Error creating DOCX for {filename}: {error}")
+				return
+			checkpoint(out_docx, "docx")
+			docx_files.append(out_docx)
+			generated_files.append((idx, filename))
+			
+			# Update progress
+			progress = len(docx_files) / (selected_count * 3)  # 3 stages total
+			self.progress(progress)
+		
+		completed = self._render_docx_files(compiled_template, pending_render_jobs, on_docx_rendered)
+		
+		if not completed:
+			self.log("Generation cancelled.")
+			return 0
+		
+		docx_generated = len(docx_files)
+		self.log(f"✅ Stage 1 complete: {docx_generated}/{selected_count} DOCX files created")
+		
+		# STAGE 2: Convert all DOCX to PDF
+		if docx_files and self.needs_pdf():
+			self.log("📑 Stage 2/3: Converting DOCX to PDF...")
+			
+			pdf_jobs = []
+			for docx_path in docx_files:
+				pdf_path = os.path.splitext(docx_path)[0] + ".pdf"
+				if already_done(pdf_path, "pdf"):
+					pdf_files.append(pdf_path)
+				else:
+					pdf_jobs.append((docx_path, pdf_path))
+			if pdf_files:
+				self.log(f"Resuming: {len(pdf_files)} PDF files were already converted")
+			individual_jobs = pdf_jobs
+			if pdf_jobs and self.pdf_converter.supports_batch:
+				try:
+					# One converter session for just this run's documents - much more efficient
+					# than one call per file, without re-converting older files in the folder
+					self.log("Using batch conversion for better performance...")
+					produced = self.pdf_converter.convert_batch(pdf_jobs)
+					individual_jobs = []
+					
+					# Check which PDFs were actually created
+					for docx_path, pdf_path in pdf_jobs:
+						if pdf_path in produced:
+							checkpoint(pdf_path, "pdf")
+							pdf_files.append(pdf_path)
+					
+					# Update progress for the entire batch
+					progress = (selected_count * 2) / (selected_count * 3)
+					self.progress(progress)
+					
+				except Exception as e:
+					self.log(f"Batch PDF conversion failed, falling back to individual conversion: {e}")
+			
+			# Individual file conversion, spread over the converter's instances
+			if individual_jobs:
+				converted = {"count": 0}
+				
+				def on_pdf_converted(docx_path, pdf_path, error):
+					converted["count"] += 1
+					if error:
+						self.log(f"Error converting to PDF: {os.path.basename(docx_path)} - {error}")
+					elif os.path.exists(pdf_path):
+						checkpoint(pdf_path, "pdf")
+						pdf_files.append(pdf_path)
+					
+					# Update progress
+					progress = (selected_count + converted["count"]) / (selected_count * 3)
+					self.progress(progress)
+				
+				try:
+					completed = convert_many(self.pdf_converter, individual_jobs, on_pdf_converted, is_cancelled=self.is_cancelled)
+				except Exception as e:
+					self.log(f"PDF converter failed: {e}")
+					completed = True
+				if not completed:
+					self.log("Generation cancelled.")
+					return 0
+			pdf_converted = len(pdf_files)
+			
+			self.log(f"✅ Stage 2 complete: {pdf_converted}/{len(docx_files)} PDF files created")
+		
+		# STAGE 3: Convert all PDF to PNG
+		if pdf_files and "png" in self.formats:
+			self.log("🖼️ Stage 3/3: Converting PDF to PNG...")
+			png_converted = 0
+			
+			# Verify Poppler is working before starting batch conversion
+			if poppler_path:
+				self.log(f"Using Poppler from: {poppler_path}")
+				pdftoppm_exe = os.path.join(poppler_path, "pdftoppm.exe")
+				if not os.path.exists(pdftoppm_exe):
+					self.log(f"WARNING: pdftoppm.exe not found at {pdftoppm_exe}")
+			else:
+				self.log("Using system-installed Poppler (if available)")
+			self.log(f"PNG output: {self.png_options.describe()}")
+			
+			pending_pdfs = [pdf_path for pdf_path in pdf_files if not already_done(os.path.splitext(pdf_path)[0] + ".png", "png")]
+			rasterized = {"count": 0, "ok": len(pdf_files) - len(pending_pdfs)}
+			if rasterized["ok"]:
+				self.log(f"Resuming: {rasterized['ok']} PNG files were already created")
+			
+			def on_png_converted(pdf_path, ok, error):
+				rasterized["count"] += 1
+				if error:
+					self.log(f"Unexpected error converting to PNG: {os.path.basename(pdf_path)} - {error}")
+				elif ok:
+					checkpoint(pdf_path, "png")
+					rasterized["ok"] += 1
+				
+				# Update progress
+				progress = (selected_count * 2 + rasterized["count"]) / (selected_count * 3)
+				self.progress(progress)
+			
+			if self.png_workers > 1 and pending_pdfs:
+				self.log(f"Rasterizing with {min(self.png_workers, len(pending_pdfs))} Poppler workers...")
+			completed = rasterize_many(
+				pending_pdfs,
+				lambda pdf_path: self._convert_pdf_to_png(pdf_path, poppler_path),
+				on_png_converted,
+				workers=self.png_workers,
+				is_cancelled=self.is_cancelled
+			)
+			if not completed:
+				self.log("Generation cancelled.")
+				return 0
+			png_converted = rasterized["ok"]
+			
+			self.log(f"✅ Stage 3 complete: {png_converted}/{len(pdf_files)} PNG files created")
+			
+			if png_converted < len(pdf_files):
+				failed_count = len(pdf_files) - png_converted
+				self.log(f"⚠️  {failed_count} PDF files could not be converted to PNG")
+				self.log("Note: DOCX and PDF files were created successfully")
+		
+		# Mark all generated files and report them
+		for idx, filename in generated_files:
+			self._mark_generated(filename)
+			if manifest is not None and all(os.path.exists(path) for path in self._artifact_paths(filename)):
+				manifest.finish(filename)
+			self.on_generated(idx, filename)
+		
+		self.log(f"🎉 Fast mode generation complete! Generated: {len(generated_files)} invitations")
+		return len(generated_files)
+
+	def _generate_pipeline_mode(self, render_jobs):
+		"""
+		Pipeline mode: render, convert and rasterize concurrently.
+
+		Each stage runs on its own thread and hands documents to the next one
+		through a bounded queue, so row N is rasterized while row N+1 converts
+		and row N+2 renders. A full queue blocks the stage feeding it, which
+		keeps memory flat. Every invitation is tracked as soon as it leaves
+		the last stage.
+		"""
+		self.log("🔀 Pipeline mode: rendering, converting and rasterizing concurrently...")
+		output_folder = self.output_folder
+		selected_count = len(render_jobs)
+		
+		# Prepare output folder
+		os.makedirs(output_folder, exist_ok=True)
+		
+		# Ensure Poppler is available for pdftoppm
+		poppler_path = None
+		if sys.platform == "win32" and "png" in self.formats:
+			poppler_path = ensure_poppler()
+		
+		# Parse and compile the template once for the whole run
+		compiled_template = self.load_compiled_template()
+		if compiled_template is None:
+			return 0
+		
+		stage_count = 1 + int(self.needs_pdf()) + int("png" in self.formats)
+		stage_progress = {"done": 0}
+		progress_lock = threading.Lock()
+		generated_files = []
+		
+		def advance():
+			with progress_lock:
+				stage_progress["done"] += 1
+				self.progress(stage_progress["done"] / (selected_count * stage_count))
+		
+		finish_lock = threading.Lock()
+		
+		def finish(item):
+			# The last stage may run on several threads; keep tracking single-writer
+			idx, filename = item[0]
+			with finish_lock:
+				self._mark_generated(filename)
+				generated_files.append(filename)
+			self.on_generated(idx, filename)
+		
+		def convert(item):
+			key, out_docx, _ = item
+			out_pdf = out_docx[:-len('.docx')] + '.pdf'
+			try:
+				self.pdf_converter.convert(out_docx, out_pdf)
+				if os.path.exists(out_pdf):
+					return key, out_docx, out_pdf
+				self.log(f"Error converting to PDF: {os.path.basename(out_docx)} - no PDF was produced")
+			except Exception as e:
+				self.log(f"Error converting to PDF: {os.path.basename(out_docx)} - {e}")
+			return key, out_docx, None
+		
+		def rasterize(item):
+			key, out_docx, out_pdf = item
+			if out_pdf is not None:
+				try:
+					self._convert_pdf_to_png(out_pdf, poppler_path)
+				except Exception as e:
+					self.log(f"Unexpected error converting to PNG: {os.path.basename(out_pdf)} - {e}")
+			return item
+		
+		# Wire the stages: render -> [convert] -> [rasterize] -> finish
+		# (stage function, thread count); conversion runs one thread per converter instance,
+		# rasterization one thread per Poppler worker
+		stages = []
+		if self.needs_pdf():
+			stages.append((convert, self.pdf_converter.workers))
+		if "png" in self.formats:
+			stages.append((rasterize, self.png_workers))
+		queues = [queue.Queue(maxsize=PIPELINE_QUEUE_SIZE) for _ in stages]
+		threads = []
+		for i, (stage, thread_count) in enumerate(stages):
+			outbox = queues[i + 1] if i + 1 < len(queues) else None
+			stage_state = {"running": thread_count, "lock": threading.Lock()}
+			for _ in range(thread_count):
+				thread = threading.Thread(
+					target=self._run_pipeline_stage,
+					args=(stage, queues[i], outbox, finish, advance, stage_state),
+					daemon=True
+				)
+				thread.start()
+				threads.append(thread)
+		first_stage = queues[0].put if queues else finish
+		
+		def on_docx_rendered(key, out_docx, error):
+			if error:
+				self.log(f"Error creating DOCX for {key[1]}: {error}")
+				return
+			advance()
+			# Blocks while the next stage is PIPELINE_QUEUE_SIZE documents behind
+			first_stage((key, out_docx, None))
+		
+		try:
+			completed = self._render_docx_files(compiled_template, render_jobs, on_docx_rendered)
+		finally:
+			if queues:
+				queues[0].put(_PIPELINE_DONE)
+			for thread in threads:
+				thread.join()
+		
+		if not completed or self.is_cancelled():
+			self.log(f"Generation cancelled. {len(generated_files)} invitations were completed.")
+			return len(generated_files)
+		
+		self.log(f"🎉 Pipeline generation complete! Generated: {len(generated_files)}/{selected_count} invitations")
+		return len(generated_files)
+
+	def _run_pipeline_stage(self, stage, inbox, outbox, finish, advance, stage_state):
+		"""
+		Process documents from inbox until the end marker; pass results to outbox, or finish() for the last stage.
+
+		A failing document (in the stage itself, progress reporting or tracking)
+		is logged and skipped. Whatever happens, the thread reads its inbox up to
+		the end marker and then forwards it, so no stage blocks on a full queue
+		and every thread can be joined.
+		"""
+		done = False
+		try:
+			while True:
+				item = inbox.get()
+				if item is _PIPELINE_DONE:
+					done = True
+					return
+				# After a cancel keep draining so upstream stages never block on a full queue
+				if self.is_cancelled():
+					continue
+				try:
+					result = stage(item)
+					advance()
+					if outbox is not None:
+						outbox.put(result)
+					else:
+						finish(result)
+				except Exception as e:
+					self.log(f"Pipeline stage error: {e}")
+		finally:
+			# Reached without the marker only if logging itself failed: discard the rest of the inbox
+			while not done:
+				done = inbox.get() is _PIPELINE_DONE
+			with stage_state["lock"]:
+				stage_state["running"] -= 1
+				last_thread = stage_state["running"] == 0
+			if not last_thread:
+				# Hand the marker on to the next thread of this stage
+				inbox.put(_PIPELINE_DONE)
+			elif outbox is not None:
+				outbox.put(_PIPELINE_DONE)
+
+	def _generate_normal_mode(self, render_jobs):
+		"""Normal mode: Process each invitation completely before moving to the next"""
+		self.log("🐌 Normal mode: Processing each invitation completely...")
+		output_folder = self.output_folder
+		selected_count = len(render_jobs)
+		
+		# Prepare output folder
+		os.makedirs(output_folder, exist_ok=True)
+
+		# Ensure Poppler is available for pdftoppm
+		poppler_path = None
+		if sys.platform == "win32" and "png" in self.formats:
+			poppler_path = ensure_poppler()
+
+		# Parse and compile the template once for the whole run
+		compiled_template = self.load_compiled_template()
+		if compiled_template is None:
+			return 0
+
+		# Generate invitations for selected invitees only
+		generated_count = 0
+		current_processed = 0
+
+		for (idx, filename), context, out_docx in render_jobs:
+			# Check for cancellation
+			if self.is_cancelled():
+				self.log("Generation cancelled.")
+				return generated_count
+				
+			current_processed += 1
+			
+			try:
+				out_pdf = os.path.join(output_folder, f"Invitation - {filename}.pdf")
+				compiled_template.save(context, out_docx)
+				self.log(f"Saved: {out_docx}")
+				
+				# Convert DOCX to PDF
+				pdf_success = False
+				if self.needs_pdf():
+					try:
+						self.pdf_converter.convert(out_docx, out_pdf)
+						self.log(f"PDF created: {out_pdf}")
+						pdf_success = True
+					except Exception as e:
+						self.log(f"PDF conversion failed: {e}")
+						out_pdf = None
+				
+				# Convert PDF to PNG (first page)
+				png_success = False
+				if "png" in self.formats and pdf_success and os.path.exists(out_pdf):
+					try:
+						png_success = self._convert_pdf_to_png(out_pdf, poppler_path)
+					except Exception as e:
+						self.log(f"PNG conversion failed: {e}")
+				
+				# Mark as generated only if at least the DOCX was created successfully
+				self._mark_generated(filename)
+				generated_count += 1
+				
+				self.on_generated(idx, filename)
+				
+			except Exception as e:
+				self.log(f"Error for {filename}: {e}")
+			
+			# Update progress and log every 10 items to reduce UI updates
+			if current_processed % 10 == 0 or current_processed == selected_count:
+				self.progress(current_processed / selected_count)
+				if current_processed % 10 == 0:
+					self.log(f"Progress: {current_processed}/{selected_count} processed")
+
+		self.log(f"Generation complete. Generated: {generated_count} invitations")
+		return generated_count
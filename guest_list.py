@@ -0,0 +1,60 @@
+import os
+import importlib.util
+
+import pandas as pd
+
+# File dialog filter for every format read_guest_list accepts
+GUEST_LIST_FILETYPES = [
+    ("Guest lists", "*.xlsx *.xlsm *.xls *.csv *.parquet"),
+    ("Excel Files", "*.xlsx *.xlsm *.xls"),
+    ("CSV Files", "*.csv"),
+    ("Parquet Files", "*.parquet"),
+]
+
+EXCEL_EXTENSIONS = (".xlsx", ".xlsm", ".xls")
+CSV_EXTENSIONS = (".csv",)
+PARQUET_EXTENSIONS = (".parquet", ".pq")
+
+# pandas names header cells that are empty "Unnamed: <n>"
+UNNAMED_PREFIX = "Unnamed: "
+
+
+def excel_engine():
+    """The fastest installed pandas engine for .xlsx files; None lets pandas choose (openpyxl, read-only)"""
+    return "calamine" if importlib.util.find_spec("python_calamine") else None
+
+
+def read_guest_list(path, cache=None):
+    """
+    Load a guest list in one pass: header and rows together.
+
+    Excel workbooks go through pandas' read-only reader (python-calamine when
+    installed), or come from a GuestListCache when one is given and the file
+    is unchanged. CSV and Parquet files are read directly. Column labels are
+    always strings.
+    """
+    ext = os.path.splitext(path)[1].lower()
+    if ext in CSV_EXTENSIONS:
+        invitees = pd.read_csv(path)
+    elif ext in PARQUET_EXTENSIONS:
+        invitees = pd.read_parquet(path)
+    elif ext in EXCEL_EXTENSIONS:
+        if cache is not None:
+            invitees = cache.load(path, _read_excel)
+        else:
+            invitees = _read_excel(path)
+    else:
+        raise ValueError(f"Unsupported guest list format: {ext or os.path.basename(path)}")
+    invitees.columns = [str(c) for c in invitees.columns]
+    return invitees
+
+
+def _read_excel(path):
+    invitees = pd.read_excel(path, engine=excel_engine())
+    invitees.columns = [str(c) for c in invitees.columns]
+    return invitees
+
+
+def guest_list_columns(invitees):
+    """Header names offered for mapping, leaving out columns with an empty header cell"""
+    return [c for c in invitees.columns if not c.startswith(UNNAMED_PREFIX)]
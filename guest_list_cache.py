@@ -0,0 +1,136 @@
+import os
+import time
+import sqlite3
+import threading
+import importlib.util
+
+import pandas as pd
+
+from storage import file_digest
+
+# Shared by the generator, the sender and templify-generate
+GUEST_LIST_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".templify", "guest_lists")
+
+# Least recently used entries are evicted once the cached Parquet files exceed this size
+GUEST_LIST_CACHE_MAX_BYTES = 512 * 1024 * 1024
+
+# Bump when parsing changes so frames parsed the old way are not reused
+GUEST_LIST_CACHE_VERSION = 1
+
+
+class GuestListCache:
+    """
+    Parsed guest lists stored as Parquet, so an unchanged workbook opens without re-parsing it.
+
+    Entries are keyed by the workbook's path, size, mtime and SHA-256: a path
+    whose size and mtime are unchanged is not even re-hashed. The Parquet
+    file itself is named by content hash, so a copied or touched workbook
+    with the same bytes reuses it. An SQLite index (WAL mode, safe
+    for both apps at once) records each entry's size and last use, and the
+    least recently used files are evicted beyond max_bytes. Frames Parquet
+    cannot store (columns mixing numbers and text) are returned uncached.
+    Without pyarrow the cache simply parses every time.
+    """
+
+    def __init__(self, cache_dir=GUEST_LIST_CACHE_DIR, max_bytes=GUEST_LIST_CACHE_MAX_BYTES, log=print):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.log = log
+        self._lock = threading.Lock()
+        self._conn = None
+        self.enabled = importlib.util.find_spec("pyarrow") is not None
+        if not self.enabled:
+            return
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            self._conn = sqlite3.connect(os.path.join(cache_dir, "index.db"), check_same_thread=False, timeout=10)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "path TEXT PRIMARY KEY, size INTEGER NOT NULL, mtime_ns INTEGER NOT NULL, "
+                "digest TEXT NOT NULL, file TEXT NOT NULL, bytes INTEGER NOT NULL, last_used REAL NOT NULL)"
+            )
+            self._conn.commit()
+        except (OSError, sqlite3.Error) as e:
+            self.log(f"Warning: Guest list cache unavailable: {e}")
+            self.enabled = False
+
+    def load(self, path, parse):
+        """The DataFrame for path, from the cache when its bytes are unchanged, else parse(path) and store it"""
+        if not self.enabled:
+            return parse(path)
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        digest = self._known_digest(path, stat) or file_digest(path)
+        cache_file = os.path.join(self.cache_dir, f"{digest}-v{GUEST_LIST_CACHE_VERSION}.parquet")
+        if os.path.exists(cache_file):
+            try:
+                invitees = pd.read_parquet(cache_file)
+                self._record(path, stat, digest, cache_file)
+                return invitees
+            except Exception as e:
+                self.log(f"Warning: Cached guest list unreadable, parsing again: {e}")
+        invitees = parse(path)
+        temp_file = cache_file + f".{os.getpid()}.tmp"
+        try:
+            invitees.to_parquet(temp_file)
+            os.replace(temp_file, cache_file)
+        except Exception as e:
+            # Typically a column mixing numbers and text, which Parquet cannot store
+            self.log(f"Guest list not cached: {e}")
+            if os.path.exists(temp_file):
+                os.remove(temp_file)
+            return invitees
+        self._record(path, stat, digest, cache_file)
+        self._evict()
+        return invitees
+
+    def _known_digest(self, path, stat):
+        """The recorded hash when path still has the size and mtime it was cached with"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT digest FROM entries WHERE path = ? AND size = ? AND mtime_ns = ?",
+                (path, stat.st_size, stat.st_mtime_ns)
+            ).fetchone()
+        return row[0] if row else None
+
+    def _record(self, path, stat, digest, cache_file):
+        try:
+            with self._lock, self._conn:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (path, stat.st_size, stat.st_mtime_ns, digest, os.path.basename(cache_file),
+                     os.path.getsize(cache_file), time.time())
+                )
+        except (OSError, sqlite3.Error) as e:
+            self.log(f"Warning: Could not update guest list cache index: {e}")
+
+    def _evict(self):
+        """Delete least recently used Parquet files until the cache fits in max_bytes"""
+        try:
+            with self._lock, self._conn:
+                # Paths sharing a file count once, at their latest use
+                files = self._conn.execute(
+                    "SELECT file, MAX(bytes), MAX(last_used) AS used FROM entries GROUP BY file ORDER BY used"
+                ).fetchall()
+                total = sum(size for _, size, _ in files)
+                # The newest file is always kept
+                for file, size, _ in files[:-1]:
+                    if total <= self.max_bytes:
+                        break
+                    try:
+                        os.remove(os.path.join(self.cache_dir, file))
+                    except FileNotFoundError:
+                        pass
+                    except OSError:
+                        continue  # Still open elsewhere (Windows); retried on the next eviction
+                    self._conn.execute("DELETE FROM entries WHERE file = ?", (file,))
+                    total -= size
+        except sqlite3.Error as e:
+            self.log(f"Warning: Could not evict guest list cache entries: {e}")
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+            self.enabled = False
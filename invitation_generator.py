@@ -2,120 +2,27 @@
 # Standard library imports
 import sys
 import os
-import urllib.request
-import zipfile
-import re
 import threading
-import json
-from datetime import datetime
 
 # Third-party imports
-from pdf2image import convert_from_path
-from docx2pdf import convert as docx2pdf_convert
-from docxtpl import DocxTemplate
-import openpyxl
-import pandas as pd
-
-# Attendee class for OOP
-class Attendee:
-	def __init__(self, data_dict):
-		self.data = data_dict
-
-	def get_context(self, mapping):
-		# mapping: {placeholder: excel_column}
-		context = {}
-		for ph, col in mapping.items():
-			value = self.data.get(col, "")
-			# Convert None, NaN, or empty string to empty string and strip whitespace
-			if value is None or pd.isna(value) or str(value).strip() == "" or str(value).strip().lower() == "nan":
-				context[ph] = ""
-			else:
-				context[ph] = str(value).strip()
-		return context
-
-	def get_filename(self):
-		# Use Name or fallback to first column
-		name = self.data.get("Name") or list(self.data.values())[0]
-		# Clean the name and remove invalid filename characters
-		cleaned_name = str(name).replace('\n', ' ')
-		# Replace invalid Windows filename characters
-		invalid_chars = ['/', '\\', ':', '*', '?', '"', '<', '>', '|']
-		for char in invalid_chars:
-			cleaned_name = cleaned_name.replace(char, ' ')
-		# Remove dots and normalize spaces
-		cleaned_name = ' '.join(part.replace('.', '') for part in cleaned_name.split())
-		return cleaned_name
-
+import numpy as np
+
+# Local imports
+from docx_render import PLACEHOLDER_PATTERN
+from generation import GenerationTracker, InvitationGenerator, invitee_metadata
+from pdf_convert import PDF_CONVERTERS, create_pdf_converter
+from folder_index import INVITATION_PREFIX, FolderIndex
+from guest_list import GUEST_LIST_FILETYPES, guest_list_columns, read_guest_list
+from guest_list_cache import GuestListCache
+from rasterize import PNG_DPI, PngOptions
+from selection_model import SelectionModel
+from virtual_list import VirtualList
 
 # Modern GUI for invitation generation
 import customtkinter as ctk
 from tkinter import filedialog, messagebox
 
 
-
-
-# Ensure Poppler is available for pdf2image (Windows only)
-def ensure_poppler():
-	"""
-	Download and extract Poppler for Windows if not already present.
-	Returns the bin path containing pdftoppm.exe for pdf2image.
-	"""
-	if sys.platform != "win32":
-		print("Non-Windows system detected, assuming Poppler is system-installed")
-		return None
-		
-	print("Checking for Poppler installation...")
-	
-	# Explicitly check the expected path
-	poppler_bin = os.path.join(os.path.dirname(__file__), "poppler", "poppler-23.11.0", "Library", "bin")
-	pdftoppm_path = os.path.join(poppler_bin, "pdftoppm.exe")
-	
-	if os.path.exists(pdftoppm_path):
-		print(f"Poppler found at: {poppler_bin}")
-		return poppler_bin
-		
-	# Fallback: search all subfolders for pdftoppm.exe
-	poppler_dir = os.path.join(os.path.dirname(__file__), "poppler")
-	print(f"Searching for Poppler in: {poppler_dir}")
-	
-	for root, dirs, files in os.walk(poppler_dir):
-		if "pdftoppm.exe" in files:
-			print(f"Found existing Poppler at: {root}")
-			return root
-			
-	# Download and extract Poppler if not found
-	print("Poppler not found, attempting download...")
-	
-	try:
-		url = "https://github.com/oschwartz10612/poppler-windows/releases/download/v23.11.0-0/Release-23.11.0-0.zip"
-		zip_path = os.path.join(poppler_dir, "poppler.zip")
-		os.makedirs(poppler_dir, exist_ok=True)
-		
-		print("Downloading Poppler from GitHub...")
-		urllib.request.urlretrieve(url, zip_path)
-		
-		print("Extracting Poppler...")
-		with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-			zip_ref.extractall(poppler_dir)
-		os.remove(zip_path)
-		
-		# Find the extracted folder
-		for root, dirs, files in os.walk(poppler_dir):
-			if "pdftoppm.exe" in files:
-				print(f"Poppler successfully installed at: {root}")
-				return root
-				
-		print("ERROR: Poppler download completed but pdftoppm.exe not found")
-		return None
-		
-	except Exception as e:
-		print(f"ERROR: Failed to download/extract Poppler: {e}")
-		print("Manual installation required:")
-		print("1. Download Poppler from: https://github.com/oschwartz10612/poppler-windows/releases")
-		print("2. Extract to a 'poppler' folder next to this script")
-		print("3. Ensure pdftoppm.exe is accessible")
-		return None
-
 class InvitationGeneratorApp(ctk.CTk):
 
 	def __init__(self):
@@ -137,25 +44,47 @@ class InvitationGeneratorApp(ctk.CTk):
 		
 		# Fast mode toggle
 		self.fast_mode = ctk.BooleanVar(value=False)
+		
+		# Pipeline mode toggle (takes precedence over fast mode)
+		self.pipeline_mode = ctk.BooleanVar(value=False)
+		
+		# Skip selected rows whose template, data and settings match their existing files
+		self.skip_unchanged = ctk.BooleanVar(value=True)
+		
+		# Worker processes for fast/pipeline mode DOCX rendering
+		self.render_workers = ctk.StringVar(value=str(os.cpu_count() or 1))
+		self.png_workers = ctk.StringVar(value=str(os.cpu_count() or 1))
+		
+		# PNG output settings; blank width/colours keep the plain DPI render
+		self.png_dpi = ctk.StringVar(value=str(PNG_DPI))
+		self.png_width = ctk.StringVar(value="")
+		self.png_colors = ctk.StringVar(value="")
+		self.png_compression = ctk.StringVar(value="")
+		
+		# PDF conversion backend and its instance count (LibreOffice only)
+		self.pdf_converter_name = ctk.StringVar(value="word" if sys.platform in ("win32", "darwin") else "libreoffice")
+		self.pdf_workers = ctk.StringVar(value="2")
+		self._pdf_converter = None  # Kept across runs so LibreOffice instances stay warm
+		self._folder_index = None
 
 		# Initialize generation tracking
-		self.tracking_file = "generated_invitations.json"
-		self.generated_invitations = self.load_generated_invitations()
+		self.tracking_file = "generated_invitations.db"
+		self.tracker = GenerationTracker(self.tracking_file, log=self.log)
+		
+		# Parsed workbooks cached as Parquet, shared with the sender
+		self.guest_list_cache = GuestListCache(log=self.log)
 		
 		# Cancel flag for generation process
 		self.is_generating = False
-		
-		# Pagination for large datasets
-		self.items_per_page = 25
-		self.current_page = 0
-		self.total_pages = 0
 
 		# Initialize selection tracking for invitees
-		self.selected_invitees = {}  # Dictionary to track checkbox states
+		self.selection = SelectionModel()  # Checkbox state of every row, by position
 		self.invitees = None  # Will hold the DataFrame of invitees
+		self.invitee_meta = None  # Filename, display name, key and status per row
 
 		# UI Elements
 		self.create_widgets()
+		self.protocol("WM_DELETE_WINDOW", self.on_close)
 
 	def create_widgets(self):
 		# Title at the top
@@ -228,6 +157,58 @@ class InvitationGeneratorApp(ctk.CTk):
 			font=("Arial", 9), 
 			text_color="gray"
 		).pack(side="left", padx=(10, 0))
+		pipeline_toggle_frame = ctk.CTkFrame(fast_mode_frame, fg_color="transparent")
+		pipeline_toggle_frame.pack(fill="x", padx=5, pady=(0, 5))
+		self.pipeline_toggle = ctk.CTkCheckBox(
+			pipeline_toggle_frame, 
+			text="Pipeline Mode (Streaming)", 
+			variable=self.pipeline_mode,
+			font=("Arial", 11)
+		)
+		self.pipeline_toggle.pack(side="left", padx=5)
+		ctk.CTkLabel(
+			pipeline_toggle_frame, 
+			text="🔀 Overlaps DOCX, PDF and PNG stages; files finish one by one", 
+			font=("Arial", 9), 
+			text_color="gray"
+		).pack(side="left", padx=(10, 0))
+		cache_toggle_frame = ctk.CTkFrame(fast_mode_frame, fg_color="transparent")
+		cache_toggle_frame.pack(fill="x", padx=5, pady=(0, 5))
+		ctk.CTkCheckBox(
+			cache_toggle_frame, 
+			text="Skip Unchanged", 
+			variable=self.skip_unchanged,
+			font=("Arial", 11)
+		).pack(side="left", padx=5)
+		ctk.CTkLabel(
+			cache_toggle_frame, 
+			text="♻️ Only re-renders rows whose data, template or settings changed", 
+			font=("Arial", 9), 
+			text_color="gray"
+		).pack(side="left", padx=(10, 0))
+		workers_frame = ctk.CTkFrame(fast_mode_frame, fg_color="transparent")
+		workers_frame.pack(fill="x", padx=5, pady=(0, 5))
+		ctk.CTkLabel(workers_frame, text="Render workers:", font=("Arial", 11)).pack(side="left", padx=5)
+		ctk.CTkEntry(workers_frame, textvariable=self.render_workers, width=50).pack(side="left")
+		ctk.CTkLabel(workers_frame, text="PNG workers:", font=("Arial", 11)).pack(side="left", padx=(10, 5))
+		ctk.CTkEntry(workers_frame, textvariable=self.png_workers, width=50).pack(side="left")
+		ctk.CTkLabel(
+			workers_frame, 
+			text="Processes used for DOCX rendering and PNG rasterizing", 
+			font=("Arial", 9), 
+			text_color="gray"
+		).pack(side="left", padx=(10, 0))
+		converter_frame = ctk.CTkFrame(fast_mode_frame, fg_color="transparent")
+		converter_frame.pack(fill="x", padx=5, pady=(0, 5))
+		ctk.CTkLabel(converter_frame, text="PDF converter:", font=("Arial", 11)).pack(side="left", padx=5)
+		ctk.CTkOptionMenu(converter_frame, variable=self.pdf_converter_name, values=list(PDF_CONVERTERS), width=110).pack(side="left")
+		ctk.CTkLabel(converter_frame, text="Instances:", font=("Arial", 11)).pack(side="left", padx=(10, 5))
+		ctk.CTkEntry(converter_frame, textvariable=self.pdf_workers, width=50).pack(side="left")
+		png_frame = ctk.CTkFrame(fast_mode_frame, fg_color="transparent")
+		png_frame.pack(fill="x", padx=5, pady=(0, 5))
+		for label, variable in (("PNG DPI:", self.png_dpi), ("Width px:", self.png_width), ("Colours:", self.png_colors), ("zlib 0-9:", self.png_compression)):
+			ctk.CTkLabel(png_frame, text=label, font=("Arial", 11)).pack(side="left", padx=(5, 5))
+			ctk.CTkEntry(png_frame, textvariable=variable, width=50).pack(side="left", padx=(0, 5))
 
 		# Progress bar
 		progress_frame = ctk.CTkFrame(left_column)
@@ -249,21 +230,14 @@ class InvitationGeneratorApp(ctk.CTk):
 		# Invitees list with status
 		ctk.CTkLabel(right_column, text="Invitees Selection", font=("Arial", 16, "bold")).pack(pady=(10, 5))
 		
-		# Header with refresh and pagination buttons
+		# Header with item count and refresh button
 		header_frame = ctk.CTkFrame(right_column)
 		header_frame.pack(fill="x", padx=10, pady=(0, 5))
 		
-		# Pagination controls
-		self.prev_page_btn = ctk.CTkButton(header_frame, text="← Prev", width=80, command=self.prev_page, state="disabled")
-		self.prev_page_btn.pack(side="left", padx=5)
-		
-		self.page_label = ctk.CTkLabel(header_frame, text="Page 1 of 1")
-		self.page_label.pack(side="left", padx=10)
+		self.count_label = ctk.CTkLabel(header_frame, text="No items")
+		self.count_label.pack(side="left", padx=10)
 		
-		self.next_page_btn = ctk.CTkButton(header_frame, text="Next →", width=80, command=self.next_page, state="disabled")
-		self.next_page_btn.pack(side="left", padx=5)
-		
-		self.refresh_btn = ctk.CTkButton(header_frame, text="Refresh", width=80, command=self.update_invitees_list)
+		self.refresh_btn = ctk.CTkButton(header_frame, text="Refresh", width=80, command=self.refresh_invitees_list)
 		self.refresh_btn.pack(side="right", padx=5)
 		
 		# Selection buttons frame
@@ -276,10 +250,9 @@ class InvitationGeneratorApp(ctk.CTk):
 		self.select_ungenerated_btn = ctk.CTkButton(selection_frame, text="Select New", width=90, command=self.select_ungenerated_invitees)
 		self.select_ungenerated_btn.pack(side="left", padx=2)
 		
-		# Scrollable frame for invitees
-		self.invitees_scrollable_frame = ctk.CTkScrollableFrame(right_column)
-		self.invitees_scrollable_frame.pack(fill="both", expand=True, padx=10, pady=(0, 5))
-		self.invitee_labels = {}  # Store labels for updating
+		# Virtual list for invitees: a fixed pool of row widgets rebound while scrolling
+		self.invitees_list = VirtualList(right_column, self._create_invitee_row, self._bind_invitee_row)
+		self.invitees_list.pack(fill="both", expand=True, padx=10, pady=(0, 5))
 		
 		# Generate button at bottom of right column
 		generate_frame = ctk.CTkFrame(right_column)
@@ -294,40 +267,6 @@ class InvitationGeneratorApp(ctk.CTk):
 		)
 		self.generate_btn.pack(pady=5, fill="x", padx=10)
 
-	def prev_page(self):
-		"""Go to previous page"""
-		if self.current_page > 0:
-			self.current_page -= 1
-			self.update_invitees_list()
-
-	def next_page(self):
-		"""Go to next page"""
-		if self.current_page < self.total_pages - 1:
-			self.current_page += 1
-			self.update_invitees_list()
-
-	def update_pagination_controls(self):
-		"""Update pagination button states and labels"""
-		if self.invitees is None or self.invitees.empty:
-			self.total_pages = 0
-			self.current_page = 0
-		else:
-			self.total_pages = (len(self.invitees) + self.items_per_page - 1) // self.items_per_page
-			if self.current_page >= self.total_pages:
-				self.current_page = max(0, self.total_pages - 1)
-		
-		# Update buttons
-		self.prev_page_btn.configure(state="normal" if self.current_page > 0 else "disabled")
-		self.next_page_btn.configure(state="normal" if self.current_page < self.total_pages - 1 else "disabled")
-		
-		# Update label
-		if self.total_pages > 0:
-			start_item = self.current_page * self.items_per_page + 1
-			end_item = min((self.current_page + 1) * self.items_per_page, len(self.invitees))
-			self.page_label.configure(text=f"Items {start_item}-{end_item} of {len(self.invitees)} (Page {self.current_page + 1} of {self.total_pages})")
-		else:
-			self.page_label.configure(text="No items")
-
 	def select_template(self):
 		path = filedialog.askopenfilename(filetypes=[("Word Documents", "*.docx")])
 		if path:
@@ -361,42 +300,54 @@ class InvitationGeneratorApp(ctk.CTk):
 								if elem.tag.endswith('}t'):
 									texts.append(elem.text or '')
 							joined_text = ''.join(texts)
-							found.update(re.findall(r'{{\s*(\w+)\s*}}', joined_text))
+							found.update(PLACEHOLDER_PATTERN.findall(joined_text))
 						except Exception:
 							# Fallback: regex on raw xml
-							found.update(re.findall(r'{{\s*(\w+)\s*}}', xml))
+							found.update(PLACEHOLDER_PATTERN.findall(xml))
 		self.log(f"Found placeholders: {', '.join(found)}")
 		return list(found)
 
 	def select_excel(self):
-		path = filedialog.askopenfilename(filetypes=[("Excel Files", "*.xlsx;*.xls")])
+		path = filedialog.askopenfilename(filetypes=GUEST_LIST_FILETYPES)
 		if path:
 			self.excel_path.set(path)
 			self.log(f"Selected Excel: {path}")
-			self.excel_columns = self.extract_excel_columns(path)
+			# Header and rows come from the same single read
 			self.load_invitees(path)
+			self.excel_columns = self.extract_excel_columns()
 			# Reset selections when loading new file
 			self.reset_all_selections()
-			self.current_page = 0  # Reset to first page
 			self.update_mapping_dropdowns()
-			self.update_invitees_list()
+			self.update_invitees_list(first=0)  # Back to the top of the list
 
 	def load_invitees(self, excel_path):
-		"""Load invitees from Excel file"""
+		"""Load invitees from an Excel, CSV or Parquet file"""
 		try:
-			import pandas as pd
-			self.invitees = pd.read_excel(excel_path)
+			self.invitees = read_guest_list(excel_path, self.guest_list_cache)
+			# Derive every row's filename, display name and key once per workbook
+			self.invitee_meta = invitee_metadata(self.invitees)
+			self.refresh_generated_status()
 			self.log(f"Loaded {len(self.invitees)} invitees from Excel.")
 		except Exception as e:
 			self.log(f"Error loading invitees: {e}")
 			self.invitees = None
+			self.invitee_meta = None
 
-	def extract_excel_columns(self, excel_path):
-		wb = openpyxl.load_workbook(excel_path)
-		ws = wb.active
-		columns = [cell.value for cell in next(ws.iter_rows(min_row=1, max_row=1))]
-		self.log(f"Excel columns: {', '.join([str(c) for c in columns if c])}")
-		return [str(c) for c in columns if c]
+	def refresh_generated_status(self):
+		"""Re-read the generated flag of every row from the tracker in one bulk lookup"""
+		if self.invitee_meta is None:
+			return
+		filenames = self.invitee_meta['filename']
+		generated = self.tracker.generated_names(filenames.unique())
+		self.invitee_meta['is_generated'] = filenames.isin(generated)
+
+	def extract_excel_columns(self):
+		"""Column names of the loaded invitees, for the mapping dropdowns"""
+		if self.invitees is None:
+			return []
+		columns = guest_list_columns(self.invitees)
+		self.log(f"Excel columns: {', '.join(columns)}")
+		return columns
 
 	def update_mapping_dropdowns(self):
 		# Clear previous
@@ -420,200 +371,96 @@ class InvitationGeneratorApp(ctk.CTk):
 			self.output_folder.set(path)
 			self.log(f"Output folder set to: {path}")
 
-	def update_invitees_list(self):
-		"""Update the invitees list with checkboxes - optimized with pagination"""
-		self.clear_invitees_list()
-		
-		if self.invitees is None or self.invitees.empty:
-			self.update_pagination_controls()
-			return
-
-		# Update pagination controls
-		self.update_pagination_controls()
-		
-		# Calculate which items to show
-		start_idx = self.current_page * self.items_per_page
-		end_idx = min(start_idx + self.items_per_page, len(self.invitees))
-		
-		# Only create widgets for visible items
-		visible_invitees = self.invitees.iloc[start_idx:end_idx]
-		
-		# Batch process attendee data first (faster than creating UI widgets)
-		attendee_data = []
-		for idx, row in visible_invitees.iterrows():
-			# Convert row to dict format that Attendee expects
-			data = row.to_dict()
-			data = {str(k): v for k, v in data.items()}
-			
-			# Create Attendee object to get consistent filename
-			attendee = Attendee(data)
-			filename = attendee.get_filename()
-			
-			# Also get a display name (original, unprocessed)
-			name_columns = ['Name', 'name', 'Full Name', 'full_name']
-			display_name = None
-			for col in name_columns:
-				if col in row and pd.notna(row[col]):
-					display_name = str(row[col]).strip()
-					break
-			
-			if not display_name:
-				# Fallback to first non-null column
-				for col_name, value in row.items():
-					if pd.notna(value) and str(value).strip():
-						display_name = str(value).strip()
-						break
-				if not display_name:
-					display_name = f"Row {idx + 1}"
-			
-			# Check generation status
-			is_generated = self.was_invitation_generated(filename)
-			
-			attendee_data.append({
-				'idx': idx,
-				'display_name': display_name,
-				'filename': filename,
-				'is_generated': is_generated
-			})
-		
-		# Now create UI elements in batch
-		for data in attendee_data:
-			self._create_invitee_widget(data)
-
-	def _create_invitee_widget(self, data):
-		"""Create UI widget for a single invitee"""
-		idx = data['idx']
-		display_name = data['display_name'] 
-		filename = data['filename']
-		is_generated = data['is_generated']
-		
-		# Use the processed filename for the key (consistent with tracking)
-		key = f"{idx}|{filename}"
-		
-		# Create frame for this invitee
-		frame = ctk.CTkFrame(self.invitees_scrollable_frame)
-		frame.pack(fill="x", padx=2, pady=1)
-		
-		# Checkbox for selection
-		checkbox_var = ctk.BooleanVar()
-		checkbox = ctk.CTkCheckBox(frame, text="", variable=checkbox_var, width=20)
-		checkbox.pack(side="left", padx=5)
-		
-		# Store or restore checkbox variable
-		if key in self.selected_invitees:
-			# Restore previous selection state
-			previous_state = self.selected_invitees[key].get()
-			checkbox_var.set(previous_state)
-		else:
-			# Set default selection based on generation status
-			if is_generated:
-				checkbox_var.set(False)  # Don't select already generated
-			else:
-				checkbox_var.set(True)  # Select ungenerated by default
-		
-		# Update/store checkbox variable for later use
-		self.selected_invitees[key] = checkbox_var
+	def update_invitees_list(self, first=None):
+		"""Point the virtual list at the loaded invitees and redraw the visible rows"""
+		count = 0 if self.invitee_meta is None else len(self.invitee_meta)
+		self.count_label.configure(text=f"{count} invitees" if count else "No items")
+		self.invitees_list.set_count(count, first)
+
+	def refresh_invitees_list(self):
+		"""Re-read generation status, then redraw the visible rows"""
+		self.refresh_generated_status()
+		self.update_invitees_list()
+
+	def _create_invitee_row(self, parent, height):
+		"""Create one pooled row widget; _bind_invitee_row fills it with data"""
+		row = ctk.CTkFrame(parent, height=height)
+		row.pack_propagate(False)  # Keep the fixed row height the list scrolls by
+		row.position = None
+		
+		# Checkbox for selection, writing back to the selection model
+		row.checkbox_var = ctk.BooleanVar()
+		ctk.CTkCheckBox(
+			row, text="", variable=row.checkbox_var, width=20,
+			command=lambda: self.selection.set(row.position, row.checkbox_var.get())
+		).pack(side="left", padx=5)
 		
 		# Name display (show the original display name)
-		info_label = ctk.CTkLabel(frame, text=display_name, anchor="w")
-		info_label.pack(side="left", padx=5, fill="x", expand=True)
+		row.info_label = ctk.CTkLabel(row, text="", anchor="w")
+		row.info_label.pack(side="left", padx=5, fill="x", expand=True)
 		
 		# Status label
-		status_label = ctk.CTkLabel(frame, text="", anchor="e", width=120)
-		status_label.pack(side="right", padx=5)
-		
-		# Store label reference for updates
-		self.invitee_labels[key] = status_label
-		
-		# Update status
+		row.status_label = ctk.CTkLabel(row, text="", anchor="e", width=120)
+		row.status_label.pack(side="right", padx=5)
+		return row
+
+	def _bind_invitee_row(self, row, position):
+		"""Show the invitee at a row position in a pooled row widget"""
+		meta = self.invitee_meta
+		is_generated = bool(meta['is_generated'].iat[position])
+		row.position = position
+		# Rows shown for the first time default to selected unless already generated
+		row.checkbox_var.set(bool(self.selection.show([position], [not is_generated])[0]))
+		row.info_label.configure(text=meta['display_name'].iat[position])
 		if is_generated:
-			status_label.configure(text="Generated ✓", text_color="green")
+			row.status_label.configure(text="Generated ✓", text_color="green")
 		else:
-			status_label.configure(text="Not generated", text_color="gray")
-
-	def clear_invitees_list(self):
-		"""Clear all invitee widgets but preserve selection state"""
-		for widget in self.invitees_scrollable_frame.winfo_children():
-			widget.destroy()
-		self.invitee_labels = {}
-		# DON'T clear selected_invitees - preserve selections across pages
+			row.status_label.configure(text="Not generated", text_color="gray")
 
 	def reset_all_selections(self):
 		"""Completely reset all selections (used when loading new Excel file)"""
-		self.selected_invitees = {}
+		self.selection.reset(0 if self.invitees is None else len(self.invitees))
+
+	def sync_visible_checkboxes(self):
+		"""Show the selection model's state on the checkboxes currently on screen"""
+		self.invitees_list.refresh()
 
 	def select_all_invitees(self):
-		"""Select all invitees for generation (across all pages)"""
+		"""Select all invitees for generation (whole workbook)"""
 		if self.invitees is None or self.invitees.empty:
 			return
 			
-		count = 0
 		# Work with all invitees, not just visible ones
-		for idx, row in self.invitees.iterrows():
-			data = row.to_dict()
-			data = {str(k): v for k, v in data.items()}
-			attendee = Attendee(data)
-			filename = attendee.get_filename()
-			key = f"{idx}|{filename}"
+		count = len(self.invitee_meta)
+		self.selection.assign(np.ones(count, dtype=bool))
+		self.sync_visible_checkboxes()
 			
-			# Create checkbox variable if it doesn't exist
-			if key not in self.selected_invitees:
-				self.selected_invitees[key] = ctk.BooleanVar()
-			
-			self.selected_invitees[key].set(True)
-			count += 1
-			
-		self.log(f"Selected all {count} invitees (across all pages).")
+		self.log(f"Selected all {count} invitees.")
 
 	def select_none_invitees(self):
-		"""Deselect all invitees (across all pages)"""
+		"""Deselect all invitees (whole workbook)"""
 		if self.invitees is None or self.invitees.empty:
 			return
 			
-		count = 0
 		# Work with all invitees, not just visible ones  
-		for idx, row in self.invitees.iterrows():
-			data = row.to_dict()
-			data = {str(k): v for k, v in data.items()}
-			attendee = Attendee(data)
-			filename = attendee.get_filename()
-			key = f"{idx}|{filename}"
-			
-			# Create checkbox variable if it doesn't exist
-			if key not in self.selected_invitees:
-				self.selected_invitees[key] = ctk.BooleanVar()
-				
-			self.selected_invitees[key].set(False)
-			count += 1
+		count = len(self.invitee_meta)
+		self.selection.assign(np.zeros(count, dtype=bool))
+		self.sync_visible_checkboxes()
 			
 		self.log(f"Deselected all {count} invitees.")
 
 	def select_ungenerated_invitees(self):
-		"""Select only invitees who haven't been generated yet (across all pages)"""
+		"""Select only invitees who haven't been generated yet (whole workbook)"""
 		if self.invitees is None or self.invitees.empty:
 			return
 			
-		selected_count = 0
-		total_count = 0
-		
 		# Work with all invitees, not just visible ones
-		for idx, row in self.invitees.iterrows():
-			data = row.to_dict()
-			data = {str(k): v for k, v in data.items()}
-			attendee = Attendee(data)
-			filename = attendee.get_filename()
-			key = f"{idx}|{filename}"
-			
-			# Create checkbox variable if it doesn't exist
-			if key not in self.selected_invitees:
-				self.selected_invitees[key] = ctk.BooleanVar()
-			
-			total_count += 1
-			if not self.was_invitation_generated(filename):
-				self.selected_invitees[key].set(True)
-				selected_count += 1
-			else:
-				self.selected_invitees[key].set(False)
+		self.refresh_generated_status()
+		ungenerated = ~self.invitee_meta['is_generated'].to_numpy(dtype=bool)
+		self.selection.assign(ungenerated)
+		self.sync_visible_checkboxes()
+		selected_count = int(ungenerated.sum())
+		total_count = len(ungenerated)
 				
 		self.log(f"Selected {selected_count} ungenerated invitees out of {total_count} total.")
 
@@ -627,28 +474,15 @@ class InvitationGeneratorApp(ctk.CTk):
 		self.log_text.see("end")
 		self.log_text.configure(state="disabled")
 
-	def load_generated_invitations(self):
-		"""Load the record of generated invitations from JSON file"""
-		if os.path.exists(self.tracking_file):
-			try:
-				with open(self.tracking_file, 'r') as f:
-					return json.load(f)
-			except json.JSONDecodeError:
-				self.log("Warning: Generation tracking file corrupted, starting fresh.")
-				return {}
-		return {}
-
-	def save_generated_invitations(self):
-		"""Save the record of generated invitations to JSON file"""
-		try:
-			with open(self.tracking_file, 'w') as f:
-				json.dump(self.generated_invitations, f, indent=2)
-		except Exception as e:
-			self.log(f"Warning: Could not save generation tracking: {e}")
-
 	def was_invitation_generated(self, name):
 		"""Check if invitation was already generated for this person"""
-		return name in self.generated_invitations
+		return self.tracker.was_generated(name)
+
+	def get_folder_index(self, folder):
+		"""Index of invitation files in folder, kept across lookups and refreshed when the folder changes"""
+		if self._folder_index is None or self._folder_index.folder != folder:
+			self._folder_index = FolderIndex(folder)
+		return self._folder_index
 
 	def find_existing_invitation_files(self, name):
 		"""Find existing invitation files, trying different filename variations for backward compatibility"""
@@ -656,70 +490,16 @@ class InvitationGeneratorApp(ctk.CTk):
 		if not output_folder or not os.path.exists(output_folder):
 			return None
 			
-		# Try the current cleaned filename first
-		cleaned_name = self.get_filename_from_name(name)
-		primary_files = {
-			'docx': os.path.join(output_folder, f"Invitation - {cleaned_name}.docx"),
-			'pdf': os.path.join(output_folder, f"Invitation - {cleaned_name}.pdf"),
-			'png': os.path.join(output_folder, f"Invitation - {cleaned_name}.png")
+		# Current cleaned filename, then legacy variations, then fuzzy match - all from the folder index
+		stem = self.get_folder_index(output_folder).find(name, self.get_filename_from_name(name), "docx")
+		if stem is None:
+			return None
+		base_path = os.path.join(output_folder, f"{INVITATION_PREFIX}{stem}")
+		return {
+			'docx': base_path + '.docx',
+			'pdf': base_path + '.pdf',
+			'png': base_path + '.png'
 		}
-		
-		if os.path.exists(primary_files['docx']):
-			return primary_files
-		
-		# Try various legacy processing variations for backward compatibility
-		variations = [
-			# Legacy processing (old get_filename logic)
-			str(name).replace("\n", " ").replace(".", "").replace('"', "'").strip(),
-			# Raw name with just quote replacement
-			str(name).replace('"', "'"),
-			# Raw name with no processing
-			str(name),
-			# Name with just space normalization (but keeping leading/trailing)
-			str(name).replace("\n", " ").replace(".", "").replace('"', "'"),
-			# Legacy with slash replacement (in case files were created with slash handling)
-			str(name).replace("\n", " ").replace(".", "").replace('"', "'").replace("/", " ").replace("\\", " ").strip(),
-		]
-		
-		for variation in variations:
-			# Try exact variation
-			files = {
-				'docx': os.path.join(output_folder, f"Invitation - {variation}.docx"),
-				'pdf': os.path.join(output_folder, f"Invitation - {variation}.pdf"),
-				'png': os.path.join(output_folder, f"Invitation - {variation}.png")
-			}
-			if os.path.exists(files['docx']):
-				return files
-				
-			# Also try with potential extra space after dash (leading space in name)
-			files_extra_space = {
-				'docx': os.path.join(output_folder, f"Invitation -  {variation}.docx"),
-				'pdf': os.path.join(output_folder, f"Invitation -  {variation}.pdf"),
-				'png': os.path.join(output_folder, f"Invitation -  {variation}.png")
-			}
-			if os.path.exists(files_extra_space['docx']):
-				return files_extra_space
-		
-		# Try fuzzy matching as last resort
-		name_parts = cleaned_name.lower().split()
-		if name_parts and os.path.exists(output_folder):
-			try:
-				for filename in os.listdir(output_folder):
-					if filename.startswith("Invitation - ") and filename.endswith(".docx"):
-						file_name_part = filename[13:-5].lower()  # Remove "Invitation - " and ".docx"
-						# Check if all name parts are present in the filename
-						if all(part in file_name_part for part in name_parts):
-							base_path = os.path.join(output_folder, filename[:-5])  # Remove .docx
-							fuzzy_files = {
-								'docx': base_path + '.docx',
-								'pdf': base_path + '.pdf',
-								'png': base_path + '.png'
-							}
-							return fuzzy_files
-			except OSError:
-				pass  # Handle permission errors gracefully
-		
-		return None
 
 	def get_filename_from_name(self, name):
 		"""Get filename from name using the same logic as Attendee.get_filename()"""
@@ -731,13 +511,67 @@ class InvitationGeneratorApp(ctk.CTk):
 		# Remove dots and normalize spaces
 		return ' '.join(part.replace('.', '') for part in cleaned_name.split())
 
-	def mark_invitation_generated(self, name, output_folder):
-		"""Mark invitation as generated for this person"""
-		self.generated_invitations[name] = {
-			"generated_date": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-			"output_folder": output_folder
-		}
-		self.save_generated_invitations()
+	def get_generation_mode(self):
+		"""Processing mode selected by the toggles (see generation.GENERATION_MODES)"""
+		if self.pipeline_mode.get():
+			return "pipeline"
+		if self.fast_mode.get():
+			return "fast"
+		return "normal"
+
+	def get_render_workers(self):
+		"""Number of DOCX rendering processes, falling back to 1 on invalid input"""
+		try:
+			return max(1, int(self.render_workers.get()))
+		except ValueError:
+			return 1
+
+	def get_png_workers(self):
+		"""Number of concurrent Poppler processes, falling back to 1 on invalid input"""
+		try:
+			return max(1, int(self.png_workers.get()))
+		except ValueError:
+			return 1
+
+	def get_png_options(self):
+		"""Build PNG output settings from the entries; blank or invalid values use the defaults"""
+		def read_int(variable, low, high):
+			try:
+				value = int(variable.get())
+			except ValueError:
+				return None
+			return value if low <= value <= high else None
+		
+		return PngOptions(
+			dpi=read_int(self.png_dpi, 30, 1200) or PNG_DPI,
+			width=read_int(self.png_width, 16, 20000),
+			compress_level=read_int(self.png_compression, 0, 9),
+			colors=read_int(self.png_colors, 2, 256)
+		)
+
+	def get_pdf_converter(self):
+		"""Return the selected PDF converter, reusing the running one when the settings are unchanged"""
+		name = self.pdf_converter_name.get()
+		try:
+			workers = max(1, int(self.pdf_workers.get()))
+		except ValueError:
+			workers = 1
+		converter = self._pdf_converter
+		if converter is not None and (converter.name != name or (name == "libreoffice" and converter.workers != workers)):
+			converter.close()
+			converter = None
+		if converter is None:
+			converter = create_pdf_converter(name, workers, log=self.log)
+		self._pdf_converter = converter
+		return converter
+
+	def on_close(self):
+		"""Shut down warm PDF converter instances and the tracking database before closing the window"""
+		if self._pdf_converter is not None:
+			self._pdf_converter.close()
+		self.tracker.close()
+		self.guest_list_cache.close()
+		self.destroy()
 
 	def generate_invitations(self):
 		if self.is_generating:
@@ -785,14 +619,9 @@ class InvitationGeneratorApp(ctk.CTk):
 			self.log("No invitees data loaded.")
 			return
 
-		# Count selected invitees
-		selected_count = 0
-		selected_indices = []
-		for key, checkbox_var in self.selected_invitees.items():
-			if checkbox_var.get():
-				idx, name = key.split("|", 1)
-				selected_indices.append(int(idx))
-				selected_count += 1
+		# Selected rows come from the selection model, without touching Tk from this thread
+		selected_indices = self.invitee_meta.index[self.selection.selected_positions()].tolist()
+		selected_count = len(selected_indices)
 
 		if selected_count == 0:
 			self.log("No invitees selected for generation.")
@@ -800,362 +629,41 @@ class InvitationGeneratorApp(ctk.CTk):
 
 		self.log(f"Starting to generate {selected_count} selected invitations...")
 		
-		# Check if fast mode is enabled
-		if self.fast_mode.get():
-			self._generate_fast_mode(template_path, output_folder, mapping, selected_indices, selected_count)
-		else:
-			self._generate_normal_mode(template_path, output_folder, mapping, selected_indices, selected_count)
-
-	def _generate_fast_mode(self, template_path, output_folder, mapping, selected_indices, selected_count):
-		"""Fast mode: Process in bulk stages - DOCX, then PDF, then PNG"""
-		self.log("🚀 Fast mode enabled - Processing in bulk stages...")
-		
-		# Prepare output folder
-		os.makedirs(output_folder, exist_ok=True)
-		
-		# Ensure Poppler is available for pdf2image
-		poppler_path = None
-		if sys.platform == "win32":
-			poppler_path = ensure_poppler()
-		
-		generated_files = []
-		docx_files = []
-		pdf_files = []
-		
-		# STAGE 1: Generate all DOCX files
-		self.log("📄 Stage 1/3: Generating DOCX files...")
-		docx_generated = 0
-		
-		for i, idx in enumerate(selected_indices):
-			if not self.is_generating:
-				self.log("Generation cancelled.")
-				return
-				
-			row = self.invitees.iloc[idx]
-			data = row.to_dict()
-			data = {str(k): v for k, v in data.items()}
-			
-			attendee = Attendee(data)
-			context = attendee.get_context(mapping)
-			filename = attendee.get_filename()
-			
-			try:
-				doc = DocxTemplate(template_path)
-				doc.render(context)
-				out_docx = os.path.join(output_folder, f"Invitation - {filename}.docx")
-				doc.save(out_docx)
-				
-				docx_files.append(out_docx)
-				generated_files.append(filename)
-				docx_generated += 1
-				
-				# Update progress
-				progress = (i + 1) / (selected_count * 3)  # 3 stages total
-				self.after(0, self.progress.set, progress)
-				
-			except Exception as e:
-				self.log(f"Error creating DOCX for {filename}: {e}")
-		
-		self.log(f"✅ Stage 1 complete: {docx_generated}/{selected_count} DOCX files created")
-		
-		# STAGE 2: Convert all DOCX to PDF
-		if docx_files:
-			self.log("📑 Stage 2/3: Converting DOCX to PDF...")
-			pdf_converted = 0
-			
-			try:
-				# Use batch processing - much more efficient!
-				# docx2pdf can convert an entire directory at once
-				self.log("Using batch conversion for better performance...")
-				docx2pdf_convert(output_folder, output_folder)
-				
-				# Check which PDFs were actually created
-				for docx_path in docx_files:
-					pdf_path = docx_path.replace('.docx', '.pdf')
-					if os.path.exists(pdf_path):
-						pdf_files.append(pdf_path)
-						pdf_converted += 1
-				
-				# Update progress for the entire batch
-				progress = (selected_count * 2) / (selected_count * 3)
-				self.after(0, self.progress.set, progress)
-				
-			except Exception as e:
-				self.log(f"Batch PDF conversion failed, falling back to individual conversion: {e}")
-				
-				# Fallback to individual file conversion
-				for i, docx_path in enumerate(docx_files):
-					if not self.is_generating:
-						self.log("Generation cancelled.")
-						return
-						
-					try:
-						# Get the corresponding PDF path
-						pdf_path = docx_path.replace('.docx', '.pdf')
-						docx2pdf_convert(docx_path, output_folder)
-						
-						if os.path.exists(pdf_path):
-							pdf_files.append(pdf_path)
-							pdf_converted += 1
-						
-						# Update progress
-						progress = (selected_count + i + 1) / (selected_count * 3)
-						self.after(0, self.progress.set, progress)
-						
-					except Exception as e:
-						self.log(f"Error converting to PDF: {os.path.basename(docx_path)} - {e}")
-			
-			self.log(f"✅ Stage 2 complete: {pdf_converted}/{len(docx_files)} PDF files created")
-		
-		# STAGE 3: Convert all PDF to PNG
-		if pdf_files:
-			self.log("🖼️ Stage 3/3: Converting PDF to PNG...")
-			png_converted = 0
-			
-			# Verify Poppler is working before starting batch conversion
-			if poppler_path:
-				self.log(f"Using Poppler from: {poppler_path}")
-				pdftoppm_exe = os.path.join(poppler_path, "pdftoppm.exe")
-				if not os.path.exists(pdftoppm_exe):
-					self.log(f"WARNING: pdftoppm.exe not found at {pdftoppm_exe}")
-			else:
-				self.log("Using system-installed Poppler (if available)")
-			
-			for i, pdf_path in enumerate(pdf_files):
-				if not self.is_generating:
-					self.log("Generation cancelled.")
-					return
-					
-				try:
-					png_path = pdf_path.replace('.pdf', '.png')
-					
-					# Additional validation before conversion
-					if not os.path.exists(pdf_path):
-						self.log(f"ERROR: PDF file not found: {pdf_path}")
-						continue
-						
-					file_size = os.path.getsize(pdf_path)
-					if file_size == 0:
-						self.log(f"ERROR: PDF file is empty: {pdf_path}")
-						continue
-					
-					self.log(f"Converting PDF to PNG: {os.path.basename(pdf_path)} ({file_size} bytes)")
-					
-					# Try conversion with detailed error handling
-					try:
-						images = convert_from_path(
-							pdf_path, 
-							dpi=200, 
-							fmt='png', 
-							poppler_path=poppler_path,
-							first_page=1,
-							last_page=1  # Only convert first page
-						)
-						
-						if images and len(images) > 0:
-							images[0].save(png_path, 'PNG')
-							png_converted += 1
-							self.log(f"✅ PNG created: {os.path.basename(png_path)}")
-						else:
-							self.log(f"ERROR: No images returned from PDF: {os.path.basename(pdf_path)}")
-							
-					except Exception as conv_error:
-						error_msg = str(conv_error).lower()
-						if "unable to get page count" in error_msg:
-							self.log(f"PDF CONVERSION ERROR: Unable to read PDF structure - {os.path.basename(pdf_path)}")
-							self.log("This may be caused by:")
-							self.log("- Corrupted PDF file")
-							self.log("- Missing Poppler installation")
-							self.log("- Insufficient permissions")
-							self.log("- PDF created by incompatible software")
-							
-							# Try to provide specific solution
-							if poppler_path is None:
-								self.log("SOLUTION: Try installing Poppler manually or restart the application")
-							else:
-								self.log(f"SOLUTION: Verify Poppler installation at {poppler_path}")
-						else:
-							self.log(f"PDF CONVERSION ERROR: {conv_error}")
-						
-						# Try fallback conversion with different parameters
-						try:
-							self.log(f"Attempting fallback conversion for {os.path.basename(pdf_path)}...")
-							images = convert_from_path(
-								pdf_path, 
-								dpi=150,  # Lower DPI
-								fmt='png', 
-								poppler_path=poppler_path,
-								thread_count=1  # Single thread
-							)
-							if images and len(images) > 0:
-								images[0].save(png_path, 'PNG')
-								png_converted += 1
-								self.log(f"✅ Fallback conversion successful: {os.path.basename(png_path)}")
-							else:
-								self.log(f"❌ Fallback conversion failed: No images returned")
-						except Exception as fallback_error:
-							self.log(f"❌ Fallback conversion failed: {fallback_error}")
-					
-					# Update progress
-					progress = (selected_count * 2 + i + 1) / (selected_count * 3)
-					self.after(0, self.progress.set, progress)
-					
-				except Exception as e:
-					self.log(f"Unexpected error converting to PNG: {os.path.basename(pdf_path)} - {e}")
-			
-			self.log(f"✅ Stage 3 complete: {png_converted}/{len(pdf_files)} PNG files created")
-			
-			if png_converted < len(pdf_files):
-				failed_count = len(pdf_files) - png_converted
-				self.log(f"⚠️  {failed_count} PDF files could not be converted to PNG")
-				self.log("Note: DOCX and PDF files were created successfully")
-		
-		# Mark all generated files and update UI
-		for filename in generated_files:
-			self.mark_invitation_generated(filename, output_folder)
-		
-		# Update invitee statuses
-		for idx in selected_indices:
-			row = self.invitees.iloc[idx]
-			data = row.to_dict()
-			data = {str(k): v for k, v in data.items()}
-			attendee = Attendee(data)
-			filename = attendee.get_filename()
-			key = f"{idx}|{filename}"
-			if key in self.invitee_labels:
-				self.after(0, self.update_invitee_status, key, True)
-		
-		self.log(f"🎉 Fast mode generation complete! Generated: {len(generated_files)} invitations")
-		self.after(0, self.update_invitees_list)
-
-	def _generate_normal_mode(self, template_path, output_folder, mapping, selected_indices, selected_count):
-		"""Normal mode: Process each invitation completely before moving to the next"""
-		self.log("🐌 Normal mode: Processing each invitation completely...")
+		generator = InvitationGenerator(
+			template_path,
+			output_folder,
+			mapping,
+			self.tracker,
+			render_workers=self.get_render_workers(),
+			pdf_converter=self.get_pdf_converter(),
+			png_workers=self.get_png_workers(),
+			png_options=self.get_png_options(),
+			use_cache=self.skip_unchanged.get(),
+			workbook_path=excel_path,
+			log=self.log,
+			progress=lambda value: self.after(0, self.progress.set, value),
+			is_cancelled=lambda: not self.is_generating,
+			on_generated=self._on_invitation_generated
+		)
+		generator.generate(self.invitees, selected_indices, mode=self.get_generation_mode())
 		
-		# Prepare output folder
-		os.makedirs(output_folder, exist_ok=True)
-
-		# Ensure Poppler is available for pdf2image
-		poppler_path = None
-		if sys.platform == "win32":
-			poppler_path = ensure_poppler()
-
-		# Generate invitations for selected invitees only
-		generated_count = 0
-		current_processed = 0
-
-		for idx in selected_indices:
-			# Check for cancellation
-			if not self.is_generating:
-				self.log("Generation cancelled.")
-				return
-				
-			current_processed += 1
-			row = self.invitees.iloc[idx]
-			data = row.to_dict()
-			
-			# Convert data keys to strings for consistency
-			data = {str(k): v for k, v in data.items()}
-			
-			attendee = Attendee(data)
-			context = attendee.get_context(mapping)
-			filename = attendee.get_filename()
-			
-			try:
-				doc = DocxTemplate(template_path)
-				doc.render(context)
-				out_docx = os.path.join(output_folder, f"Invitation - {filename}.docx")
-				out_pdf = os.path.join(output_folder, f"Invitation - {filename}.pdf")
-				out_png = os.path.join(output_folder, f"Invitation - {filename}.png")
-				doc.save(out_docx)
-				self.log(f"Saved: {out_docx}")
-				
-				# Convert DOCX to PDF
-				pdf_success = False
-				try:
-					docx2pdf_convert(out_docx, output_folder)
-					self.log(f"PDF created: {out_pdf}")
-					pdf_success = True
-				except Exception as e:
-					self.log(f"PDF conversion failed: {e}")
-					out_pdf = None
-				
-				# Convert PDF to PNG (first page)
-				png_success = False
-				if out_pdf and os.path.exists(out_pdf):
-					try:
-						file_size = os.path.getsize(out_pdf)
-						if file_size == 0:
-							self.log(f"ERROR: PDF file is empty: {filename}")
-						else:
-							images = convert_from_path(
-								out_pdf, 
-								dpi=200, 
-								fmt='png', 
-								poppler_path=poppler_path,
-								first_page=1,
-								last_page=1
-							)
-							if images:
-								images[0].save(out_png, 'PNG')
-								self.log(f"PNG created: {out_png}")
-								png_success = True
-					except Exception as e:
-						error_msg = str(e).lower()
-						if "unable to get page count" in error_msg:
-							self.log(f"PDF to PNG conversion failed for {filename}: Unable to read PDF structure")
-							self.log("This may indicate a corrupted PDF or missing Poppler installation")
-							
-							# Try fallback conversion
-							try:
-								self.log(f"Attempting fallback conversion for {filename}...")
-								images = convert_from_path(
-									out_pdf, 
-									dpi=150, 
-									fmt='png', 
-									poppler_path=poppler_path,
-									thread_count=1
-								)
-								if images:
-									images[0].save(out_png, 'PNG')
-									self.log(f"Fallback PNG conversion successful: {out_png}")
-									png_success = True
-							except Exception as fallback_error:
-								self.log(f"Fallback PNG conversion also failed: {fallback_error}")
-						else:
-							self.log(f"PNG conversion failed: {e}")
-				
-				# Mark as generated only if at least the DOCX was created successfully
-				self.mark_invitation_generated(filename, output_folder)
-				generated_count += 1
-				
-				# Store status update for later batch processing
-				key = f"{idx}|{filename}"
-				if key in self.invitee_labels:
-					self.after(0, self.update_invitee_status, key, True)
-				
-			except Exception as e:
-				self.log(f"Error for {filename}: {e}")
-			
-			# Update progress and log every 10 items to reduce UI updates
-			if current_processed % 10 == 0 or current_processed == selected_count:
-				self.after(0, self.progress.set, current_processed / selected_count)
-				if current_processed % 10 == 0:
-					self.log(f"Progress: {current_processed}/{selected_count} processed")
+		# Re-read every row's status and redraw the visible rows
+		self.after(0, self.refresh_invitees_list)
 
-		self.log(f"Generation complete. Generated: {generated_count} invitations")
-		
-		# Only refresh the current page to show updated statuses
-		self.after(0, self.update_invitees_list)
+	def _on_invitation_generated(self, idx, filename):
+		"""Called from the generation thread for every finished invitation"""
+		self.after(0, self.update_invitee_status, idx, True)
 
-	def update_invitee_status(self, key, is_generated):
-		"""Update the status display for a single invitee"""
-		if key in self.invitee_labels:
-			label = self.invitee_labels[key]
-			if is_generated:
-				label.configure(text="Generated", text_color="green")
-			else:
-				label.configure(text="Not generated", text_color="gray")
+	def update_invitee_status(self, idx, is_generated):
+		"""Update the status of a single invitee, redrawing it if it is on screen"""
+		meta = self.invitee_meta
+		if meta is None or idx not in meta.index:
+			return
+		position = meta.index.get_loc(idx)
+		meta.iat[position, meta.columns.get_loc('is_generated')] = is_generated
+		start, stop = self.invitees_list.visible_range()
+		if start <= position < stop:
+			self.invitees_list.refresh()
 
 if __name__ == "__main__":
 	app = InvitationGeneratorApp()
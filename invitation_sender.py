@@ -1,16 +1,25 @@
 import customtkinter as ctk
-import pandas as pd
-import smtplib
-from email.message import EmailMessage
 from email.utils import make_msgid
-from email.mime.image import MIMEImage
 import os
 import threading
 import queue
 
+import numpy as np
+
 import tkinter.filedialog as fd
-import json
-from datetime import datetime
+
+from folder_index import FolderIndex
+from guest_list import GUEST_LIST_FILETYPES, guest_list_columns, read_guest_list
+from guest_list_cache import GuestListCache
+from recipient_table import RecipientTable
+from selection_model import SelectionModel
+from virtual_list import VirtualList
+from send_ledger import FAILED, IN_FLIGHT, SENT, SendLedger, is_definite_failure
+from smtp_session import SMTP_MAX_MESSAGES_PER_SESSION, is_transient_failure
+from mail_transport import create_transport, describe_transport, load_transport_config, sent_checker, transport_needs_password
+from send_engine import SEND_MAX_ATTEMPTS, SEND_PER_MINUTE, SEND_PER_SECOND, SEND_WORKERS, RateLimiter, run_send_workers
+from dead_letter import write_dead_letter
+from message_factory import InvitationMessageFactory
 
 ctk.set_appearance_mode("System")
 ctk.set_default_color_theme("blue")
@@ -30,55 +39,46 @@ class InvitationSenderApp(ctk.CTk):
         self.email_column_var = ctk.StringVar()
         self.name_column_var = ctk.StringVar()
         self.images_folder = os.getcwd()  # Default to current working directory
+        self.images_index = None  # FolderIndex of images_folder, built on first lookup
+        self.recipients = None  # RecipientTable for the loaded workbook and chosen columns
+        
+        # Initialize the send ledger (an old sent_invitations.json is imported once)
+        self.tracking_file = "sent_invitations.db"
+        self.ledger = SendLedger(self.tracking_file)
+        
+        # Resume mode: resend interrupted sends when the Sent folder cannot be checked
+        self.resend_unconfirmed = ctk.BooleanVar(value=False)
         
-        # Initialize sent invitations tracking
-        self.tracking_file = "sent_invitations.json"
-        self.sent_invitations = self.load_sent_invitations()
+        # Parallel connections and provider rate limits (blank = no limit)
+        self.send_workers = ctk.StringVar(value=str(SEND_WORKERS))
+        self.send_per_second = ctk.StringVar(value=f"{SEND_PER_SECOND:g}")
+        self.send_per_minute = ctk.StringVar(value=f"{SEND_PER_MINUTE:g}")
         
         # Initialize selection tracking
-        self.selected_invitees = {}  # Dictionary to track checkbox states
-        self.valid_email_invitees = {}  # Dictionary to track which invitees have valid emails
+        self.selection = SelectionModel()  # Checkbox state of every row, by position
         
         # Cancel flag for sending process
         self.is_sending = False
         
-        # Pagination for large datasets
-        self.items_per_page = 100
-        self.current_page = 0
-        self.total_pages = 0
-        
         self.create_widgets()
-        
-    def load_sent_invitations(self):
-        """Load the record of sent invitations from JSON file"""
-        if os.path.exists(self.tracking_file):
-            try:
-                with open(self.tracking_file, 'r') as f:
-                    return json.load(f)
-            except json.JSONDecodeError:
-                self.log("Warning: Tracking file corrupted, starting fresh.")
-                return {}
-        return {}
-        
-    def save_sent_invitations(self):
-        """Save the record of sent invitations to JSON file"""
-        with open(self.tracking_file, 'w') as f:
-            json.dump(self.sent_invitations, f, indent=2)
-            
-    def was_invitation_sent(self, email, name):
-        """Check if an invitation was already sent to this person"""
-        key = f"{email}|{name}"
-        return key in self.sent_invitations
-        
-    def mark_invitation_sent(self, email, name):
-        """Mark an invitation as sent for this person"""
-        key = f"{email}|{name}"
-        self.sent_invitations[key] = {
-            "email": email,
-            "name": name,
-            "sent_date": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        }
-        self.save_sent_invitations()
+        # Where messages go: Gmail unless mail_transport.json names a relay, another SMTP server or a spool folder
+        try:
+            self.transport_config = load_transport_config()
+        except Exception as e:
+            self.log(f"Warning: Could not read transport settings, using Gmail: {e}")
+            self.transport_config = load_transport_config(path="")
+        self.log(f"Sending via {describe_transport(self.transport_config)}")
+        # Ledger warnings can come from the sending thread
+        self.ledger.log = lambda message: self.after(0, self.log, message)
+        # Parsed workbooks cached as Parquet, shared with the generator
+        self.guest_list_cache = GuestListCache(log=self.log)
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
+        
+    def on_close(self):
+        """Commit outstanding ledger entries before closing the window"""
+        self.ledger.close()
+        self.guest_list_cache.close()
+        self.destroy()
 
     def create_widgets(self):
         # Use a main frame to control layout and allow expansion
@@ -133,13 +133,13 @@ class InvitationSenderApp(ctk.CTk):
         email_col_frame = ctk.CTkFrame(columns_section, fg_color="transparent")
         email_col_frame.pack(fill="x", padx=5, pady=2)
         ctk.CTkLabel(email_col_frame, text="Email Column:", width=100).pack(side="left")
-        self.email_column_menu = ctk.CTkOptionMenu(email_col_frame, variable=self.email_column_var, values=[])
+        self.email_column_menu = ctk.CTkOptionMenu(email_col_frame, variable=self.email_column_var, values=[], command=self.on_column_change)
         self.email_column_menu.pack(side="right", fill="x", expand=True)
         
         name_col_frame = ctk.CTkFrame(columns_section, fg_color="transparent")
         name_col_frame.pack(fill="x", padx=5, pady=(2, 5))
         ctk.CTkLabel(name_col_frame, text="Name Column:", width=100).pack(side="left")
-        self.name_column_menu = ctk.CTkOptionMenu(name_col_frame, variable=self.name_column_var, values=[])
+        self.name_column_menu = ctk.CTkOptionMenu(name_col_frame, variable=self.name_column_var, values=[], command=self.on_column_change)
         self.name_column_menu.pack(side="right", fill="x", expand=True)
 
         # Email credentials section
@@ -156,6 +156,18 @@ class InvitationSenderApp(ctk.CTk):
         self.pass_label.pack(pady=(5, 0), padx=5, anchor="w")
         self.pass_entry = ctk.CTkEntry(email_creds_frame, show="*", width=250)
         self.pass_entry.pack(padx=5, pady=(0, 5), fill="x")
+        self.resend_unconfirmed_check = ctk.CTkCheckBox(
+            email_creds_frame,
+            text="Resend unconfirmed if Sent folder can't be checked",
+            variable=self.resend_unconfirmed,
+            font=("Arial", 11)
+        )
+        self.resend_unconfirmed_check.pack(padx=5, pady=(0, 5), anchor="w")
+        speed_frame = ctk.CTkFrame(email_creds_frame, fg_color="transparent")
+        speed_frame.pack(fill="x", padx=5, pady=(0, 5))
+        for label, variable in (("Connections:", self.send_workers), ("Per sec:", self.send_per_second), ("Per min:", self.send_per_minute)):
+            ctk.CTkLabel(speed_frame, text=label, font=("Arial", 11)).pack(side="left", padx=(0, 3))
+            ctk.CTkEntry(speed_frame, textvariable=variable, width=40).pack(side="left", padx=(0, 6))
 
         # Log area
         log_frame = ctk.CTkFrame(left_column)
@@ -171,21 +183,14 @@ class InvitationSenderApp(ctk.CTk):
         # Invitees list with status
         ctk.CTkLabel(right_column, text="Invitees Status", font=("Arial", 16, "bold")).pack(pady=(10, 5))
         
-        # Pagination controls frame
-        pagination_frame = ctk.CTkFrame(right_column)
-        pagination_frame.pack(fill="x", padx=10, pady=(0, 5))
+        # Item count and refresh button frame
+        header_frame = ctk.CTkFrame(right_column)
+        header_frame.pack(fill="x", padx=10, pady=(0, 5))
         
-        # Pagination controls
-        self.prev_page_btn = ctk.CTkButton(pagination_frame, text="← Prev", width=80, command=self.prev_page, state="disabled")
-        self.prev_page_btn.pack(side="left", padx=5)
+        self.count_label = ctk.CTkLabel(header_frame, text="No items")
+        self.count_label.pack(side="left", padx=10)
         
-        self.page_label = ctk.CTkLabel(pagination_frame, text="Page 1 of 1")
-        self.page_label.pack(side="left", padx=10)
-        
-        self.next_page_btn = ctk.CTkButton(pagination_frame, text="Next →", width=80, command=self.next_page, state="disabled")
-        self.next_page_btn.pack(side="left", padx=5)
-        
-        self.refresh_btn = ctk.CTkButton(pagination_frame, text="Refresh", width=80, command=self.update_status_list)
+        self.refresh_btn = ctk.CTkButton(header_frame, text="Refresh", width=80, command=self.refresh_status_list)
         self.refresh_btn.pack(side="right", padx=5)
         
         # Selection and refresh buttons frame
@@ -198,10 +203,9 @@ class InvitationSenderApp(ctk.CTk):
         self.select_unsent_btn = ctk.CTkButton(selection_frame, text="Select Unsent", width=90, command=self.select_unsent_invitees)
         self.select_unsent_btn.pack(side="left", padx=2)
         
-        # Scrollable frame for invitees - takes up most of the right column
-        self.scrollable_frame = ctk.CTkScrollableFrame(right_column)
-        self.scrollable_frame.pack(fill="both", expand=True, padx=10, pady=(0, 5))
-        self.status_labels = {}  # Store labels for updating
+        # Virtual list for invitees - takes up most of the right column; a fixed pool of rows is rebound while scrolling
+        self.status_list = VirtualList(right_column, self._create_invitee_row, self._bind_invitee_row)
+        self.status_list.pack(fill="both", expand=True, padx=10, pady=(0, 5))
 
         # Progress bar (hidden by default) - between list and send button
         self.progress_frame = ctk.CTkFrame(right_column)
@@ -232,40 +236,6 @@ class InvitationSenderApp(ctk.CTk):
         self.result_label = ctk.CTkLabel(send_frame, text="...", font=("Arial", 12))
         self.result_label.pack(pady=(0, 5))
 
-    def prev_page(self):
-        """Go to previous page"""
-        if self.current_page > 0:
-            self.current_page -= 1
-            self.update_status_list()
-
-    def next_page(self):
-        """Go to next page"""
-        if self.current_page < self.total_pages - 1:
-            self.current_page += 1
-            self.update_status_list()
-
-    def update_pagination_controls(self):
-        """Update pagination button states and labels"""
-        if self.invitees is None or self.invitees.empty:
-            self.total_pages = 0
-            self.current_page = 0
-        else:
-            self.total_pages = (len(self.invitees) + self.items_per_page - 1) // self.items_per_page
-            if self.current_page >= self.total_pages:
-                self.current_page = max(0, self.total_pages - 1)
-        
-        # Update buttons
-        self.prev_page_btn.configure(state="normal" if self.current_page > 0 else "disabled")
-        self.next_page_btn.configure(state="normal" if self.current_page < self.total_pages - 1 else "disabled")
-        
-        # Update label
-        if self.total_pages > 0:
-            start_item = self.current_page * self.items_per_page + 1
-            end_item = min((self.current_page + 1) * self.items_per_page, len(self.invitees))
-            self.page_label.configure(text=f"Items {start_item}-{end_item} of {len(self.invitees)} (Page {self.current_page + 1} of {self.total_pages})")
-        else:
-            self.page_label.configure(text="No items")
-
     def select_folder(self):
         folder = fd.askdirectory(title="Select Invitation Images Folder")
         if folder:
@@ -275,6 +245,8 @@ class InvitationSenderApp(ctk.CTk):
             self.folder_entry.insert(0, folder)
             self.folder_entry.configure(state="readonly")
             self.log(f"Selected images folder: {folder}")
+            if self.recipients is not None:
+                self.recipients.resolve_images(self.get_images_index())
 
     def log(self, message):
         self.log_textbox.configure(state="normal")
@@ -283,265 +255,173 @@ class InvitationSenderApp(ctk.CTk):
         self.log_textbox.configure(state="disabled")
 
     def select_all_invitees(self):
-        """Select all invitees with valid emails for sending (across all pages)"""
+        """Select all invitees with valid emails for sending (whole workbook)"""
         if not hasattr(self, 'invitees') or self.invitees is None:
             return
 
-        email_col = self.email_column_var.get()
-        name_col = self.name_column_var.get()
-        if not email_col or not name_col:
+        table = self.recipients
+        if table is None:
             return
 
-        count = 0
-        total_count = 0
+        count = table.valid_count
+        total_count = len(table)
         
-        # Work with all invitees, not just visible ones
-        for idx, row in self.invitees.iterrows():
-            name_raw = row[name_col] if pd.notna(row[name_col]) else "Unknown"
-            name = self.clean_name(str(name_raw).strip())
-            email_raw = row[email_col] if pd.notna(row[email_col]) else ""
-            email = str(email_raw).strip()
-            
-            key = f"{email}|{name}"
-            has_valid_email = self.is_valid_email(email)
-            
-            # Create checkbox variable if it doesn't exist
-            if key not in self.selected_invitees:
-                self.selected_invitees[key] = ctk.BooleanVar()
-            if key not in self.valid_email_invitees:
-                self.valid_email_invitees[key] = has_valid_email
-                
-            total_count += 1
-            if has_valid_email:
-                self.selected_invitees[key].set(True)
-                count += 1
-            else:
-                self.selected_invitees[key].set(False)  # Ensure invalid emails stay deselected
+        # Work with all invitees, not just visible ones; invalid emails stay deselected
+        self.selection.assign(table.valid)
+        self.sync_visible_checkboxes()
                 
         self.log(f"Selected {count} invitees with valid emails out of {total_count} total.")
 
     def select_none_invitees(self):
-        """Deselect all invitees (across all pages)"""
+        """Deselect all invitees (whole workbook)"""
         if not hasattr(self, 'invitees') or self.invitees is None:
             return
 
-        email_col = self.email_column_var.get()
-        name_col = self.name_column_var.get()
-        if not email_col or not name_col:
+        table = self.recipients
+        if table is None:
             return
 
-        count = 0
+        count = len(table)
         # Work with all invitees, not just visible ones
-        for idx, row in self.invitees.iterrows():
-            name_raw = row[name_col] if pd.notna(row[name_col]) else "Unknown"
-            name = self.clean_name(str(name_raw).strip())
-            email_raw = row[email_col] if pd.notna(row[email_col]) else ""
-            email = str(email_raw).strip()
-            
-            key = f"{email}|{name}"
-            
-            # Create checkbox variable if it doesn't exist
-            if key not in self.selected_invitees:
-                self.selected_invitees[key] = ctk.BooleanVar()
-                
-            self.selected_invitees[key].set(False)
-            count += 1
+        self.selection.assign(np.zeros(count, dtype=bool))
+        self.sync_visible_checkboxes()
             
         self.log(f"Deselected all {count} invitees.")
 
     def select_unsent_invitees(self):
-        """Select only invitees with valid emails who haven't been sent invitations yet (across all pages)"""
+        """Select only invitees with valid emails who haven't been sent invitations yet (whole workbook)"""
         if not hasattr(self, 'invitees') or self.invitees is None:
             return
 
-        email_col = self.email_column_var.get()
-        name_col = self.name_column_var.get()
-        if not email_col or not name_col:
+        table = self.recipients
+        if table is None:
             return
 
-        selected_count = 0
-        total_count = 0
+        # Unconfirmed sends are settled when sending starts, so only unsent valid rows are picked
+        table.refresh_states(self.ledger)
+        unsent = table.unsent_mask()
+        selected_count = int(unsent.sum())
+        total_count = len(table)
         
         # Work with all invitees, not just visible ones
-        for idx, row in self.invitees.iterrows():
-            name_raw = row[name_col] if pd.notna(row[name_col]) else "Unknown"
-            name = self.clean_name(str(name_raw).strip())
-            email_raw = row[email_col] if pd.notna(row[email_col]) else ""
-            email = str(email_raw).strip()
-            
-            key = f"{email}|{name}"
-            has_valid_email = self.is_valid_email(email)
-            
-            # Create checkbox variable if it doesn't exist
-            if key not in self.selected_invitees:
-                self.selected_invitees[key] = ctk.BooleanVar()
-            if key not in self.valid_email_invitees:
-                self.valid_email_invitees[key] = has_valid_email
-                
-            total_count += 1
-            
-            # Only consider invitees with valid emails
-            if has_valid_email:
-                if not self.was_invitation_sent(email, name):
-                    self.selected_invitees[key].set(True)
-                    selected_count += 1
-                else:
-                    self.selected_invitees[key].set(False)
-            else:
-                self.selected_invitees[key].set(False)  # Ensure invalid emails stay deselected
+        self.selection.assign(unsent)
+        self.sync_visible_checkboxes()
                 
         self.log(f"Selected {selected_count} unsent invitees with valid emails out of {total_count} total.")
 
-    def clear_status_list(self):
-        """Clear status widgets but preserve selection state"""
-        for widget in self.scrollable_frame.winfo_children():
-            widget.destroy()
-        self.status_labels = {}
-        # DON'T clear selected_invitees and valid_email_invitees - preserve selections across pages
-
     def reset_all_selections(self):
         """Completely reset all selections (used when loading new Excel file)"""
-        self.selected_invitees = {}
-        self.valid_email_invitees = {}
-
-    def update_status_list(self):
-        """Update the status list with current invitees and checkboxes - optimized with pagination"""
-        self.clear_status_list()
-        
-        if not hasattr(self, 'invitees') or self.invitees is None:
-            self.update_pagination_controls()
-            return
-
+        self.selection.reset(0 if self.recipients is None else len(self.recipients))
+
+    def sync_visible_checkboxes(self):
+        """Show the selection model's state on the checkboxes currently on screen"""
+        self.status_list.refresh()
+
+    def update_status_list(self, first=None):
+        """Point the virtual list at the recipient table and redraw the visible rows"""
+        count = 0 if self.recipients is None else len(self.recipients)
+        self.count_label.configure(text=f"{count} invitees" if count else "No items")
+        self.status_list.set_count(count, first)
+
+    def refresh_status_list(self):
+        """Re-read sent states and image paths, then redraw the visible rows"""
+        if self.recipients is not None:
+            self.recipients.refresh_states(self.ledger)
+            self.recipients.resolve_images(self.get_images_index())
+        self.update_status_list()
+
+    def build_recipient_table(self):
+        """Derive names, emails, keys, states and images for the chosen columns"""
         email_col = self.email_column_var.get()
         name_col = self.name_column_var.get()
-        if not email_col or not name_col:
-            self.update_pagination_controls()
+        if self.invitees is None or not email_col or not name_col:
+            self.recipients = None
             return
-
-        # Update pagination controls
-        self.update_pagination_controls()
-        
-        # Calculate which items to show
-        start_idx = self.current_page * self.items_per_page
-        end_idx = min(start_idx + self.items_per_page, len(self.invitees))
+        self.recipients = RecipientTable(self.invitees, email_col, name_col)
+        self.recipients.refresh_states(self.ledger)
+        self.recipients.resolve_images(self.get_images_index())
+
+    def on_column_change(self, _choice=None):
+        """Rebuild the recipient table when the email or name column changes"""
+        self.build_recipient_table()
+        self.reset_all_selections()
+        self.update_status_list(first=0)
+
+    def _create_invitee_row(self, parent, height):
+        """Create one pooled row widget; _bind_invitee_row fills it with data"""
+        row = ctk.CTkFrame(parent, height=height)
+        row.pack_propagate(False)  # Keep the fixed row height the list scrolls by
+        row.position = None
+        
+        # Checkbox for selection, writing back to the selection model
+        row.checkbox_var = ctk.BooleanVar()
+        row.checkbox = ctk.CTkCheckBox(
+            row, 
+            text="", 
+            variable=row.checkbox_var, 
+            width=20,
+            command=lambda: self.selection.set(row.position, row.checkbox_var.get())
+        )
+        row.checkbox.pack(side="left", padx=5)
         
-        # Only create widgets for visible items
-        visible_invitees = self.invitees.iloc[start_idx:end_idx]
+        # Name and email display
+        row.info_label = ctk.CTkLabel(row, text="", anchor="w")
+        row.info_label.pack(side="left", padx=5, fill="x", expand=True)
         
-        # Batch process invitee data first
-        invitee_data = []
-        for idx, row in visible_invitees.iterrows():
-            name_raw = row[name_col] if pd.notna(row[name_col]) else "Unknown"
-            name = self.clean_name(str(name_raw).strip())
-            email_raw = row[email_col] if pd.notna(row[email_col]) else ""
-            email = str(email_raw).strip()
-            
-            # Check if email is valid
-            has_valid_email = self.is_valid_email(email)
-            is_sent = self.was_invitation_sent(email, name) if has_valid_email else False
-            
-            invitee_data.append({
-                'idx': idx,
-                'name': name,
-                'email': email,
-                'has_valid_email': has_valid_email,
-                'is_sent': is_sent
-            })
-        
-        # Now create UI elements in batch
-        for data in invitee_data:
-            self._create_invitee_widget(data)
-
-    def _create_invitee_widget(self, data):
-        """Create UI widget for a single invitee"""
+        # Status label
+        row.status_label = ctk.CTkLabel(row, text="", anchor="e", width=120)
+        row.status_label.pack(side="right", padx=5)
+        return row
+
+    def _bind_invitee_row(self, row, position):
+        """Show the recipient at a row position in a pooled row widget"""
+        data = self.recipients.row(position)
         name = data['name']
         email = data['email'] 
         has_valid_email = data['has_valid_email']
-        is_sent = data['is_sent']
-        
-        key = f"{email}|{name}"
-        
-        # Create frame for this invitee
-        frame = ctk.CTkFrame(self.scrollable_frame)
-        frame.pack(fill="x", padx=2, pady=1)
+        row.position = position
         
-        # Checkbox for selection - disabled if no valid email
-        checkbox_var = ctk.BooleanVar()
-        checkbox = ctk.CTkCheckBox(
-            frame, 
-            text="", 
-            variable=checkbox_var, 
-            width=20,
-            state="normal" if has_valid_email else "disabled"
-        )
-        checkbox.pack(side="left", padx=5)
-        
-        # Restore or set selection state
-        if key in self.selected_invitees:
-            # Restore previous selection state
-            previous_state = self.selected_invitees[key].get()
-            checkbox_var.set(previous_state)
-        else:
-            # Set default selection
-            if not has_valid_email:
-                checkbox_var.set(False)  # Don't select invalid emails
-            else:
-                checkbox_var.set(not is_sent)  # Select unsent invitees by default
-        
-        # Store checkbox variable and email validity for later use
-        self.selected_invitees[key] = checkbox_var
-        self.valid_email_invitees[key] = has_valid_email
+        # Rows shown for the first time default to selected when the email is valid and not sent yet
+        default = has_valid_email and data['state'] != SENT
+        row.checkbox_var.set(bool(self.selection.show([position], [default])[0]))
+        # Checkbox disabled if no valid email
+        row.checkbox.configure(state="normal" if has_valid_email else "disabled")
         
         # Name and email display
         if has_valid_email:
             info_text = f"{name} ({email})"
-            text_color = None  # Default color
+            text_color = ctk.ThemeManager.theme["CTkLabel"]["text_color"]  # Default colour
         else:
             if not email or email.lower() in ['nan', 'none']:
                 info_text = f"{name} (No email address)"
             else:
                 info_text = f"{name} ({email} - Invalid email)"
             text_color = "gray"
-        
-        info_label = ctk.CTkLabel(frame, text=info_text, anchor="w", text_color=text_color)
-        info_label.pack(side="left", padx=5, fill="x", expand=True)
-        
-        # Status label
-        status_label = ctk.CTkLabel(frame, text="", anchor="e", width=120)
-        status_label.pack(side="right", padx=5)
-        
-        # Store label reference for updates
-        self.status_labels[key] = status_label
+        row.info_label.configure(text=info_text, text_color=text_color)
         
         # Update status
         if not has_valid_email:
-            status_label.configure(text="Cannot send", text_color="red")
-        elif is_sent:
-            sent_date = self.sent_invitations[key]["sent_date"]
-            status_label.configure(text=f"Sent ✓", text_color="green")
+            row.status_label.configure(text="Cannot send", text_color="red")
+        elif data['state'] == SENT:
+            row.status_label.configure(text=f"Sent ✓", text_color="green")
+        elif data['state'] == IN_FLIGHT:
+            row.status_label.configure(text="Unconfirmed ?", text_color="orange")
         else:
-            status_label.configure(text="Not sent", text_color="gray")
+            row.status_label.configure(text="Not sent", text_color="gray")
 
-    def update_invitee_status(self, email, name):
-        """Update the status display for a single invitee"""
-        key = f"{email}|{name}"
-        if key not in self.status_labels:
-            return
-            
-        label = self.status_labels[key]
-        if self.was_invitation_sent(email, name):
-            sent_date = self.sent_invitations[key]["sent_date"]
-            label.configure(text=f"Sent on {sent_date}", text_color="green")
-        else:
-            label.configure(text="Not sent", text_color="gray")
+    def update_invitee_status(self, position):
+        """Redraw a single invitee's status from the recipient table if it is on screen"""
+        start, stop = self.status_list.visible_range()
+        if start <= position < stop:
+            self.status_list.refresh()
 
     def open_excel(self):
-        file_path = fd.askopenfilename(filetypes=[("Excel Files", "*.xlsx *.xls")])
+        file_path = fd.askopenfilename(filetypes=GUEST_LIST_FILETYPES)
         if file_path:
             try:
                 self.log(f"Opening Excel file: {file_path}")
-                df = pd.read_excel(file_path)
-                columns = list(df.columns)
+                df = read_guest_list(file_path, self.guest_list_cache)
+                columns = guest_list_columns(df)
                 if not columns:
                     self.status_label.configure(text="Excel file has no columns.", text_color="red")
                     self.send_btn.configure(state="disabled")
@@ -560,12 +440,8 @@ class InvitationSenderApp(ctk.CTk):
                 # Keep all rows, don't filter out missing data
                 self.invitees = df
                 total_invitees = len(df)
-                # Count how many have valid emails
-                valid_emails = 0
-                for idx, row in df.iterrows():
-                    email = str(row[email_guess]).strip() if pd.notna(row[email_guess]) else ""
-                    if self.is_valid_email(email):
-                        valid_emails += 1
+                self.build_recipient_table()
+                valid_emails = self.recipients.valid_count
                 
                 self.excel_path = file_path
                 self.status_label.configure(
@@ -577,8 +453,7 @@ class InvitationSenderApp(ctk.CTk):
                 
                 # Reset selections when loading new file
                 self.reset_all_selections()
-                self.current_page = 0  # Reset to first page
-                self.update_status_list()
+                self.update_status_list(first=0)  # Back to the top of the list
             except Exception as e:
                 self.status_label.configure(text=f"Error: {e}", text_color="red")
                 self.send_btn.configure(state="disabled")
@@ -602,64 +477,11 @@ class InvitationSenderApp(ctk.CTk):
         # Remove dots and normalize spaces
         return ' '.join(part.replace('.', '') for part in cleaned_name.split())
 
-    def find_invitation_image(self, name):
-        """Find invitation image file, trying different filename variations for backward compatibility"""
-        # Try the current cleaned filename first
-        cleaned_name = self.clean_name(name)
-        primary_filename = os.path.join(self.images_folder, f"Invitation - {cleaned_name}.png")
-        
-        if os.path.exists(primary_filename):
-            return primary_filename
-        
-        # Try various legacy processing variations for backward compatibility
-        variations = [
-            # Legacy processing (old get_filename logic)
-            str(name).replace("\n", " ").replace(".", "").replace('"', "'").strip(),
-            # Raw name with just quote replacement
-            str(name).replace('"', "'"),
-            # Raw name with no processing
-            str(name),
-            # Name with just space normalization (but keeping leading/trailing)
-            str(name).replace("\n", " ").replace(".", "").replace('"', "'"),
-            # Legacy with slash replacement (in case files were created with slash handling)
-            str(name).replace("\n", " ").replace(".", "").replace('"', "'").replace("/", " ").replace("\\", " ").strip(),
-        ]
-        
-        for variation in variations:
-            # Try exact variation
-            filename = os.path.join(self.images_folder, f"Invitation - {variation}.png")
-            if os.path.exists(filename):
-                return filename
-                
-            # Also try with potential extra space after dash (leading space in name)
-            filename_extra_space = os.path.join(self.images_folder, f"Invitation -  {variation}.png")
-            if os.path.exists(filename_extra_space):
-                return filename_extra_space
-        
-        # Try to find any file that starts with "Invitation - " and contains parts of the name
-        # This is a fuzzy matching approach for difficult cases
-        if os.path.exists(self.images_folder):
-            name_parts = cleaned_name.lower().split()
-            if name_parts:
-                try:
-                    for filename in os.listdir(self.images_folder):
-                        if filename.startswith("Invitation - ") and filename.endswith(".png"):
-                            file_name_part = filename[13:-4].lower()  # Remove "Invitation - " and ".png"
-                            # Check if all name parts are present in the filename
-                            if all(part in file_name_part for part in name_parts):
-                                full_path = os.path.join(self.images_folder, filename)
-                                return full_path
-                except OSError:
-                    pass  # Handle permission errors gracefully
-        
-        # None found
-        return None
-
-    def is_valid_email(self, email):
-        """Check if email address is valid (basic validation)"""
-        if not email or email.lower() in ['nan', 'none', '']:
-            return False
-        return '@' in email and '.' in email and len(email) > 5
+    def get_images_index(self):
+        """FolderIndex of the images folder, rebuilt only when the folder changes"""
+        if self.images_index is None or self.images_index.folder != self.images_folder:
+            self.images_index = FolderIndex(self.images_folder)
+        return self.images_index
 
     def update_progress(self, current, total, message=""):
         """Update the progress bar and label"""
@@ -667,128 +489,177 @@ class InvitationSenderApp(ctk.CTk):
         self.progress_bar.set(progress)
         self.progress_label.configure(text=message)
 
-    def send_single_invitation(self, sender_email, sender_pass, name, recipient, img_filename):
-        """Send a single invitation and return the result"""
+    def send_single_invitation(self, transport, factory, name, recipient, img_filename, message_id):
+        """
+        Send a single invitation over a mail transport and return (success, error, uncertain, transient).
+        uncertain is True when the connection failed mid-transaction, so the
+        server may or may not have accepted the message; transient is True
+        when the server or network failed temporarily and a retry may succeed.
+        """
+        connecting = False
+        attempted = False
         try:
-            msg = EmailMessage()
-            msg["Subject"] = "Invitation to the National Day and Armed Forces Day of the Republic of Korea"
-            msg["From"] = sender_email
-            msg["To"] = recipient
-            cid = make_msgid(domain="xyz.com")
-            msg.add_alternative(f"""\
-            <html>
-              <head>
-                <style>
-                  img {{ max-width: 900px; width: 100%; height: auto; }}
-                </style>
-              </head>
-              <body>
-                <img src=\"cid:{cid[1:-1]}\" style="width: 900px; max-width: 100%; height: auto;">
-              </body>
-            </html>
-            """, subtype='html')
-
-            with open(img_filename, 'rb') as img:
-                img_data = img.read()
-                image = MIMEImage(img_data, name=os.path.basename(img_filename))
-                image.add_header('Content-ID', cid)
-                html_part = None
-                for part in msg.iter_parts():
-                    if part.get_content_type() == 'text/html':
-                        html_part = part
-                        break
-                if html_part is not None:
-                    html_part.add_related(image)
-                else:
-                    return False, "Could not find HTML part to attach image"
-
-            with smtplib.SMTP_SSL('smtp.gmail.com', 465) as smtp:
-                smtp.login(sender_email, sender_pass)
-                smtp.send_message(msg)
-            return True, None
+            msg = factory.build(recipient, img_filename, message_id)
+
+            # An SMTP transport stays logged in across messages; only connection errors come from connect()
+            connecting = True
+            transport.connect()
+            attempted = True
+            transport.send(msg)
+            return True, None, False, False
         except Exception as e:
-            return False, str(e)
+            uncertain = attempted and not is_definite_failure(e)
+            return False, str(e), uncertain, connecting and not uncertain and is_transient_failure(e)
 
-    def send_invitations_thread(self, sender_email, sender_pass, email_col, name_col):
+    def send_invitations_thread(self, sender_email, sender_pass, email_col, name_col, workers=SEND_WORKERS, limiter=None,
+                                resend_unconfirmed=False):
         """Thread function for sending invitations"""
-        sent_count = 0
-        failed = []
-        skipped = 0
-        selected_count = 0
-        
-        # First, count selected invitees with valid emails
-        for idx, row in self.invitees.iterrows():
-            name_raw = row[name_col] if pd.notna(row[name_col]) else "Unknown"
-            name = self.clean_name(str(name_raw).strip())
-            email_raw = row[email_col] if pd.notna(row[email_col]) else ""
-            recipient = str(email_raw).strip()
-            key = f"{recipient}|{name}"
-            
-            if key in self.selected_invitees and self.selected_invitees[key].get():
-                if self.is_valid_email(recipient):
-                    selected_count += 1
+        table = self.recipients
+        if table is None:
+            self.after(0, self.log, "No invitees selected for sending.")
+            self.after(0, self.finish_sending, 0, 0, [])
+            return
+        
+        # Selected rows, in sheet order, read from the selection model without touching Tk
+        selected = self.selection.selected_positions()
+        selected_count = int(table.valid[selected].sum())
         
         if selected_count == 0:
             self.after(0, self.log, "No invitees selected for sending.")
             self.after(0, self.finish_sending, 0, 0, [])
             return
         
-        self.after(0, self.log, f"Starting to send {selected_count} selected invitations...")
-        current_processed = 0
-        
-        for idx, row in self.invitees.iterrows():
-            # Check for cancellation
-            if not self.is_sending:
-                self.after(0, self.log, "Sending cancelled.")
-                return
-                
-            name_raw = row[name_col] if pd.notna(row[name_col]) else "Unknown"
-            name = self.clean_name(str(name_raw).strip())
-            email_raw = row[email_col] if pd.notna(row[email_col]) else ""
-            recipient = str(email_raw).strip()
-            key = f"{recipient}|{name}"
+        # Resume: settle sends that an earlier run left in flight before deciding who still needs one
+        unconfirmed = self.ledger.in_flight()
+        if unconfirmed:
+            self.after(0, self.log, f"Reconciling {len(unconfirmed)} unconfirmed sends from an interrupted run...")
+            confirmed, requeued, unresolved = self.ledger.reconcile(
+                sent_checker(self.transport_config, sender_email, sender_pass),
+                resend_unconfirmed=resend_unconfirmed
+            )
+            self.after(0, self.log, f"Found {confirmed} already sent, {requeued} will be resent, {unresolved} left unconfirmed.")
+        
+        # One bulk read of states and image paths for the whole run (the reconcile may have changed states)
+        table.refresh_states(self.ledger)
+        table.resolve_images(self.get_images_index())
+        
+        # Counters shared by the worker threads; progress counts every settled row
+        counts = {'sent': 0, 'skipped': 0, 'done': 0}
+        failed = []
+        dead_letters = []  # (position, error, attempts) of rows worth sending again later
+        counts_lock = threading.Lock()
+        
+        def settle(name, recipient, outcome=None, error=None, dead_letter=None):
+            with counts_lock:
+                if outcome:
+                    counts[outcome] += 1
+                if error is not None:
+                    failed.append((recipient, error))
+                if dead_letter is not None:
+                    dead_letters.append(dead_letter)
+                counts['done'] += 1
+                done = counts['done']
+            self.after(0, self.update_progress, done, selected_count, f"Processed: {name} ({recipient})")
+        
+        # Rows that cannot or need not be sent are settled here; the rest go to the workers
+        jobs = []
+        for position in selected:
+            name = table.names[position]
+            recipient = table.emails[position]
             
-            # Skip if not selected
-            if key not in self.selected_invitees or not self.selected_invitees[key].get():
-                continue
-                
             # Skip if email is not valid
-            if not self.is_valid_email(recipient):
+            if not table.valid[position]:
                 self.after(0, self.log, f"[SKIPPED] Invalid email for {name}: {recipient}")
                 continue
-                
-            current_processed += 1
             
-            # Update progress in the main thread
-            self.after(0, self.update_progress, current_processed, selected_count, f"Processing: {name} ({recipient})")
-            
-            # Check if invitation was already sent
-            if self.was_invitation_sent(recipient, name):
+            # Check if invitation was already sent, or may have been
+            state = table.states[position]
+            if state == SENT:
                 self.after(0, self.log, f"[SKIPPED] Already sent to {name} ({recipient})")
-                skipped += 1
+                settle(name, recipient, 'skipped')
                 continue
-                
-            img_filename = self.find_invitation_image(name)
+            if state == IN_FLIGHT:
+                self.after(0, self.log, f"[SKIPPED] Earlier send to {name} ({recipient}) is unconfirmed - check the Sent folder")
+                settle(name, recipient, error="Unconfirmed earlier send")
+                continue
+            
+            img_filename = table.images[position]
             if img_filename is None:
                 # Try to provide helpful info about what files we looked for
                 cleaned_name = self.clean_name(name)
                 expected_filename = f"Invitation - {cleaned_name}.png"
-                failed.append((recipient, "Invitation image not found"))
                 self.after(0, self.log, f"[{recipient}] Invitation image not found. Expected: {expected_filename}")
+                settle(name, recipient, error="Invitation image not found", dead_letter=(position, "Invitation image not found", 0))
                 continue
-
-            success, error = self.send_single_invitation(sender_email, sender_pass, name, recipient, img_filename)
+            
+            jobs.append((position, name, recipient, img_filename))
+        
+        # Headers, HTML and encoded images are prepared once and shared by the workers
+        factory = InvitationMessageFactory(sender_email)
+        
+        def send_job(job, transport, attempt):
+            """Send one invitation; returns True to have it retried after a backoff"""
+            position, name, recipient, img_filename = job
+            message_id = make_msgid(domain=sender_email.split("@")[-1])
+            if not self.ledger.claim(recipient, name, message_id):
+                self.after(0, self.log, f"[SKIPPED] Already sent to {name} ({recipient})")
+                settle(name, recipient, 'skipped')
+                return
+            table.set_state(position, IN_FLIGHT)
+            success, error, uncertain, transient = self.send_single_invitation(transport, factory, name, recipient, img_filename, message_id)
+            if transient and attempt < SEND_MAX_ATTEMPTS:
+                # Released so the retry can claim it again; the row waits while other sends continue
+                self.ledger.mark_failed(recipient, name, error)
+                table.set_state(position, FAILED)
+                self.after(0, self.log, f"[{recipient}] Temporary failure (attempt {attempt} of {SEND_MAX_ATTEMPTS}), will retry: {error}")
+                self.after(0, self.update_invitee_status, position)
+                return True
             if success:
-                sent_count += 1
-                self.mark_invitation_sent(recipient, name)
-                self.after(0, self.update_invitee_status, recipient, name)
+                self.ledger.mark_sent(recipient, name)
+                table.set_state(position, SENT)
                 self.after(0, self.log, f"[{recipient}] Invitation sent successfully.")
+                settle(name, recipient, 'sent')
+            elif uncertain:
+                # Left in flight: the next run checks the Sent folder instead of resending blindly
+                self.after(0, self.log, f"[{recipient}] Connection lost while sending, delivery unconfirmed: {error}")
+                settle(name, recipient, error=error)
             else:
-                failed.append((recipient, error))
+                self.ledger.mark_failed(recipient, name, error)
+                table.set_state(position, FAILED)
                 self.after(0, self.log, f"[{recipient}] Failed to send: {error}")
+                settle(name, recipient, error=error, dead_letter=(position, error, attempt))
+            self.after(0, self.update_invitee_status, position)
+            return False
+        
+        self.after(0, self.log, f"Starting to send {len(jobs)} of {selected_count} selected invitations on {workers} connection(s)...")
+        
+        # Each worker keeps its own transport (an SMTP connection is reconnected and recycled as needed)
+        abandoned = run_send_workers(
+            jobs,
+            send_job,
+            lambda: create_transport(
+                self.transport_config, sender_email, sender_pass,
+                max_messages=SMTP_MAX_MESSAGES_PER_SESSION,
+                log=lambda message: self.after(0, self.log, message)
+            ),
+            workers=workers,
+            limiter=limiter,
+            is_cancelled=lambda: not self.is_sending
+        )
+        if abandoned:
+            self.after(0, self.log, f"Sending cancelled, {abandoned} invitations not sent.")
+        
+        # Failed rows, as a guest list that can be opened again for a retry-only run
+        if dead_letters:
+            try:
+                folder = os.path.dirname(self.excel_path) if self.excel_path else os.getcwd()
+                dead_letter_path = write_dead_letter(self.invitees, sorted(dead_letters), folder)
+                self.after(0, self.log, f"Failed invitations saved to {dead_letter_path} - open it as the guest list to retry them.")
+            except Exception as e:
+                self.after(0, self.log, f"Warning: Could not save failed invitations: {e}")
 
         # Update final results in the main thread
-        self.after(0, self.finish_sending, sent_count, skipped, failed)
+        self.after(0, self.finish_sending, counts['sent'], counts['skipped'], failed)
 
     def finish_sending(self, sent_count, skipped, failed):
         """Update UI after sending is complete"""
@@ -816,7 +687,7 @@ class InvitationSenderApp(ctk.CTk):
         email_col = self.email_column_var.get()
         name_col = self.name_column_var.get()
         
-        if not sender_email or not sender_pass:
+        if not sender_email or (not sender_pass and transport_needs_password(self.transport_config)):
             self.result_label.configure(text="Enter sender email and app password.", text_color="red")
             self.log("Sender email or app password missing.")
             return
@@ -825,6 +696,10 @@ class InvitationSenderApp(ctk.CTk):
             self.log("Email or name column not selected.")
             return
 
+        workers, limiter = self.get_send_settings()
+        # Tk variables are only read on the main thread
+        resend_unconfirmed = self.resend_unconfirmed.get()
+
         # Start sending process
         self.is_sending = True
         self.send_btn.configure(text="Cancel", fg_color="red")
@@ -836,20 +711,35 @@ class InvitationSenderApp(ctk.CTk):
         # Start sending thread
         threading.Thread(
             target=self._send_invitations_thread,
-            args=(sender_email, sender_pass, email_col, name_col),
+            args=(sender_email, sender_pass, email_col, name_col, workers, limiter, resend_unconfirmed),
             daemon=True
         ).start()
 
+    def get_send_settings(self):
+        """Number of parallel connections and the rate limiter, from the speed fields"""
+        def read_number(variable, default):
+            value = variable.get().strip()
+            if not value:
+                return None
+            try:
+                return max(0.0, float(value))
+            except ValueError:
+                return default
+        workers = int(read_number(self.send_workers, SEND_WORKERS) or 1)
+        limiter = RateLimiter(read_number(self.send_per_second, SEND_PER_SECOND), read_number(self.send_per_minute, SEND_PER_MINUTE))
+        return max(1, min(workers, 16)), limiter
+
     def reset_send_button(self):
         """Reset the send button to its original state"""
         self.is_sending = False
         self.send_btn.configure(text="Send Invitations", fg_color=["#1f538d", "#14375e"])
         self.progress_frame.pack_forget()  # Hide progress bar
 
-    def _send_invitations_thread(self, sender_email, sender_pass, email_col, name_col):
+    def _send_invitations_thread(self, sender_email, sender_pass, email_col, name_col, workers, limiter, resend_unconfirmed):
         try:
-            self.send_invitations_thread(sender_email, sender_pass, email_col, name_col)
+            self.send_invitations_thread(sender_email, sender_pass, email_col, name_col, workers, limiter, resend_unconfirmed)
         finally:
+            self.ledger.flush()
             # Always reset the button when sending ends
             self.after(0, self.reset_send_button)
 
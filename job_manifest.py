@@ -0,0 +1,105 @@
+
+# Standard library imports
+import os
+import json
+
+# Local imports
+from storage import BatchedStore
+
+# Per-output-folder record of the last fast-mode job and each row's finished stages
+JOB_MANIFEST = ".templify_job.db"
+
+# Stage columns, in pipeline order
+JOB_STAGES = ("docx", "pdf", "png")
+
+# Stage marks are committed every JOB_BATCH_SIZE marks or JOB_COMMIT_INTERVAL seconds
+JOB_BATCH_SIZE = 100
+JOB_COMMIT_INTERVAL = 2.0
+
+
+class JobManifest(BatchedStore):
+	"""
+	Checkpoints of a fast-mode run, stored next to its output.
+
+	Every row records which stages (docx, pdf, png) have finished, under the
+	render key it was started with, as soon as each file is written. A later
+	run of the same job, or templify-generate --resume, then only redoes the
+	missing stage of each row. A row whose key changed (template, data or
+	settings edited) starts again from the DOCX stage.
+	"""
+
+	batch_size = JOB_BATCH_SIZE
+	commit_interval = JOB_COMMIT_INTERVAL
+	description = "job checkpoints"
+
+	def __init__(self, output_folder, log=print):
+		self.output_folder = output_folder
+		super().__init__(os.path.join(output_folder, JOB_MANIFEST), log=log)
+
+	def _create_tables(self):
+		self._conn.execute("CREATE TABLE IF NOT EXISTS job (key TEXT PRIMARY KEY, value TEXT)")
+		self._conn.execute(
+			"CREATE TABLE IF NOT EXISTS rows ("
+			"name TEXT PRIMARY KEY, idx INTEGER NOT NULL, render_key TEXT NOT NULL, "
+			"docx INTEGER NOT NULL DEFAULT 0, pdf INTEGER NOT NULL DEFAULT 0, png INTEGER NOT NULL DEFAULT 0, "
+			"done INTEGER NOT NULL DEFAULT 0, in_job INTEGER NOT NULL DEFAULT 0)"
+		)
+
+	def start(self, spec, rows):
+		"""
+		Begin (or continue) a job. rows are (name, idx, render_key); rows an
+		interrupted job left unfinished under the same key keep their finished
+		stages, others (new, changed or already complete) start from scratch.
+		Checkpoints of rows outside this job are kept for later jobs.
+		"""
+		with self._lock, self._conn:
+			self._conn.execute("INSERT OR REPLACE INTO job VALUES ('spec', ?)", (json.dumps(spec or {}, default=str),))
+			self._conn.execute("UPDATE rows SET in_job = 0")
+			self._conn.executemany(
+				"INSERT INTO rows (name, idx, render_key, in_job) VALUES (?, ?, ?, 1) "
+				"ON CONFLICT(name) DO UPDATE SET idx = excluded.idx, done = 0, in_job = 1, "
+				"docx = CASE WHEN rows.render_key = excluded.render_key AND rows.done = 0 THEN rows.docx ELSE 0 END, "
+				"pdf = CASE WHEN rows.render_key = excluded.render_key AND rows.done = 0 THEN rows.pdf ELSE 0 END, "
+				"png = CASE WHEN rows.render_key = excluded.render_key AND rows.done = 0 THEN rows.png ELSE 0 END, "
+				"render_key = excluded.render_key",
+				rows
+			)
+
+	def spec(self):
+		"""The job description saved by the last start(), or None"""
+		with self._lock:
+			row = self._conn.execute("SELECT value FROM job WHERE key = 'spec'").fetchone()
+		return json.loads(row[0]) if row else None
+
+	def completed(self, stage):
+		"""Names in the current job whose given stage has finished but not the whole row"""
+		if stage not in JOB_STAGES:
+			raise ValueError(f"Unknown stage: {stage}")
+		self.flush()
+		with self._lock:
+			return {row[0] for row in self._conn.execute(f"SELECT name FROM rows WHERE {stage} = 1 AND in_job = 1 AND done = 0")}
+
+	def unfinished_rows(self):
+		"""Row positions of the last job that have not completed every stage"""
+		self.flush()
+		with self._lock:
+			return [row[0] for row in self._conn.execute("SELECT idx FROM rows WHERE in_job = 1 AND done = 0 ORDER BY idx")]
+
+	def mark(self, name, stage):
+		"""Record that a stage finished for a row; committed with the next batch"""
+		self._queue(name, stage)
+
+	def finish(self, name):
+		"""Record that every stage finished for a row"""
+		self._queue(name, "done")
+
+	def _queue(self, name, column):
+		with self._lock:
+			self._pending.append((column, name))
+			self._commit_due_locked()
+
+	def _write_rows(self, pending):
+		for column in JOB_STAGES + ("done",):
+			names = [(name,) for pending_column, name in pending if pending_column == column]
+			if names:
+				self._conn.executemany(f"UPDATE rows SET {column} = 1 WHERE name = ?", names)
@@ -0,0 +1,169 @@
+import os
+import json
+import uuid
+import hashlib
+import imaplib
+import threading
+from email.policy import SMTP as SMTP_POLICY
+
+from smtp_session import SMTP_MAX_MESSAGES_PER_SESSION, SMTP_SECURITY_MODES, SMTP_TIMEOUT, SmtpSession
+from send_ledger import UndeliveredError, imap_sent_checker
+
+# Read from the working directory, next to sent_invitations.db
+TRANSPORT_CONFIG = "mail_transport.json"
+
+TRANSPORT_TYPES = ("smtp", "relay", "spool")
+
+# "smtp" is Gmail by default; "relay" is an on-site MTA that needs no login.
+# imap_host is where interrupted sends are looked up in the Sent folder (None = cannot be checked)
+TRANSPORT_DEFAULTS = {
+    "smtp": {"host": "smtp.gmail.com", "port": 465, "security": "ssl", "auth": True,
+             "imap_host": "imap.gmail.com", "imap_port": imaplib.IMAP4_SSL_PORT},
+    "relay": {"host": "localhost", "port": 25, "security": "plain", "auth": False,
+              "imap_host": None, "imap_port": imaplib.IMAP4_SSL_PORT},
+    "spool": {"folder": "spool"},
+}
+
+# Message-IDs of spooled messages, one per line, kept in the spool folder; survives a
+# pickup service removing the .eml files (it only picks up *.eml)
+SPOOL_JOURNAL = ".templify_spooled.log"
+
+
+def load_transport_config(path=TRANSPORT_CONFIG):
+    """
+    Transport settings from a JSON file, with defaults for anything left out.
+
+    The file holds one object, for example
+    {"type": "relay", "host": "mail.example.org", "port": 25, "imap_host": "mail.example.org"} or
+    {"type": "spool", "folder": "C:/inetpub/mailroot/Pickup"}.
+    Without the file, mail goes to Gmail over SSL as before.
+    """
+    config = {"type": "smtp"}
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            config = json.load(f)
+        if not isinstance(config, dict):
+            raise ValueError(f"{path} must contain a JSON object")
+    kind = config.get("type", "smtp")
+    if kind not in TRANSPORT_TYPES:
+        raise ValueError(f"Unknown transport type: {kind} (choose from {', '.join(TRANSPORT_TYPES)})")
+    config = {**TRANSPORT_DEFAULTS[kind], **config, "type": kind}
+    if kind != "spool" and config["security"] not in SMTP_SECURITY_MODES:
+        raise ValueError(f"Unknown SMTP security: {config['security']} (choose from {', '.join(SMTP_SECURITY_MODES)})")
+    return config
+
+
+def transport_needs_password(config):
+    return config["type"] != "spool" and bool(config["auth"])
+
+
+def describe_transport(config):
+    """One-line summary for the log"""
+    if config["type"] == "spool":
+        return f"spool folder {os.path.abspath(config['folder'])}"
+    login = "with login" if config["auth"] else "no login"
+    return f"{config['type']} {config['host']}:{config['port']} ({config['security']}, {login})"
+
+
+class SpoolTransport:
+    """
+    Writes each message as an .eml file into a pickup folder for an MTA to deliver.
+
+    Same interface as SmtpSession. A message is written under a temporary
+    name and renamed into place, so a pickup service never sees half a file,
+    and a failed write (disk full, permissions) raises UndeliveredError: a
+    definite failure that is retried and then marked failed, not left in flight.
+    Files are named after the Message-ID, which is also appended to
+    SPOOL_JOURNAL, so spool_sent_checker() can settle interrupted sends.
+    """
+
+    # Shared by every worker's transport, so journal lines never interleave
+    _journal_lock = threading.Lock()
+
+    def __init__(self, folder):
+        self.folder = folder
+
+    def connect(self):
+        try:
+            os.makedirs(self.folder, exist_ok=True)
+        except OSError as e:
+            raise UndeliveredError(f"Spool folder unavailable: {e}") from e
+
+    def send(self, msg):
+        """Write one message; returns once its .eml file is in place"""
+        self.connect()
+        message_id = msg.get("Message-ID")
+        name = spool_name(message_id) if message_id else uuid.uuid4().hex
+        temp_path = os.path.join(self.folder, f".{name}.tmp")
+        try:
+            with open(temp_path, 'wb') as f:
+                f.write(msg.as_bytes(policy=SMTP_POLICY))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, os.path.join(self.folder, f"{name}.eml"))
+        except OSError as e:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise UndeliveredError(f"Could not write to spool folder: {e}") from e
+        if message_id:
+            # The message is already spooled: a journal failure only weakens a later reconcile
+            try:
+                with self._journal_lock, open(os.path.join(self.folder, SPOOL_JOURNAL), 'a', encoding='utf-8') as f:
+                    f.write(message_id.strip() + "\n")
+            except OSError:
+                pass
+
+    def close(self):
+        pass
+
+
+def spool_name(message_id):
+    """File stem of a spooled message: a hash, since Message-IDs contain characters filenames cannot"""
+    return hashlib.sha1(message_id.strip().encode("utf-8")).hexdigest()
+
+
+def spool_sent_checker(folder):
+    """find_sent_ids for a spool folder: a Message-ID counts as sent if it was journaled or its file is still waiting"""
+
+    def find_sent_ids(message_ids):
+        journal = os.path.join(folder, SPOOL_JOURNAL)
+        spooled = set()
+        if os.path.exists(journal):
+            with open(journal, 'r', encoding='utf-8') as f:
+                spooled = {line.strip() for line in f}
+        return {
+            message_id for message_id in message_ids
+            if message_id.strip() in spooled or os.path.exists(os.path.join(folder, spool_name(message_id) + ".eml"))
+        }
+
+    return find_sent_ids
+
+
+def sent_checker(config, username, password):
+    """find_sent_ids for SendLedger.reconcile under this transport; raises from find_sent_ids when it cannot check"""
+    if config["type"] == "spool":
+        return spool_sent_checker(config["folder"])
+    host = config.get("imap_host")
+
+    def unavailable(message_ids):
+        if not host:
+            raise RuntimeError("No IMAP server configured (imap_host in mail_transport.json)")
+        raise RuntimeError("The app password is needed to check the Sent folder")
+
+    if not host or not password:
+        return unavailable
+    return imap_sent_checker(host, username, password, port=int(config.get("imap_port", imaplib.IMAP4_SSL_PORT)))
+
+
+def create_transport(config, username, password, max_messages=SMTP_MAX_MESSAGES_PER_SESSION, log=print):
+    """A new transport for config; each send worker gets its own"""
+    if config["type"] == "spool":
+        return SpoolTransport(config["folder"])
+    return SmtpSession(
+        config["host"], int(config["port"]),
+        username if config["auth"] else None, password,
+        max_messages=max_messages,
+        timeout=config.get("timeout", SMTP_TIMEOUT),
+        security=config["security"],
+        log=log
+    )
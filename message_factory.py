@@ -0,0 +1,99 @@
+import os
+import base64
+import threading
+import mimetypes
+from collections import OrderedDict
+from email.utils import make_msgid
+from email.mime.multipart import MIMEMultipart
+from email.mime.nonmultipart import MIMENonMultipart
+
+INVITATION_SUBJECT = "Invitation to the National Day and Armed Forces Day of the Republic of Korea"
+
+# Domain of the inline image's Content-ID
+CONTENT_ID_DOMAIN = "xyz.com"
+
+# HTML body; {cid} is the only part that changes between messages
+INVITATION_HTML = """\
+            <html>
+              <head>
+                <style>
+                  img {{ max-width: 900px; width: 100%; height: auto; }}
+                </style>
+              </head>
+              <body>
+                <img src="cid:{cid}" style="width: 900px; max-width: 100%; height: auto;">
+              </body>
+            </html>
+            """
+
+# Base64-encoded images kept for reuse, least recently used dropped beyond this size
+MESSAGE_IMAGE_CACHE_BYTES = 64 * 1024 * 1024
+
+
+class InvitationMessageFactory:
+    """
+    Builds invitation emails: multipart/alternative > multipart/related > (HTML, inline image).
+
+    Everything shared by the run (sender, subject, the HTML around the image
+    reference) is prepared once; build() only adds the recipient, the
+    Message-ID, a fresh Content-ID and the image part. Images are read and
+    base64-encoded once per file (and re-read if the file changes), so an
+    image sent to several recipients is not encoded again. The parts are
+    plain email.mime objects with their payloads already encoded, so
+    building a message does no content-manager work. Safe to share between
+    send workers.
+    """
+
+    def __init__(self, sender_email, subject=INVITATION_SUBJECT, cache_bytes=MESSAGE_IMAGE_CACHE_BYTES):
+        self.sender_email = sender_email
+        self.subject = subject
+        self.cache_bytes = cache_bytes
+        self._html_head, self._html_tail = INVITATION_HTML.format(cid="\0").split("\0")
+        self._lock = threading.Lock()
+        self._images = OrderedDict()  # (path, size, mtime_ns) -> (subtype, base64 payload)
+        self._cached_bytes = 0
+
+    def build(self, recipient, img_filename, message_id):
+        """The message for one recipient, with img_filename as its inline image"""
+        cid = make_msgid(domain=CONTENT_ID_DOMAIN)
+
+        html = MIMENonMultipart("text", "html", charset="utf-8")
+        html["Content-Transfer-Encoding"] = "7bit"
+        html.set_payload(self._html_head + cid[1:-1] + self._html_tail)
+
+        subtype, payload = self._encoded_image(img_filename)
+        filename = os.path.basename(img_filename)
+        image = MIMENonMultipart("image", subtype, name=filename)
+        image["Content-Transfer-Encoding"] = "base64"
+        image["Content-ID"] = cid
+        image.add_header("Content-Disposition", "inline", filename=filename)
+        image.set_payload(payload)
+
+        msg = MIMEMultipart("alternative", _subparts=[MIMEMultipart("related", _subparts=[html, image])])
+        msg["Subject"] = self.subject
+        msg["From"] = self.sender_email
+        msg["To"] = recipient
+        # Recorded in the ledger first, so an interrupted send can be found in the Sent folder
+        msg["Message-ID"] = message_id
+        return msg
+
+    def _encoded_image(self, path):
+        stat = os.stat(path)
+        key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+        with self._lock:
+            cached = self._images.get(key)
+            if cached is not None:
+                self._images.move_to_end(key)
+                return cached
+        with open(path, 'rb') as f:
+            data = f.read()
+        mime_type = mimetypes.guess_type(path)[0] or "image/png"
+        encoded = (mime_type.split("/", 1)[1], base64.encodebytes(data).decode("ascii"))
+        with self._lock:
+            if key not in self._images:
+                self._images[key] = encoded
+                self._cached_bytes += len(encoded[1])
+                while self._cached_bytes > self.cache_bytes and len(self._images) > 1:
+                    _, (_, dropped) = self._images.popitem(last=False)
+                    self._cached_bytes -= len(dropped)
+        return encoded
@@ -0,0 +1,417 @@
+
+# Standard library imports
+import os
+import time
+import queue
+import shutil
+import socket
+import tempfile
+import threading
+import subprocess
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+# Third-party imports
+from docx2pdf import convert as docx2pdf_convert
+
+# Selectable Stage 2 backends
+PDF_CONVERTERS = ("word", "libreoffice")
+
+# Usual install locations checked when soffice is not on PATH
+SOFFICE_CANDIDATES = [
+	r"C:\Program Files\LibreOffice\program\soffice.exe",
+	r"C:\Program Files (x86)\LibreOffice\program\soffice.exe",
+	"/Applications/LibreOffice.app/Contents/MacOS/soffice",
+	"/usr/lib/libreoffice/program/soffice",
+	"/opt/libreoffice/program/soffice",
+]
+
+# Seconds to wait for a freshly started instance to accept connections
+LIBREOFFICE_START_TIMEOUT = 60
+
+# Seconds one document may take before its instance is killed and the document reported failed
+LIBREOFFICE_CONVERT_TIMEOUT = 120
+
+
+def _free_port():
+	"""Ask the OS for a free local TCP port for an instance's UNO socket"""
+	with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+		sock.bind(("127.0.0.1", 0))
+		return sock.getsockname()[1]
+
+
+def find_soffice():
+	"""Locate the LibreOffice executable, or return None"""
+	for name in ("soffice", "libreoffice"):
+		path = shutil.which(name)
+		if path:
+			return path
+	for path in SOFFICE_CANDIDATES:
+		if os.path.exists(path):
+			return path
+	return None
+
+
+def _stage_file(source, target):
+	"""Hard-link a file into the staging folder, copying when links are not supported"""
+	try:
+		os.link(source, target)
+	except OSError:
+		shutil.copyfile(source, target)
+
+
+class WordConverter:
+	"""DOCX to PDF through Microsoft Word (docx2pdf), which converts a whole folder per invocation"""
+
+	name = "word"
+	workers = 1
+	supports_batch = True
+
+	def start(self):
+		pass
+
+	def convert(self, docx_path, pdf_path):
+		docx2pdf_convert(docx_path, pdf_path)
+
+	def convert_batch(self, jobs):
+		"""
+		Convert exactly the given (docx_path, pdf_path) jobs in one Word session.
+
+		docx2pdf only batches whole folders, so this run's documents are linked into
+		a private staging folder next to the output (same drive, so moves are cheap),
+		converted together, and the PDFs moved to their destinations. Leftover files
+		from earlier runs in the output folder are never touched. Returns the set of
+		pdf paths that were produced.
+		"""
+		if not jobs:
+			return set()
+		staging_parent = os.path.dirname(os.path.abspath(jobs[0][1]))
+		produced = set()
+		with tempfile.TemporaryDirectory(prefix=".templify-batch-", dir=staging_parent) as staging:
+			staged = []
+			for i, (docx_path, pdf_path) in enumerate(jobs):
+				# Numbered names keep jobs apart even if two sources share a basename
+				staged_name = f"{i:06d}"
+				_stage_file(docx_path, os.path.join(staging, staged_name + ".docx"))
+				staged.append((staged_name, pdf_path))
+			docx2pdf_convert(staging, staging)
+			for staged_name, pdf_path in staged:
+				staged_pdf = os.path.join(staging, staged_name + ".pdf")
+				if os.path.exists(staged_pdf):
+					os.replace(staged_pdf, pdf_path)
+					produced.add(pdf_path)
+		return produced
+
+	def close(self):
+		pass
+
+
+class _OfficeInstance:
+	"""
+	One headless LibreOffice process with its own user profile, driven over a UNO socket.
+
+	A start-up that fails kills the process it launched. A conversion that
+	runs past timeout seconds kills the process too, which makes the blocked
+	UNO call return; it raises TimeoutError and the instance is restarted
+	before its next document.
+	"""
+
+	def __init__(self, soffice_path, profile_dir, log, timeout=LIBREOFFICE_CONVERT_TIMEOUT):
+		self.soffice_path = soffice_path
+		self.port = None
+		self.profile_dir = profile_dir
+		self.log = log
+		self.timeout = timeout
+		self.process = None
+		self.desktop = None
+		self._timed_out = False
+
+	def start(self):
+		profile_url = Path(self.profile_dir).absolute().as_uri()
+		self.port = _free_port()
+		self.process = subprocess.Popen(
+			[
+				self.soffice_path,
+				"--headless", "--invisible", "--nologo", "--nodefault", "--norestore", "--nolockcheck",
+				f"-env:UserInstallation={profile_url}",
+				f"--accept=socket,host=127.0.0.1,port={self.port};urp;StarOffice.ComponentContext",
+			],
+			stdout=subprocess.DEVNULL,
+			stderr=subprocess.DEVNULL
+		)
+		try:
+			self.desktop = self._connect()
+		except BaseException:
+			self._kill()
+			raise
+
+	def _connect(self):
+		import uno
+		local_context = uno.getComponentContext()
+		resolver = local_context.ServiceManager.createInstanceWithContext("com.sun.star.bridge.UnoUrlResolver", local_context)
+		url = f"uno:socket,host=127.0.0.1,port={self.port};urp;StarOffice.ComponentContext"
+		deadline = time.time() + LIBREOFFICE_START_TIMEOUT
+		while True:
+			try:
+				context = resolver.resolve(url)
+				return context.ServiceManager.createInstanceWithContext("com.sun.star.frame.Desktop", context)
+			except Exception:
+				if self.process.poll() is not None:
+					raise RuntimeError(f"LibreOffice exited during start-up (code {self.process.returncode})")
+				if time.time() > deadline:
+					raise RuntimeError(f"LibreOffice did not accept connections on port {self.port}")
+				time.sleep(0.25)
+
+	def is_alive(self):
+		return self.process is not None and self.process.poll() is None
+
+	def convert(self, docx_path, pdf_path):
+		import uno
+		from com.sun.star.beans import PropertyValue
+
+		def props(**values):
+			result = []
+			for key, value in values.items():
+				prop = PropertyValue()
+				prop.Name = key
+				prop.Value = value
+				result.append(prop)
+			return tuple(result)
+
+		self._timed_out = False
+		watchdog = threading.Timer(self.timeout, self._kill_hung)
+		watchdog.daemon = True
+		watchdog.start()
+		try:
+			document = self.desktop.loadComponentFromURL(
+				uno.systemPathToFileUrl(os.path.abspath(docx_path)), "_blank", 0, props(Hidden=True)
+			)
+			if document is None:
+				raise RuntimeError(f"LibreOffice could not open {os.path.basename(docx_path)}")
+			try:
+				document.storeToURL(uno.systemPathToFileUrl(os.path.abspath(pdf_path)), props(FilterName="writer_pdf_Export"))
+			finally:
+				document.close(True)
+		except Exception as e:
+			if self._timed_out:
+				raise TimeoutError(f"LibreOffice took longer than {self.timeout}s on {os.path.basename(docx_path)}") from e
+			raise
+		finally:
+			watchdog.cancel()
+
+	def _kill_hung(self):
+		"""Watchdog: a conversion ran past the timeout, so kill the process to unblock the UNO call"""
+		self._timed_out = True
+		process = self.process
+		if process is not None and process.poll() is None:
+			process.kill()
+
+	def _kill(self):
+		"""Stop the process without going through UNO"""
+		self.desktop = None
+		if self.process is not None:
+			if self.process.poll() is None:
+				self.process.terminate()
+				try:
+					self.process.wait(timeout=10)
+				except subprocess.TimeoutExpired:
+					self.process.kill()
+					self.process.wait()
+			self.process = None
+
+	def stop(self):
+		if self.desktop is not None:
+			try:
+				self.desktop.terminate()
+			except Exception:
+				pass
+			self.desktop = None
+		if self.process is not None:
+			try:
+				self.process.wait(timeout=10)
+			except subprocess.TimeoutExpired:
+				self.process.kill()
+			self.process = None
+
+	def restart(self):
+		self.log(f"Restarting LibreOffice instance (profile {os.path.basename(self.profile_dir)})...")
+		self.stop()
+		self.start()
+
+
+class _OfficeCommandInstance(_OfficeInstance):
+	"""
+	Fallback used when the 'uno' module cannot be imported: runs soffice --convert-to
+	per document, still with an isolated profile so several can run side by side.
+	"""
+
+	def start(self):
+		pass
+
+	def is_alive(self):
+		return True
+
+	def convert(self, docx_path, pdf_path):
+		profile_url = Path(self.profile_dir).absolute().as_uri()
+		with tempfile.TemporaryDirectory(prefix="templify-pdf-") as out_dir:
+			try:
+				subprocess.run(
+					[
+						self.soffice_path,
+						"--headless", "--invisible", "--nologo", "--nodefault", "--norestore", "--nolockcheck",
+						f"-env:UserInstallation={profile_url}",
+						"--convert-to", "pdf", "--outdir", out_dir, os.path.abspath(docx_path),
+					],
+					stdout=subprocess.DEVNULL,
+					stderr=subprocess.DEVNULL,
+					check=True,
+					timeout=self.timeout
+				)
+			except subprocess.TimeoutExpired as e:
+				# subprocess.run has already killed soffice
+				raise TimeoutError(f"LibreOffice took longer than {self.timeout}s on {os.path.basename(docx_path)}") from e
+			produced = os.path.join(out_dir, os.path.splitext(os.path.basename(docx_path))[0] + ".pdf")
+			if not os.path.exists(produced):
+				raise RuntimeError(f"LibreOffice produced no PDF for {os.path.basename(docx_path)}")
+			shutil.move(produced, pdf_path)
+
+	def stop(self):
+		pass
+
+
+class LibreOfficeConverter:
+	"""
+	DOCX to PDF through a pool of warm headless LibreOffice instances.
+
+	Each instance gets its own user profile directory (LibreOffice refuses to
+	share one between processes) and its own local UNO socket port. Documents are
+	dispatched to whichever instance is free, and an instance that crashes or
+	drops its connection is restarted and the document retried once. A document
+	that takes longer than timeout seconds fails with TimeoutError instead of
+	holding its instance forever.
+	"""
+
+	name = "libreoffice"
+	supports_batch = False
+
+	def __init__(self, workers=2, soffice_path=None, log=print, timeout=LIBREOFFICE_CONVERT_TIMEOUT):
+		self.workers = max(1, workers)
+		self.soffice_path = soffice_path or find_soffice()
+		self.log = log
+		self.timeout = timeout
+		self._instances = []
+		self._idle = queue.Queue()
+		self._profile_root = None
+		self._lock = threading.Lock()
+
+	def start(self):
+		"""Launch the instances; safe to call more than once"""
+		with self._lock:
+			if self._instances:
+				return
+			if not self.soffice_path:
+				raise RuntimeError("LibreOffice (soffice) was not found. Install it or add it to PATH.")
+			try:
+				import uno  # noqa: F401
+				instance_class = _OfficeInstance
+			except ImportError:
+				self.log("Python UNO bridge not available - LibreOffice will be started once per document")
+				instance_class = _OfficeCommandInstance
+
+			self._profile_root = tempfile.mkdtemp(prefix="templify-lo-")
+			self.log(f"Starting {self.workers} LibreOffice instance(s)...")
+			try:
+				for i in range(self.workers):
+					profile_dir = os.path.join(self._profile_root, f"profile-{i}")
+					instance = instance_class(self.soffice_path, profile_dir, self.log, timeout=self.timeout)
+					instance.start()
+					self._instances.append(instance)
+					self._idle.put(instance)
+			except BaseException:
+				# Don't leave a half-built pool running: the next start() begins from scratch
+				self._close_locked()
+				raise
+
+	def convert(self, docx_path, pdf_path):
+		"""Convert one document on the next free instance (thread-safe)"""
+		self.start()
+		instance = self._idle.get()
+		try:
+			if not instance.is_alive():
+				instance.restart()
+			try:
+				instance.convert(docx_path, pdf_path)
+			except TimeoutError:
+				# The hung instance was killed; it is restarted before its next document
+				raise
+			except Exception as e:
+				if instance.is_alive() and not _is_connection_error(e):
+					raise
+				# The instance crashed or lost its socket: restart it and retry once
+				instance.restart()
+				instance.convert(docx_path, pdf_path)
+		finally:
+			self._idle.put(instance)
+
+	def close(self):
+		with self._lock:
+			self._close_locked()
+
+	def _close_locked(self):
+		for instance in self._instances:
+			instance.stop()
+		self._instances = []
+		self._idle = queue.Queue()
+		if self._profile_root:
+			shutil.rmtree(self._profile_root, ignore_errors=True)
+			self._profile_root = None
+
+
+def _is_connection_error(error):
+	"""UNO reports a dead office process as DisposedException or a bridge RuntimeException"""
+	name = type(error).__name__
+	return name in ("DisposedException", "RuntimeException") or isinstance(error, (ConnectionError, EOFError))
+
+
+def create_pdf_converter(name, workers=1, log=print):
+	"""Build the Stage 2 backend selected by name (see PDF_CONVERTERS)"""
+	if name == "libreoffice":
+		return LibreOfficeConverter(workers=workers, log=log)
+	if name == "word":
+		return WordConverter()
+	raise ValueError(f"Unknown PDF converter: {name}")
+
+
+def convert_many(converter, jobs, on_result, is_cancelled=None):
+	"""
+	Convert (docx_path, pdf_path) jobs, using as many threads as the converter has instances.
+	Calls on_result(docx_path, pdf_path, error) in the calling thread; returns False if cancelled.
+	"""
+	if converter.workers <= 1:
+		for docx_path, pdf_path in jobs:
+			if is_cancelled is not None and is_cancelled():
+				return False
+			try:
+				converter.convert(docx_path, pdf_path)
+				on_result(docx_path, pdf_path, None)
+			except Exception as e:
+				on_result(docx_path, pdf_path, e)
+		return True
+
+	def run(job):
+		if is_cancelled is not None and is_cancelled():
+			return job, None, True
+		try:
+			converter.convert(*job)
+			return job, None, False
+		except Exception as e:
+			return job, e, False
+
+	cancelled = False
+	with ThreadPoolExecutor(max_workers=converter.workers) as executor:
+		for (docx_path, pdf_path), error, skipped in executor.map(run, jobs):
+			if skipped:
+				cancelled = True
+				continue
+			on_result(docx_path, pdf_path, error)
+	return not cancelled
@@ -0,0 +1,131 @@
+
+# Standard library imports
+import os
+import sys
+import shutil
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+
+# Third-party imports
+from PIL import Image
+
+# Resolution of the first-page PNG, and the lower one retried when that fails
+PNG_DPI = 200
+FALLBACK_PNG_DPI = 150
+
+
+class PngOptions:
+	"""
+	Output settings for rasterized invitations.
+
+	width scales page 1 to that many pixels wide (keeping the aspect ratio) and
+	takes precedence over dpi. compress_level (0-9) and colors (palette size,
+	2-256) re-save the PNG through Pillow; leave both unset to keep Poppler's
+	file as is. Flat-colour designs usually shrink several times with a palette.
+	"""
+
+	def __init__(self, dpi=PNG_DPI, width=None, compress_level=None, colors=None):
+		self.dpi = dpi
+		self.width = width
+		self.compress_level = compress_level
+		self.colors = colors
+
+	def needs_post_processing(self):
+		return self.compress_level is not None or bool(self.colors)
+
+	def describe(self):
+		parts = [f"{self.width}px wide" if self.width else f"{self.dpi} DPI"]
+		if self.colors:
+			parts.append(f"{self.colors}-colour palette")
+		if self.compress_level is not None:
+			parts.append(f"zlib level {self.compress_level}")
+		return ", ".join(parts)
+
+
+def find_pdftoppm(poppler_path=None):
+	"""Locate Poppler's pdftoppm in poppler_path or on PATH, or return None"""
+	if poppler_path:
+		exe = os.path.join(poppler_path, "pdftoppm.exe" if sys.platform == "win32" else "pdftoppm")
+		return exe if os.path.exists(exe) else None
+	return shutil.which("pdftoppm")
+
+
+def rasterize_first_page(pdf_path, png_path, dpi=None, poppler_path=None, options=None):
+	"""
+	Render page 1 of a PDF straight to a PNG file with one pdftoppm call.
+
+	pdftoppm encodes the PNG itself, so unlike pdf2image nothing is piped back
+	and decoded through PIL only to be encoded again. An explicit dpi overrides
+	both options.dpi and options.width, so the fallback attempt really renders
+	at a lower resolution.
+	"""
+	options = options or PngOptions()
+	pdftoppm = find_pdftoppm(poppler_path)
+	if pdftoppm is None:
+		raise RuntimeError("Unable to find pdftoppm - is Poppler installed and on PATH?")
+	if options.width and not dpi:
+		size_args = ["-scale-to-x", str(options.width), "-scale-to-y", "-1"]
+	else:
+		size_args = ["-r", str(dpi or options.dpi)]
+	# -singlefile writes exactly "<prefix>.png" instead of "<prefix>-1.png"
+	prefix = os.path.splitext(png_path)[0]
+	result = subprocess.run(
+		[pdftoppm, "-png", *size_args, "-f", "1", "-l", "1", "-singlefile", pdf_path, prefix],
+		stdout=subprocess.DEVNULL,
+		stderr=subprocess.PIPE
+	)
+	if result.returncode != 0 or not os.path.exists(prefix + ".png"):
+		message = result.stderr.decode(errors="replace").strip() or f"pdftoppm exited with code {result.returncode}"
+		raise RuntimeError(message)
+	if prefix + ".png" != png_path:
+		os.replace(prefix + ".png", png_path)
+	if options.needs_post_processing():
+		_recompress_png(png_path, options)
+
+
+def _recompress_png(png_path, options):
+	"""Re-save a PNG with a palette and/or zlib level, replacing it atomically"""
+	with Image.open(png_path) as image:
+		image.load()
+	if options.colors:
+		image = image.convert("RGB").quantize(colors=max(2, min(256, options.colors)))
+	temp_path = png_path + ".tmp"
+	save_args = {} if options.compress_level is None else {"compress_level": options.compress_level}
+	image.save(temp_path, "PNG", **save_args)
+	os.replace(temp_path, png_path)
+
+
+def rasterize_many(pdf_paths, rasterize, on_result, workers=1, is_cancelled=None):
+	"""
+	Run rasterize(pdf_path) -> bool over many PDFs on a pool of worker threads.
+
+	Each call spends its time in its own pdftoppm process, so threads are enough
+	to keep every core busy. Calls on_result(pdf_path, ok, error) in the calling
+	thread, in input order; returns False if cancelled.
+	"""
+	if workers <= 1:
+		for pdf_path in pdf_paths:
+			if is_cancelled is not None and is_cancelled():
+				return False
+			try:
+				on_result(pdf_path, rasterize(pdf_path), None)
+			except Exception as e:
+				on_result(pdf_path, False, e)
+		return True
+
+	def run(pdf_path):
+		if is_cancelled is not None and is_cancelled():
+			return pdf_path, False, None, True
+		try:
+			return pdf_path, rasterize(pdf_path), None, False
+		except Exception as e:
+			return pdf_path, False, e, False
+
+	cancelled = False
+	with ThreadPoolExecutor(max_workers=workers) as executor:
+		for pdf_path, ok, error, skipped in executor.map(run, pdf_paths):
+			if skipped:
+				cancelled = True
+				continue
+			on_result(pdf_path, ok, error)
+	return not cancelled
@@ -0,0 +1,102 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from folder_index import INVITATION_PREFIX
+from send_ledger import IN_FLIGHT, SENT
+
+
+def clean_names(names):
+    """Vectorized InvitationSenderApp.clean_name over a Series of strings"""
+    cleaned = names.str.replace("\n", " ", regex=False)
+    # Replace invalid Windows filename characters
+    cleaned = cleaned.str.replace(r'[/\\:*?"<>|]', " ", regex=True)
+    # Remove dots and normalize spaces
+    return cleaned.str.split().str.join(" ").str.replace(".", "", regex=False)
+
+
+def valid_emails(emails):
+    """Basic address check over a Series of stripped strings: not blank, contains "@" and ".", longer than 5"""
+    blank = emails.str.lower().isin(["nan", "none", ""])
+    return (~blank & emails.str.contains("@", regex=False) & emails.str.contains(".", regex=False)
+            & (emails.str.len() > 5)).to_numpy(dtype=bool)
+
+
+class RecipientTable:
+    """
+    Per-row recipient values for one workbook and one email/name column choice.
+
+    Names are cleaned, emails trimmed and validated, and ledger keys built once,
+    column-wise, when the workbook is opened or a column dropdown changes.
+    Sent states and invitation image paths are filled in with one bulk ledger
+    query and one folder index pass, so selection, page rendering and the send
+    loop only index these arrays.
+    """
+
+    def __init__(self, invitees, email_col, name_col):
+        self.email_col = email_col
+        self.name_col = name_col
+        raw_names = invitees[name_col]
+        raw_emails = invitees[email_col]
+        self.names = clean_names(raw_names.where(raw_names.notna(), "Unknown").map(str).str.strip()).to_numpy(dtype=object)
+        emails = raw_emails.where(raw_emails.notna(), "").map(str).str.strip()
+        self.emails = emails.to_numpy(dtype=object)
+        self.valid = valid_emails(emails)
+        self.keys = (emails + "|" + pd.Series(self.names, index=emails.index)).to_numpy(dtype=object)
+        self.states = np.full(len(self.keys), None, dtype=object)
+        self.images = np.full(len(self.keys), None, dtype=object)
+
+    def __len__(self):
+        return len(self.keys)
+
+    @property
+    def valid_count(self):
+        return int(self.valid.sum())
+
+    def refresh_states(self, ledger):
+        """Re-read every row's ledger state in one bulk query"""
+        states = ledger.states(self.keys)
+        self.states = np.array([states.get(key) for key in self.keys], dtype=object)
+
+    def set_state(self, position, state):
+        self.states[position] = state
+
+    def sent_mask(self):
+        return self.states == SENT
+
+    def unsent_mask(self):
+        """Valid rows that are neither sent nor waiting for reconciliation"""
+        return self.valid & (self.states != SENT) & (self.states != IN_FLIGHT)
+
+    def resolve_images(self, index):
+        """
+        Fill in each row's invitation image from a FolderIndex. Exact stems are
+        matched in one vectorized pass; only misses go through the legacy and
+        fuzzy lookups, once per distinct name.
+        """
+        names = pd.Series(self.names)
+        exact = names.isin(index.stems("png")).to_numpy(dtype=bool)
+        images = np.where(
+            exact,
+            (INVITATION_PREFIX + names + ".png").map(lambda filename: os.path.join(index.folder, filename)).to_numpy(dtype=object),
+            None
+        )
+        found = {}
+        for position in np.flatnonzero(~exact):
+            name = self.names[position]
+            if name not in found:
+                stem = index.find(name, name, "png")
+                found[name] = os.path.join(index.folder, f"{INVITATION_PREFIX}{stem}.png") if stem is not None else None
+            images[position] = found[name]
+        self.images = images
+
+    def row(self, position):
+        """Values for one row, as used by the list widgets"""
+        return {
+            'idx': position,
+            'name': self.names[position],
+            'email': self.emails[position],
+            'has_valid_email': bool(self.valid[position]),
+            'state': self.states[position] if self.valid[position] else None,
+        }
@@ -0,0 +1,89 @@
+
+# Standard library imports
+import os
+import json
+import hashlib
+import threading
+
+# Manifest kept inside each output folder, next to the files it describes
+CACHE_MANIFEST = ".templify_cache.json"
+
+# Bump when the key recipe changes so old manifests stop matching
+CACHE_VERSION = 1
+
+
+def render_key(template_hash, context, settings):
+	"""Content address of one invitation: template bytes + rendered context + output settings"""
+	payload = json.dumps(
+		{"v": CACHE_VERSION, "template": template_hash, "context": context, "settings": settings},
+		sort_keys=True,
+		ensure_ascii=False,
+		default=str
+	)
+	return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class RenderCache:
+	"""
+	Content-addressed record of the artifacts in an output folder.
+
+	Each invitation name maps to the render key it was produced with and the
+	files that make up its artifact set. A row is up to date when its current
+	key matches and every one of those files still exists, so editing the
+	template or a row's data (or deleting an output file) makes it stale.
+	"""
+
+	def __init__(self, output_folder, log=print):
+		self.manifest_path = os.path.join(output_folder, CACHE_MANIFEST)
+		self.log = log
+		self._lock = threading.Lock()
+		self._dirty = False
+		self.entries = self.load()
+
+	def load(self):
+		"""Load the manifest, starting fresh if it is missing or unreadable"""
+		if os.path.exists(self.manifest_path):
+			try:
+				with open(self.manifest_path, 'r', encoding='utf-8') as f:
+					return json.load(f)
+			except (OSError, json.JSONDecodeError):
+				self.log("Warning: Render cache manifest unreadable, starting fresh.")
+		return {}
+
+	def save(self):
+		"""Write the manifest atomically so an interrupted run never leaves it half-written"""
+		with self._lock:
+			if not self._dirty:
+				return
+			entries = json.dumps(self.entries, indent=2, ensure_ascii=False)
+			self._dirty = False
+		temp_path = self.manifest_path + ".tmp"
+		try:
+			with open(temp_path, 'w', encoding='utf-8') as f:
+				f.write(entries)
+			os.replace(temp_path, self.manifest_path)
+		except OSError as e:
+			self.log(f"Warning: Could not save render cache: {e}")
+
+	def is_fresh(self, name, key):
+		"""True when name was produced with this key and all of its files are still present"""
+		entry = self.entries.get(name)
+		if not entry or entry.get("key") != key:
+			return False
+		folder = os.path.dirname(self.manifest_path)
+		return all(os.path.exists(os.path.join(folder, file)) for file in entry.get("files", []))
+
+	def forget(self, name):
+		"""Drop name's entry, for a row that is about to be produced again"""
+		with self._lock:
+			if self.entries.pop(name, None) is not None:
+				self._dirty = True
+
+	def record(self, name, key, paths):
+		"""Remember the artifact set produced for name; an incomplete set is forgotten instead"""
+		with self._lock:
+			if all(os.path.exists(path) for path in paths):
+				self.entries[name] = {"key": key, "files": [os.path.basename(path) for path in paths]}
+			else:
+				self.entries.pop(name, None)
+			self._dirty = True
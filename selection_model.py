@@ -0,0 +1,54 @@
+import threading
+
+import numpy as np
+
+
+class SelectionModel:
+    """
+    Checkbox state of every invitee row, as a boolean array indexed by row position.
+
+    Rows get their default state (for example "not generated yet") the first
+    time they are shown, like the old per-row checkbox variables did; bulk
+    selections set every row at once with a mask. Only the rows on screen have
+    Tk variables, which write back here through set(), so worker threads can
+    read the selection without touching Tk.
+    """
+
+    def __init__(self, size=0):
+        self._lock = threading.Lock()
+        self.reset(size)
+
+    def reset(self, size):
+        """Forget every selection, for a workbook with size rows"""
+        with self._lock:
+            self._selected = np.zeros(size, dtype=bool)
+            self._initialized = np.zeros(size, dtype=bool)
+
+    def __len__(self):
+        return len(self._selected)
+
+    def show(self, positions, defaults):
+        """Give rows that were never shown or bulk-selected their default state; returns their states"""
+        positions = np.asarray(positions, dtype=np.intp)
+        with self._lock:
+            fresh = ~self._initialized[positions]
+            self._selected[positions[fresh]] = np.asarray(defaults, dtype=bool)[fresh]
+            self._initialized[positions] = True
+            return self._selected[positions].copy()
+
+    def set(self, position, value):
+        """Record one checkbox change"""
+        with self._lock:
+            self._selected[position] = bool(value)
+            self._initialized[position] = True
+
+    def assign(self, mask):
+        """Set every row at once from a boolean mask"""
+        with self._lock:
+            self._selected[:] = np.asarray(mask, dtype=bool)
+            self._initialized[:] = True
+
+    def selected_positions(self):
+        """Row positions currently selected, in sheet order"""
+        with self._lock:
+            return np.flatnonzero(self._selected)
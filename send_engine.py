@@ -0,0 +1,174 @@
+import time
+import heapq
+import random
+import threading
+
+# Defaults for the sender's speed settings; stay well inside Gmail's sending limits
+SEND_WORKERS = 2
+SEND_PER_SECOND = 2.0
+SEND_PER_MINUTE = 60.0
+
+# Longest single sleep while waiting for a token, so cancellation is noticed quickly
+LIMITER_POLL_INTERVAL = 0.1
+
+# Transient failures are retried until a message has had this many attempts
+SEND_MAX_ATTEMPTS = 4
+
+# Backoff before retry n is up to RETRY_BASE_DELAY * 2**(n-1) seconds, capped at RETRY_MAX_DELAY
+RETRY_BASE_DELAY = 5.0
+RETRY_MAX_DELAY = 120.0
+
+
+def backoff_delay(attempt, base=RETRY_BASE_DELAY, cap=RETRY_MAX_DELAY):
+    """Seconds to wait after failed attempt number attempt: exponential, with jitter so retries spread out"""
+    delay = min(cap, base * 2 ** (attempt - 1))
+    return random.uniform(delay / 2, delay)
+
+
+class TokenBucket:
+    """Up to capacity tokens, refilled continuously at rate tokens per second"""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self):
+        """Seconds until one token is available"""
+        return max(0.0, (1 - self.tokens) / self.rate)
+
+
+class RateLimiter:
+    """
+    Shared cap on messages per second and per minute, as two token buckets.
+
+    acquire() blocks until both buckets hold a token and takes one from each,
+    so bursts stay within a second's quota and sustained sending within the
+    minute's. A limit of None (or 0) is not enforced.
+    """
+
+    def __init__(self, per_second=SEND_PER_SECOND, per_minute=SEND_PER_MINUTE):
+        self._lock = threading.Lock()
+        self._buckets = []
+        if per_second:
+            self._buckets.append(TokenBucket(per_second, max(1.0, per_second)))
+        if per_minute:
+            self._buckets.append(TokenBucket(per_minute / 60.0, max(1.0, per_minute)))
+
+    def acquire(self, is_cancelled=None):
+        """Wait for a send slot; returns False if cancelled while waiting"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                for bucket in self._buckets:
+                    bucket.refill(now)
+                wait = max((bucket.wait_time() for bucket in self._buckets), default=0.0)
+                if wait <= 0:
+                    for bucket in self._buckets:
+                        bucket.tokens -= 1
+                    return True
+            if is_cancelled and is_cancelled():
+                return False
+            time.sleep(min(wait, LIMITER_POLL_INTERVAL))
+
+
+class RetryQueue:
+    """
+    Jobs for the send workers, some of them not due until a retry delay has passed.
+
+    get() hands out the earliest due job and blocks while the only jobs left
+    are waiting out a delay, or while other workers are still sending and
+    might requeue theirs. It returns None once every job is done.
+    """
+
+    def __init__(self, jobs=()):
+        self._ready = threading.Condition()
+        self._heap = []
+        self._order = 0
+        self._active = 0
+        for job in jobs:
+            self.put(job)
+
+    def put(self, job, attempt=1, delay=0.0):
+        with self._ready:
+            heapq.heappush(self._heap, (time.monotonic() + delay, self._order, job, attempt))
+            self._order += 1
+            self._ready.notify_all()
+
+    def get(self, is_cancelled):
+        """The next due (job, attempt), or None when all jobs are done or the run is cancelled"""
+        with self._ready:
+            while True:
+                if is_cancelled():
+                    return None
+                if self._heap:
+                    wait = self._heap[0][0] - time.monotonic()
+                    if wait <= 0:
+                        _, _, job, attempt = heapq.heappop(self._heap)
+                        self._active += 1
+                        return job, attempt
+                elif not self._active:
+                    return None
+                else:
+                    wait = LIMITER_POLL_INTERVAL
+                self._ready.wait(min(wait, LIMITER_POLL_INTERVAL))
+
+    def task_done(self):
+        with self._ready:
+            self._active -= 1
+            self._ready.notify_all()
+
+    def drain(self):
+        """Drop every queued job and return how many there were"""
+        with self._ready:
+            count = len(self._heap)
+            self._heap.clear()
+            self._ready.notify_all()
+            return count
+
+
+def run_send_workers(jobs, send_job, make_session, workers=SEND_WORKERS, limiter=None, is_cancelled=None):
+    """
+    Send jobs on a pool of worker threads, each with its own session.
+
+    send_job(job, session, attempt) does one send (claim, transport, ledger
+    update) and must not raise; it returns True to have the job retried after
+    backoff_delay(attempt), and the other workers keep sending in the meantime.
+    Every worker waits on the shared limiter before each attempt and stops
+    taking jobs once is_cancelled() is true; messages already being sent
+    finish. Returns the number of jobs left unsent because of cancellation.
+    """
+    pending = RetryQueue(jobs)
+    is_cancelled = is_cancelled or (lambda: False)
+
+    def worker():
+        session = make_session()
+        try:
+            while True:
+                item = pending.get(is_cancelled)
+                if item is None:
+                    return
+                job, attempt = item
+                try:
+                    if limiter is not None and not limiter.acquire(is_cancelled):
+                        # Cancelled while waiting: put the job back so it is counted as unsent
+                        pending.put(job, attempt)
+                        return
+                    if send_job(job, session, attempt):
+                        pending.put(job, attempt + 1, backoff_delay(attempt))
+                finally:
+                    pending.task_done()
+        finally:
+            session.close()
+
+    threads = [threading.Thread(target=worker, daemon=True) for _ in range(max(1, min(workers, len(jobs) or 1)))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return pending.drain()
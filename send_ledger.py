@@ -0,0 +1,222 @@
+import time
+import smtplib
+import imaplib
+from datetime import datetime
+
+from storage import BatchedStore, legacy_paths
+
+# Per-recipient states: a row is claimed (in_flight) and committed before the SMTP
+# transaction starts, so after a crash every ambiguous send is visible as in_flight
+PENDING = "pending"
+IN_FLIGHT = "in_flight"
+SENT = "sent"
+FAILED = "failed"
+
+# Outcome marks are committed every LEDGER_BATCH_SIZE rows or LEDGER_COMMIT_INTERVAL seconds
+LEDGER_BATCH_SIZE = 50
+LEDGER_COMMIT_INTERVAL = 2.0
+
+# Keys per "IN (...)" query; stays below SQLite's host parameter limit
+LEDGER_QUERY_CHUNK = 500
+
+# Mailboxes searched when reconciling in-flight sends, Gmail's first
+SENT_FOLDERS = ['"[Gmail]/Sent Mail"', '"[Google Mail]/Sent Mail"', "Sent", '"Sent Items"', "INBOX.Sent"]
+
+
+class UndeliveredError(OSError):
+    """A transport failure that provably handed nothing on, e.g. a spool file that never reached its final name"""
+
+
+# Errors proving the message was not delivered: the SMTP server explicitly refused it, or nothing left this machine
+DEFINITE_SMTP_FAILURES = (
+    UndeliveredError,
+    smtplib.SMTPAuthenticationError,
+    smtplib.SMTPRecipientsRefused,
+    smtplib.SMTPSenderRefused,
+    smtplib.SMTPDataError,
+    smtplib.SMTPHeloError,
+    smtplib.SMTPNotSupportedError,
+)
+
+
+def ledger_key(email, name):
+    return f"{email}|{name}"
+
+
+def is_definite_failure(error):
+    """True when an exception from the transport proves the message was not accepted"""
+    return isinstance(error, DEFINITE_SMTP_FAILURES)
+
+
+class SendLedger(BatchedStore):
+    """
+    Transactional record of invitation sends, keyed by "email|name".
+
+    Stored in SQLite (WAL mode). claim() durably moves a recipient to in_flight
+    with the Message-ID about to be used before any SMTP traffic; sent and
+    failed outcomes are buffered and committed in groups. If the process dies,
+    recipients left in_flight are neither resent nor forgotten: reconcile()
+    settles them from the mailbox's Sent folder, or they stay flagged for review.
+    """
+
+    batch_size = LEDGER_BATCH_SIZE
+    commit_interval = LEDGER_COMMIT_INTERVAL
+    # Claims must survive a power cut, not just a crash
+    synchronous = "FULL"
+    description = "send ledger"
+
+    def __init__(self, ledger_file="sent_invitations.db", log=print, legacy_json=None):
+        ledger_file, legacy_json = legacy_paths(ledger_file, legacy_json)
+        self.ledger_file = ledger_file
+        super().__init__(ledger_file, log=log)
+        self._import_legacy_json(
+            legacy_json,
+            self._legacy_rows,
+            "INSERT OR IGNORE INTO sends (key, email, name, state, updated, sent_date) VALUES (?, ?, ?, ?, ?, ?)"
+        )
+
+    def _create_tables(self):
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS sends ("
+            "key TEXT PRIMARY KEY, email TEXT NOT NULL, name TEXT NOT NULL, state TEXT NOT NULL, "
+            "message_id TEXT, attempts INTEGER NOT NULL DEFAULT 0, updated TEXT, sent_date TEXT, error TEXT)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS sends_state ON sends (state)")
+
+    @staticmethod
+    def _legacy_rows(records):
+        """Rows of the old sent_invitations.json, all of them sent"""
+        rows = []
+        for key, info in records.items():
+            if isinstance(info, dict):
+                sent_date = info.get("sent_date", "")
+                rows.append((key, info.get("email", ""), info.get("name", ""), SENT, sent_date, sent_date))
+        return rows
+
+    def states(self, keys):
+        """Map each known key to its state, including outcomes not yet committed"""
+        keys = list(dict.fromkeys(keys))
+        found = {}
+        with self._lock:
+            for start in range(0, len(keys), LEDGER_QUERY_CHUNK):
+                chunk = keys[start:start + LEDGER_QUERY_CHUNK]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(f"SELECT key, state FROM sends WHERE key IN ({placeholders})", chunk)
+                found.update(rows)
+            wanted = set(keys)
+            for key, state, _, _ in self._pending:
+                if key in wanted:
+                    found[key] = state
+        return found
+
+    def claim(self, email, name, message_id):
+        """
+        Durably mark a recipient in_flight with the Message-ID about to be sent.
+        Returns False (and changes nothing) if the recipient is already sent or in flight.
+        """
+        key = ledger_key(email, name)
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        with self._lock:
+            with self._conn:
+                # Outcomes buffered so far go out in the same transaction as the claim
+                self._write_pending_locked()
+                cursor = self._conn.execute(
+                    "INSERT INTO sends (key, email, name, state, message_id, attempts, updated) VALUES (?, ?, ?, ?, ?, 1, ?) "
+                    "ON CONFLICT(key) DO UPDATE SET state = excluded.state, message_id = excluded.message_id, "
+                    "attempts = sends.attempts + 1, updated = excluded.updated, error = NULL "
+                    "WHERE sends.state NOT IN (?, ?)",
+                    (key, email, name, IN_FLIGHT, message_id, now, SENT, IN_FLIGHT)
+                )
+            self._last_commit = time.monotonic()
+            return cursor.rowcount == 1
+
+    def mark_sent(self, email, name):
+        """Record a delivered message; committed with the next group"""
+        self._record(ledger_key(email, name), SENT, None)
+
+    def mark_failed(self, email, name, error):
+        """Record a message the server refused; it may be retried later"""
+        self._record(ledger_key(email, name), FAILED, str(error))
+
+    def _record(self, key, state, error):
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        with self._lock:
+            self._pending.append((key, state, now, error))
+            self._commit_due_locked()
+
+    def _write_rows(self, pending):
+        self._conn.executemany(
+            "UPDATE sends SET state = ?, updated = ?, "
+            "sent_date = CASE WHEN ? = 'sent' THEN ? ELSE sent_date END, error = ? WHERE key = ?",
+            [(state, when, state, when, error, key) for key, state, when, error in pending]
+        )
+
+    def in_flight(self):
+        """(email, name, message_id) for every send whose outcome is unknown"""
+        self.flush()
+        with self._lock:
+            return self._conn.execute(
+                "SELECT email, name, message_id FROM sends WHERE state = ? ORDER BY updated", (IN_FLIGHT,)
+            ).fetchall()
+
+    def resolve(self, email, name, sent):
+        """Settle an in-flight send after reconciliation: sent, or back to pending for a retry"""
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        with self._lock:
+            with self._conn:
+                self._conn.execute(
+                    "UPDATE sends SET state = ?, updated = ?, sent_date = CASE WHEN ? THEN ? ELSE sent_date END "
+                    "WHERE key = ? AND state = ?",
+                    (SENT if sent else PENDING, now, sent, now, ledger_key(email, name), IN_FLIGHT)
+                )
+
+    def reconcile(self, find_sent_ids, resend_unconfirmed=False):
+        """
+        Settle in-flight sends left by an interrupted run.
+
+        find_sent_ids(message_ids) returns the subset found in the mailbox's Sent
+        folder, or raises if the mailbox cannot be checked. Found sends become
+        sent and missing ones pending. When the mailbox is unavailable they stay
+        in_flight (and are skipped) unless resend_unconfirmed is set.
+        Returns (confirmed, requeued, unresolved) counts.
+        """
+        entries = self.in_flight()
+        if not entries:
+            return 0, 0, 0
+        try:
+            found = find_sent_ids([message_id for _, _, message_id in entries if message_id])
+        except Exception as e:
+            self.log(f"Could not check the Sent folder: {e}")
+            if not resend_unconfirmed:
+                return 0, 0, len(entries)
+            found = set()
+        confirmed = 0
+        for email, name, message_id in entries:
+            sent = message_id in found
+            confirmed += sent
+            self.resolve(email, name, sent)
+        return confirmed, len(entries) - confirmed, 0
+
+
+def imap_sent_checker(host, username, password, folders=SENT_FOLDERS, port=imaplib.IMAP4_SSL_PORT):
+    """Build a find_sent_ids callable that looks Message-IDs up in the account's Sent folder over IMAP"""
+
+    def find_sent_ids(message_ids):
+        if not message_ids:
+            return set()
+        found = set()
+        with imaplib.IMAP4_SSL(host, port) as imap:
+            imap.login(username, password)
+            for folder in folders:
+                status, _ = imap.select(folder, readonly=True)
+                if status == "OK":
+                    break
+            else:
+                raise RuntimeError("No Sent folder found on the mail server")
+            for message_id in message_ids:
+                status, data = imap.search(None, "HEADER", "Message-ID", f'"{message_id}"')
+                if status == "OK" and data and data[0].split():
+                    found.add(message_id)
+        return found
+
+    return find_sent_ids
@@ -0,0 +1,165 @@
+import ssl
+import smtplib
+import threading
+
+# A connection is closed and reopened after this many messages
+SMTP_MAX_MESSAGES_PER_SESSION = 100
+
+# Socket timeout in seconds for connecting and for every SMTP command
+SMTP_TIMEOUT = 60
+
+# ssl = implicit TLS (port 465), starttls = upgraded plain connection (587), plain = no encryption (LAN relays)
+SMTP_SECURITY_MODES = ("ssl", "starttls", "plain")
+
+# "Service not available, closing transmission channel": the server is dropping this connection
+SMTP_SERVICE_CLOSING = 421
+
+
+def is_service_closing(error):
+    """True for a 421 reply, including a 421 to every recipient of a message"""
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        codes = [code for code, _ in error.recipients.values()]
+        return bool(codes) and all(code == SMTP_SERVICE_CLOSING for code in codes)
+    return isinstance(error, smtplib.SMTPResponseException) and error.smtp_code == SMTP_SERVICE_CLOSING
+
+
+def is_transient_failure(error):
+    """
+    True for an SMTP failure worth retrying later: a 4xx reply (throttling,
+    mailbox busy, service closing) or a dropped, refused or timed-out
+    connection. 5xx replies and protocol errors are permanent.
+    """
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        codes = [code for code, _ in error.recipients.values()]
+        return bool(codes) and all(400 <= code < 500 for code in codes)
+    if isinstance(error, smtplib.SMTPResponseException):
+        return 400 <= error.smtp_code < 500
+    if isinstance(error, smtplib.SMTPServerDisconnected):
+        return True
+    if isinstance(error, smtplib.SMTPException):
+        return False
+    # Socket errors: timeouts, refused or reset connections, name lookups
+    return isinstance(error, OSError)
+
+
+def keeps_connection(error):
+    """
+    True if the server answered a send with a refusal and is still talking: smtplib
+    has reset the transaction (RSET), so the same connection can take the next
+    message. A 421, a dropped connection or a socket error means it cannot.
+    """
+    if is_service_closing(error):
+        return False
+    return isinstance(error, (smtplib.SMTPResponseException, smtplib.SMTPRecipientsRefused))
+
+
+class SmtpSession:
+    """
+    One authenticated SMTP connection reused for many messages.
+
+    The connection is opened and logged in on first use, checked with NOOP
+    before each later message (a connection the server closed while idle is
+    reopened instead of failing the send), and recycled after max_messages.
+    A 421 reply means the server refused the message and is closing the
+    channel, so the message is retried once on a fresh connection. Other
+    refusals (a 550 for one bad address, say) are raised and the connection
+    is kept for the next message; a dropped connection or socket error
+    closes it first. Without a username the session does not log in (relays
+    that trust the network).
+    """
+
+    def __init__(self, host, port, username, password, max_messages=SMTP_MAX_MESSAGES_PER_SESSION,
+                 timeout=SMTP_TIMEOUT, security="ssl", log=print):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.max_messages = max_messages
+        self.timeout = timeout
+        self.security = security
+        self.log = log
+        self._lock = threading.Lock()
+        self._smtp = None
+        self._sent = 0
+        # Set by connect(), so the send() that follows does not check the connection again
+        self._checked = False
+
+    def _open(self):
+        if self.security == "ssl":
+            smtp = smtplib.SMTP_SSL(self.host, self.port, timeout=self.timeout)
+        else:
+            smtp = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            if self.security == "starttls":
+                smtp.starttls(context=ssl.create_default_context())
+            if self.username:
+                smtp.login(self.username, self.password)
+        except Exception:
+            smtp.close()
+            raise
+        self._smtp = smtp
+        self._sent = 0
+
+    def _alive(self):
+        try:
+            return self._smtp.noop()[0] == 250
+        except (smtplib.SMTPException, OSError):
+            return False
+
+    def connect(self):
+        """Make sure a logged-in connection is ready, reopening a recycled or dropped one"""
+        with self._lock:
+            self._connect_locked()
+            self._checked = True
+
+    def _connect_locked(self):
+        if self._smtp is not None and self._sent >= self.max_messages:
+            self._close_locked()
+        elif self._smtp is not None and not self._alive():
+            self.log("SMTP connection was closed by the server, reconnecting...")
+            self._close_locked()
+        if self._smtp is None:
+            self._open()
+
+    def send(self, msg):
+        """Send one message; returns once the server accepted it and raises otherwise"""
+        with self._lock:
+            if not self._checked:
+                self._connect_locked()
+            self._checked = False
+            try:
+                self._smtp.send_message(msg)
+            except Exception as e:
+                if keeps_connection(e):
+                    raise
+                self._close_locked()
+                if not is_service_closing(e):
+                    raise
+                # Refused with 421, so nothing was accepted: retry once on a new connection
+                self.log("SMTP server is closing the connection (421), reconnecting...")
+                try:
+                    self._open()
+                except Exception:
+                    raise e
+                try:
+                    self._smtp.send_message(msg)
+                except Exception as retry_error:
+                    if not keeps_connection(retry_error):
+                        self._close_locked()
+                    raise
+            self._sent += 1
+
+    def _close_locked(self):
+        self._checked = False
+        if self._smtp is None:
+            return
+        # A failed QUIT must not turn into a send error
+        try:
+            self._smtp.quit()
+        except Exception:
+            self._smtp.close()
+        self._smtp = None
+
+    def close(self):
+        with self._lock:
+            self._close_locked()
@@ -0,0 +1,117 @@
+import os
+import abc
+import json
+import time
+import hashlib
+import sqlite3
+import threading
+
+
+def file_digest(path):
+    """SHA-256 of a file's bytes"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def legacy_paths(db_file, legacy_json=None):
+    """(database path, old JSON record path); given a .json path, the database goes next to it"""
+    stem, ext = os.path.splitext(db_file)
+    if ext.lower() == ".json":
+        legacy_json = legacy_json or db_file
+        db_file = stem + ".db"
+    return db_file, legacy_json or stem + ".json"
+
+
+class BatchedStore(abc.ABC):
+    """
+    Base for the SQLite records the apps keep (generation tracking, send ledger, job checkpoints).
+
+    The database runs in WAL mode. Writes are buffered in self._pending and
+    committed together every batch_size writes or commit_interval seconds,
+    so a run touches the file once per batch and a crash loses at most the
+    last uncommitted batch. Subclasses create their tables in
+    _create_tables(), buffer writes and call _commit_due_locked() under
+    self._lock, and apply a batch in _write_rows().
+    """
+
+    batch_size = 100
+    commit_interval = 2.0
+    synchronous = "NORMAL"
+    pending_type = list
+    # Used in warnings, e.g. "Could not save generation tracking"
+    description = "records"
+
+    def __init__(self, db_file, log=print):
+        self.log = log
+        self._lock = threading.Lock()
+        self._pending = self.pending_type()
+        self._last_commit = time.monotonic()
+        self._conn = sqlite3.connect(db_file, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(f"PRAGMA synchronous={self.synchronous}")
+        self._create_tables()
+        self._conn.commit()
+
+    @abc.abstractmethod
+    def _create_tables(self):
+        """Create the store's tables if they do not exist yet"""
+
+    @abc.abstractmethod
+    def _write_rows(self, pending):
+        """Apply a batch of buffered writes inside the caller's transaction"""
+
+    def _write_pending_locked(self):
+        if self._pending:
+            self._write_rows(self._pending)
+            self._pending = self.pending_type()
+
+    def _commit_due_locked(self):
+        """Commit the buffer if the batch is full or the interval has passed"""
+        if len(self._pending) >= self.batch_size or time.monotonic() - self._last_commit >= self.commit_interval:
+            self._commit_pending_locked()
+
+    def _commit_pending_locked(self):
+        if self._pending:
+            try:
+                with self._conn:
+                    self._write_pending_locked()
+            except sqlite3.Error as e:
+                self.log(f"Warning: Could not save {self.description}: {e}")
+        self._last_commit = time.monotonic()
+
+    def flush(self):
+        """Commit any buffered writes"""
+        with self._lock:
+            self._commit_pending_locked()
+
+    def _import_legacy_json(self, legacy_json, legacy_rows, insert_sql):
+        """
+        Copy the records of an old JSON file in once: legacy_rows(records) turns
+        its parsed contents into parameter tuples for insert_sql. The import is
+        remembered in a meta table, keyed by the file's absolute path.
+        """
+        self._conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        self._conn.commit()
+        if not os.path.exists(legacy_json):
+            return
+        source = os.path.abspath(legacy_json)
+        if self._conn.execute("SELECT 1 FROM meta WHERE key = 'imported_json' AND value = ?", (source,)).fetchone():
+            return
+        try:
+            with open(legacy_json, 'r') as f:
+                records = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            self.log(f"Warning: Old {self.description} file is corrupted, skipping import.")
+            return
+        rows = legacy_rows(records)
+        with self._conn:
+            self._conn.executemany(insert_sql, rows)
+            self._conn.execute("INSERT OR REPLACE INTO meta VALUES ('imported_json', ?)", (source,))
+        self.log(f"Imported {len(rows)} records from {os.path.basename(legacy_json)}")
+
+    def close(self):
+        self.flush()
+        self._conn.close()
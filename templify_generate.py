@@ -0,0 +1,184 @@
+
+"""
+templify-generate: headless command-line invitation generator.
+
+Runs the same generation engine as the GUI without importing tkinter, so it
+works on display-less servers and from batch jobs. The mapping file is a JSON
+object of {placeholder: excel_column}, for example {"Name": "Full Name"}.
+
+Example:
+	python templify_generate.py template.docx guests.xlsx --mapping mapping.json --output output --workers 8 --formats docx,pdf
+
+After an interrupted fast-mode run, finish only what is missing:
+	python templify_generate.py --resume --output output
+"""
+
+# Standard library imports
+import os
+import sys
+import json
+import argparse
+
+# Local imports
+from generation import GENERATION_MODES, OUTPUT_FORMATS, GenerationTracker, InvitationGenerator
+from pdf_convert import PDF_CONVERTERS, create_pdf_converter
+from rasterize import PNG_DPI, PngOptions
+from job_manifest import JOB_MANIFEST, JobManifest
+from guest_list import read_guest_list
+from guest_list_cache import GuestListCache
+
+
+def parse_formats(value):
+	"""Parse a comma-separated list of output formats"""
+	formats = [part.strip().lower() for part in value.split(",") if part.strip()]
+	unknown = [f for f in formats if f not in OUTPUT_FORMATS]
+	if unknown:
+		raise argparse.ArgumentTypeError(f"Unknown format(s): {', '.join(unknown)} (choose from {', '.join(OUTPUT_FORMATS)})")
+	return formats
+
+
+def build_parser():
+	parser = argparse.ArgumentParser(
+		prog="templify-generate",
+		description="Generate invitations from a DOCX template and an Excel guest list without the GUI."
+	)
+	parser.add_argument("template", nargs="?", help="DOCX template with {{ placeholder }} tags")
+	parser.add_argument("workbook", nargs="?", help="Excel, CSV or Parquet file with one row per invitee")
+	parser.add_argument("--mapping", help="JSON file mapping placeholders to Excel columns")
+	parser.add_argument(
+		"--resume",
+		action="store_true",
+		help="Finish the last fast-mode job in --output: redo only the missing DOCX/PDF/PNG stage of each row"
+	)
+	parser.add_argument("--output", default=os.path.abspath("output"), help="Output folder (default: ./output)")
+	parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Processes used for DOCX rendering (default: CPU count)")
+	parser.add_argument("--formats", type=parse_formats, default=list(OUTPUT_FORMATS), help="Comma-separated output formats (default: docx,pdf,png)")
+	parser.add_argument(
+		"--mode",
+		choices=GENERATION_MODES,
+		default="fast",
+		help="normal = one invitation at a time, fast = bulk stages, pipeline = concurrent streaming stages"
+	)
+	parser.add_argument(
+		"--pdf-converter",
+		choices=PDF_CONVERTERS,
+		default="word" if sys.platform in ("win32", "darwin") else "libreoffice",
+		help="PDF backend: Microsoft Word (docx2pdf) or warm headless LibreOffice instances"
+	)
+	parser.add_argument("--pdf-workers", type=int, default=2, help="LibreOffice instances to keep running (default: 2)")
+	parser.add_argument("--png-workers", type=int, default=os.cpu_count() or 1, help="Concurrent Poppler processes for PNG rasterizing (default: CPU count)")
+	parser.add_argument("--png-dpi", type=int, default=PNG_DPI, help=f"PNG resolution (default: {PNG_DPI})")
+	parser.add_argument("--png-width", type=int, help="Scale PNGs to this pixel width instead of using --png-dpi")
+	parser.add_argument("--png-compression", type=int, choices=range(10), metavar="0-9", help="zlib level for PNGs (re-saves through Pillow)")
+	parser.add_argument("--png-colors", type=int, help="Quantize PNGs to a palette of this many colours (2-256)")
+	parser.add_argument(
+		"--tracking-file",
+		default="generated_invitations.db",
+		help="Generation tracking database (an existing .json record next to it is imported once)"
+	)
+	parser.add_argument("--all", action="store_true", help="Regenerate every invitee, even those whose files are up to date")
+	return parser
+
+
+def load_mapping(mapping_path, columns):
+	"""Load the placeholder mapping and check it against the workbook columns"""
+	with open(mapping_path, 'r', encoding='utf-8') as f:
+		mapping = json.load(f)
+	return check_mapping(mapping, columns)
+
+
+def check_mapping(mapping, columns):
+	"""Check a {placeholder: column} mapping against the workbook columns"""
+	if not isinstance(mapping, dict) or not mapping:
+		raise ValueError("Mapping file must contain a JSON object of {placeholder: column}")
+	missing = [col for col in mapping.values() if col not in columns]
+	if missing:
+		raise ValueError(f"Mapped column(s) not found in workbook: {', '.join(map(str, missing))}")
+	return mapping
+
+
+def load_resume_job(output_folder):
+	"""Read the last fast-mode job's settings and unfinished rows from the output folder's manifest"""
+	if not os.path.exists(os.path.join(output_folder, JOB_MANIFEST)):
+		raise ValueError(f"No job to resume in {output_folder}")
+	manifest = JobManifest(output_folder)
+	try:
+		spec = manifest.spec()
+		rows = manifest.unfinished_rows()
+	finally:
+		manifest.close()
+	if not spec or not spec.get("workbook"):
+		raise ValueError("The last job did not record its workbook and cannot be resumed from the command line")
+	return spec, rows
+
+
+def main(argv=None):
+	parser = build_parser()
+	args = parser.parse_args(argv)
+	if not args.resume and not (args.template and args.workbook and args.mapping):
+		parser.error("template, workbook and --mapping are required unless --resume is given")
+
+	png_options = PngOptions(args.png_dpi, args.png_width, args.png_compression, args.png_colors)
+	try:
+		if args.resume:
+			# The job's own template, workbook, mapping and output settings; worker counts come from this command
+			spec, selected_indices = load_resume_job(args.output)
+			args.template, args.workbook, args.formats, args.mode = spec["template"], spec["workbook"], spec["formats"], "fast"
+			png_options = PngOptions(**spec["png"])
+		cache = GuestListCache(log=lambda message: print(message, file=sys.stderr))
+		try:
+			invitees = read_guest_list(args.workbook, cache)
+		finally:
+			cache.close()
+		if args.resume:
+			mapping = check_mapping(spec["mapping"], list(invitees.columns))
+		else:
+			mapping = load_mapping(args.mapping, list(invitees.columns))
+	except Exception as e:
+		print(f"Error: {e}", file=sys.stderr)
+		return 2
+	print(f"Loaded {len(invitees)} invitees from {args.workbook}")
+
+	if args.resume:
+		selected_indices = [idx for idx in selected_indices if idx < len(invitees)]
+		if not selected_indices:
+			print("Nothing to resume: every row of the last job is complete.")
+			return 0
+		print(f"Resuming {len(selected_indices)} unfinished invitations...")
+	else:
+		# Every row is considered; the render cache skips rows whose template, data and settings are unchanged
+		selected_indices = list(range(len(invitees)))
+		if not selected_indices:
+			print("Nothing to generate: the workbook has no rows.")
+			return 0
+		print(f"Checking {len(selected_indices)} invitations...")
+
+	tracker = GenerationTracker(args.tracking_file)
+	pdf_converter = create_pdf_converter(args.pdf_converter, args.pdf_workers)
+	try:
+		generator = InvitationGenerator(
+			args.template,
+			args.output,
+			mapping,
+			tracker,
+			formats=args.formats,
+			render_workers=args.workers,
+			pdf_converter=pdf_converter,
+			png_workers=args.png_workers,
+			png_options=png_options,
+			use_cache=not args.all,
+			workbook_path=args.workbook
+		)
+		generated_count = generator.generate(invitees, selected_indices, mode=args.mode)
+	finally:
+		pdf_converter.close()
+		tracker.close()
+	return 0 if generated_count == len(selected_indices) else 1
+
+
+if __name__ == "__main__":
+	try:
+		sys.exit(main())
+	except KeyboardInterrupt:
+		print("Generation cancelled.", file=sys.stderr)
+		sys.exit(130)
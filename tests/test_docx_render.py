@@ -0,0 +1,51 @@
+import io
+import zipfile
+
+import docx
+import pytest
+
+from docx_render import CompiledTemplate, PlainTemplate, UnsupportedTemplateError
+
+
+def make_template(*paragraphs):
+    document = docx.Document()
+    for text in paragraphs:
+        document.add_paragraph(text)
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+def rendered_text(data):
+    return [paragraph.text for paragraph in docx.Document(io.BytesIO(data)).paragraphs]
+
+
+def test_plain_template_escapes_values():
+    template = PlainTemplate(make_template("Dear {{ name }}"))
+
+    data = template.render({"name": "Kim & Lee <Embassy>"})
+
+    assert rendered_text(data) == ["Dear Kim & Lee <Embassy>"]
+
+
+def test_compiled_template_escapes_values():
+    # The {% if %} makes PlainTemplate refuse it, so this goes through Jinja
+    source = make_template("{% if name %}Dear {{ name }}{% endif %}")
+    with pytest.raises(UnsupportedTemplateError):
+        PlainTemplate(source)
+
+    data = CompiledTemplate(source).render({"name": "Kim & Lee <Embassy>"})
+
+    assert rendered_text(data) == ["Dear Kim & Lee <Embassy>"]
+
+
+def test_engines_render_the_same_document():
+    source = make_template("Dear {{ name }}", "{{ title }}")
+    context = {"name": "Kim & Lee <Embassy>", "title": "R&D \"Lab\""}
+
+    plain = PlainTemplate(source).render(context)
+    compiled = CompiledTemplate(source).render(context)
+
+    assert rendered_text(plain) == rendered_text(compiled) == ["Dear Kim & Lee <Embassy>", "R&D \"Lab\""]
+    with zipfile.ZipFile(io.BytesIO(compiled)) as archive:
+        assert b"Kim &amp; Lee &lt;Embassy&gt;" in archive.read("word/document.xml")
@@ -0,0 +1,87 @@
+import smtplib
+import socketserver
+import threading
+from email.message import EmailMessage
+
+import pytest
+
+from smtp_session import SmtpSession
+
+
+class FakeSmtpHandler(socketserver.StreamRequestHandler):
+    """Just enough SMTP for SmtpSession: refuses every recipient listed in server.refused"""
+
+    def reply(self, line):
+        self.wfile.write((line + "\r\n").encode("ascii"))
+
+    def handle(self):
+        server = self.server
+        with server.lock:
+            server.connections += 1
+        self.reply("220 fake ESMTP")
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode("ascii").strip()
+            verb = command[:4].upper()
+            if verb in ("EHLO", "HELO"):
+                self.reply("250 fake")
+            elif verb == "RCPT":
+                address = command.split(":", 1)[1].strip().strip("<>")
+                if address in server.refused:
+                    self.reply("550 5.1.1 No such user")
+                else:
+                    self.reply("250 OK")
+            elif verb == "DATA":
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+                while self.rfile.readline().rstrip(b"\r\n") != b".":
+                    pass
+                with server.lock:
+                    server.accepted += 1
+                self.reply("250 OK")
+            elif verb == "QUIT":
+                self.reply("221 Bye")
+                return
+            else:
+                # MAIL, RSET, NOOP
+                self.reply("250 OK")
+
+
+@pytest.fixture
+def smtp_server():
+    server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), FakeSmtpHandler)
+    server.daemon_threads = True
+    server.lock = threading.Lock()
+    server.connections = 0
+    server.accepted = 0
+    server.refused = {"nobody@example.org"}
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def message(recipient):
+    msg = EmailMessage()
+    msg["From"] = "sender@example.org"
+    msg["To"] = recipient
+    msg["Subject"] = "Invitation"
+    msg.set_content("Hello")
+    return msg
+
+
+def test_refused_recipient_keeps_the_connection(smtp_server):
+    session = SmtpSession("127.0.0.1", smtp_server.server_address[1], None, None, security="plain", log=lambda _: None)
+    try:
+        session.send(message("guest@example.org"))
+        with pytest.raises(smtplib.SMTPRecipientsRefused):
+            session.send(message("nobody@example.org"))
+        session.connect()
+        session.send(message("another@example.org"))
+    finally:
+        session.close()
+
+    assert smtp_server.accepted == 2
+    assert smtp_server.connections == 1
@@ -0,0 +1,100 @@
+import sys
+
+import customtkinter as ctk
+
+# Height of one list row in pixels; every row has the same height
+ROW_HEIGHT = 32
+
+# Rows scrolled per mouse wheel notch
+WHEEL_ROWS = 3
+
+
+class VirtualList(ctk.CTkFrame):
+    """
+    Scrollable list of any number of rows, drawn with a fixed pool of row widgets.
+
+    Only as many rows as fit in the viewport are ever created (by create_row);
+    scrolling rebinds the same widgets to other data rows (with bind_row)
+    instead of creating and destroying them, so a whole workbook scrolls
+    without pagination. Rows scroll in whole steps of ROW_HEIGHT.
+    """
+
+    def __init__(self, master, create_row, bind_row, row_height=ROW_HEIGHT, **kwargs):
+        super().__init__(master, **kwargs)
+        self.create_row = create_row  # create_row(parent, height) -> row widget of that height
+        self.bind_row = bind_row      # bind_row(row, index) shows data row index in a pooled row
+        self.row_height = row_height
+        self.count = 0
+        self.first = 0
+        self._pool = []
+        self._body = ctk.CTkFrame(self, fg_color="transparent")
+        self._body.pack(side="left", fill="both", expand=True)
+        self._scrollbar = ctk.CTkScrollbar(self, command=self._on_scrollbar)
+        self._scrollbar.pack(side="right", fill="y")
+        self._body.bind("<Configure>", self._on_resize)
+        # Wheel events go to the widget under the pointer, which is usually a pooled row
+        if sys.platform.startswith("linux"):
+            self.bind_all("<Button-4>", self._on_wheel, add="+")
+            self.bind_all("<Button-5>", self._on_wheel, add="+")
+        else:
+            self.bind_all("<MouseWheel>", self._on_wheel, add="+")
+
+    def set_count(self, count, first=None):
+        """Show count data rows, optionally scrolling to first, and rebind the visible ones"""
+        self.count = count
+        if first is not None:
+            self.first = first
+        self.refresh()
+
+    def visible_range(self):
+        """(start, stop) of the data rows currently bound to widgets"""
+        return self.first, min(self.count, self.first + len(self._pool))
+
+    def refresh(self):
+        """Rebind every pooled row to the data row it currently shows"""
+        fully_visible = max(1, self._body.winfo_height() // self.row_height)
+        self.first = max(0, min(self.first, self.count - fully_visible))
+        for offset, row in enumerate(self._pool):
+            index = self.first + offset
+            if index < self.count:
+                self.bind_row(row, index)
+                row.place(x=0, y=offset * self.row_height, relwidth=1)
+            else:
+                row.place_forget()
+        if self.count:
+            start, stop = self.visible_range()
+            self._scrollbar.set(start / self.count, stop / self.count)
+        else:
+            self._scrollbar.set(0, 1)
+
+    def _on_resize(self, event):
+        # One partially visible row below the last full one
+        needed = max(1, event.height // self.row_height + 1)
+        while len(self._pool) < needed:
+            self._pool.append(self.create_row(self._body, self.row_height))
+        while len(self._pool) > needed:
+            self._pool.pop().destroy()
+        self.refresh()
+
+    def _on_scrollbar(self, action, value, unit=None):
+        if action == "moveto":
+            self.first = int(float(value) * self.count)
+        elif action == "scroll":
+            step = len(self._pool) - 1 if unit == "pages" else 1
+            self.first += int(value) * max(1, step)
+        self.refresh()
+
+    def _on_wheel(self, event):
+        if not str(event.widget).startswith(str(self)):
+            return
+        if event.num == 4:
+            steps = -WHEEL_ROWS
+        elif event.num == 5:
+            steps = WHEEL_ROWS
+        elif sys.platform == "darwin":
+            steps = -event.delta
+        else:
+            steps = -int(event.delta / 120) * WHEEL_ROWS
+        if steps:
+            self.first += steps
+            self.refresh()